@@ -0,0 +1,160 @@
+"""
+Profile picture variants.
+
+Uploads are stored only as fixed-size WebP avatars (``AVATAR_SIZES``),
+re-encoded without EXIF, under a name derived from the SHA-256 of the
+uploaded bytes: the same photo uploaded twice is stored once, and the
+user row keeps just the hash (``StudentUser.profile_picture_hash``).
+
+Decoding and resizing a phone photo takes a good fraction of a second,
+so ``read_upload`` hashes and sniffs the file in the request and
+``queue_variants`` hands the actual work to a small background pool once
+the transaction that saves the user commits. Until the variants are
+stored the upload is kept as a pending original (``PENDING_DIR``), so a
+worker that dies or fails can be finished later by
+``manage.py process_profile_pictures``.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZES = (64, 256)
+AVATAR_DIR = "profile_pics/avatars"
+PENDING_DIR = "profile_pics/pending"
+WEBP_QUALITY = 82
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+_executor = None
+_lock = threading.Lock()
+
+
+def avatar_name(content_hash, size):
+    return f"{AVATAR_DIR}/{content_hash[:2]}/{content_hash}-{size}.webp"
+
+
+def pending_name(content_hash):
+    return f"{PENDING_DIR}/{content_hash}"
+
+
+def max_upload_bytes():
+    return getattr(settings, "AVATAR_MAX_UPLOAD_BYTES", MAX_UPLOAD_BYTES)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_image(data):
+    """Cheap header check so bad uploads are rejected before the user is created."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+        return True
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        # DecompressionBombError is not an OSError: oversized images land here too
+        return False
+
+
+def render_variants(data):
+    """{size: webp bytes}: square center crops, orientation applied, EXIF dropped."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        variants = {}
+        # Largest first so each smaller variant resamples fewer pixels
+        for size in sorted(AVATAR_SIZES, reverse=True):
+            image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            out = io.BytesIO()
+            # No exif= argument: Pillow writes no metadata of its own
+            image.save(out, "WEBP", quality=WEBP_QUALITY)
+            variants[size] = out.getvalue()
+        return variants
+
+
+def store_variants(digest, data):
+    """Write any missing variants for ``digest``. Returns how many were written."""
+    missing = [size for size in AVATAR_SIZES if not default_storage.exists(avatar_name(digest, size))]
+    if not missing:
+        return 0
+
+    variants = render_variants(data)
+    for size in missing:
+        name = avatar_name(digest, size)
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(variants[size]))
+    return len(missing)
+
+
+def finish_variants(digest, data):
+    """Store the variants, then drop the pending original."""
+    written = store_variants(digest, data)
+    default_storage.delete(pending_name(digest))
+    return written
+
+
+def _store_in_background(digest, data):
+    try:
+        finish_variants(digest, data)
+    except Exception:
+        logger.exception("Could not process profile picture %s", digest)
+
+
+def _submit(digest, data):
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "AVATAR_WORKERS", 2),
+                thread_name_prefix="avatars",
+            )
+    _executor.submit(_store_in_background, digest, data)
+
+
+def read_upload(uploaded_file):
+    """
+    ``(content hash, bytes)`` of an uploaded profile picture, or None if the
+    file is larger than ``max_upload_bytes()`` or not an image.
+    """
+    limit = max_upload_bytes()
+    if uploaded_file.size > limit:
+        return None
+    data = uploaded_file.read(limit + 1)
+    if len(data) > limit or not is_image(data):
+        return None
+    return content_hash(data), data
+
+
+def queue_variants(digest, data):
+    """
+    Save the pending original now and render the variants in the background
+    once the current transaction commits. A signup that rolls back leaves
+    only the pending original, which process_profile_pictures prunes.
+    """
+    if all(default_storage.exists(avatar_name(digest, size)) for size in AVATAR_SIZES):
+        return  # Already stored for someone else
+    name = pending_name(digest)
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    transaction.on_commit(lambda: _submit(digest, data))
+
+
+def avatar_url(content_hash, size):
+    """
+    URL of the smallest variant at least ``size`` px (the largest if none
+    is), or None while it is still being processed.
+    """
+    if not content_hash:
+        return None
+    variant = next((s for s in sorted(AVATAR_SIZES) if s >= size), max(AVATAR_SIZES))
+    name = avatar_name(content_hash, variant)
+    return default_storage.url(name) if default_storage.exists(name) else None
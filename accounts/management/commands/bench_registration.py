@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent signups through the register view (semester-start spike)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--signups", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duplicate-rate", type=float, default=0.1,
+                            help="Fraction of signups reusing an earlier identity (collision path)")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark accounts")
+
+    def handle(self, *args, **options):
+        if options["signups"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--signups and --concurrency must be at least 1")
+
+        run = uuid.uuid4().hex[:8]
+        prefix = f"bench_reg_{run}_"
+        register_url = reverse("accounts:register")
+        rejected_url = register_url
+        total = options["signups"]
+
+        # Some signups repeat an earlier identity; in flight together they race
+        identities = []
+        for i in range(total):
+            if identities and random.random() < options["duplicate_rate"]:
+                identities.append(random.choice(identities))
+            else:
+                identities.append(f"{prefix}{i}")
+
+        def signup(identity):
+            started = time.perf_counter()
+            response = Client().post(register_url, {
+                "username": identity,
+                "email": f"{identity}@bench.edu",
+                "student_id": identity,
+                "password": "Semester-Start-2026",
+                "confirm_password": "Semester-Start-2026",
+                "gender": "other",
+            })
+            elapsed = time.perf_counter() - started
+            if response.status_code != 302:
+                return "error", elapsed
+            return ("rejected" if response.url == rejected_url else "created"), elapsed
+
+        self.stdout.write(
+            f"{total} signups, {options['concurrency']} concurrent, "
+            f"hashers: {settings.PASSWORD_HASHERS[0].rsplit('.', 1)[-1]}"
+        )
+        started = time.perf_counter()
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(pool.map(signup, identities))
+        wall = time.perf_counter() - started
+
+        outcomes = {"created": 0, "rejected": 0, "error": 0}
+        for outcome, _ in results:
+            outcomes[outcome] += 1
+        latencies = sorted(elapsed * 1000 for _, elapsed in results)
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        StudentUser = get_user_model()
+        accounts = StudentUser.objects.filter(username__startswith=prefix)
+        unique_identities = len(set(identities))
+
+        self.stdout.write(
+            f"   {wall:.2f}s, {total / wall:.1f} signups/s\n"
+            f"   latency ms: p50 {cuts[49]:.0f}, p90 {cuts[89]:.0f}, p99 {cuts[98]:.0f}, max {latencies[-1]:.0f}\n"
+            f"   created {outcomes['created']}, rejected {outcomes['rejected']}, errors {outcomes['error']}"
+        )
+        if accounts.count() == unique_identities == outcomes["created"]:
+            self.stdout.write(self.style.SUCCESS(f"🎉 {unique_identities} accounts, no duplicates."))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f" Expected {unique_identities} accounts, found {accounts.count()}."
+            ))
+
+        if not options["keep"]:
+            accounts.delete()
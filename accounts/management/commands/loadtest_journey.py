@@ -0,0 +1,157 @@
+import json
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from meal.models import MealPlan, MealPlanItem
+from smart_meal_planner.benchutil import percentile
+
+PASSWORD = "Load-Test-Journey-2026"
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class Journey:
+    """One synthetic student walking the app end to end, timing every request."""
+
+    def __init__(self, username, timings, errors):
+        self.username = username
+        self.client = Client()
+        self.timings = timings
+        self.errors = errors
+
+    def request(self, name, method, url, data=None, expect=(200, 302)):
+        started = time.perf_counter()
+        try:
+            response = getattr(self.client, method)(url, data or {})
+        except Exception as exc:
+            response, failure = None, f"{type(exc).__name__}: {exc}"
+        else:
+            failure = None if response.status_code in expect else f"HTTP {response.status_code}"
+        self.timings[name].append(time.perf_counter() - started)
+        if failure:
+            self.errors[name].append(failure)
+            raise JourneyFailed(f"{name}: {failure}")
+        return response
+
+    def run(self):
+        self.request("login", "post", reverse("accounts:login"),
+                     {"username": self.username, "password": PASSWORD}, expect=(302,))
+        self.request("quiz_form", "get", reverse("meal:quiz"))
+        self.request("quiz_submit", "post", reverse("meal:quiz"), {
+            "weekly_budget_limit": "60", "meal_frequency": "3_meals",
+            "goal": "general_health", "food_preference": "omnivore", "max_calories": "700",
+        }, expect=(302,))
+        self.request("generate_plan", "get", reverse("meal:generate"), expect=(302,))
+        self.request("view_plan", "get", reverse("meal:plan"), expect=(200,))
+
+        plan = MealPlan.objects.filter(user__username=self.username).order_by("-id").first()
+        if plan is None:
+            self.errors["generate_plan"].append("no plan created")
+            raise JourneyFailed("generate_plan: no plan created")
+
+        response = self.request("generate_shopping_list", "get",
+                                reverse("grocery:generate_from_plan", args=[plan.id]), expect=(302,))
+        self.request("shopping_list_detail", "get", response.url, expect=(200,))
+
+        self.request("leftovers_input", "post", reverse("leftovers:input"),
+                     {"leftovers": "chicken, rice, tomato, onion"}, expect=(302,))
+        self.request("leftovers_recommend", "get", reverse("leftovers:recommend"), expect=(200,))
+
+        meal_id = MealPlanItem.objects.filter(meal_plan=plan).values_list("meal_id", flat=True).first()
+        self.request("nutrition_add", "get",
+                     reverse("nutrition:add_to_nutrition_log", args=[meal_id]), expect=(302,))
+        self.request("nutrition_dashboard", "get", reverse("nutrition:nutrition_dashboard"), expect=(200,))
+
+
+class Command(BaseCommand):
+    help = "Drive the full student journey with concurrent synthetic users and report latency as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Synthetic students")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--iterations", type=int, default=1, help="Journeys per student")
+        parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic students and their data")
+
+    def handle(self, *args, **options):
+        StudentUser = get_user_model()
+        prefix = f"loadtest_{uuid.uuid4().hex[:8]}_"
+        # Hash once; every synthetic student shares the password
+        password_hash = make_password(PASSWORD)
+        StudentUser.objects.bulk_create([
+            StudentUser(
+                username=f"{prefix}{i}", email=f"{prefix}{i}@loadtest.edu", student_id=f"{prefix}{i}",
+                password=password_hash, university_name="Load Test University",
+            )
+            for i in range(options["users"])
+        ])
+        usernames = [f"{prefix}{i}" for i in range(options["users"])] * max(options["iterations"], 1)
+
+        timings = defaultdict(list)
+        errors = defaultdict(list)
+        outcomes = {"completed": 0, "failed": 0}
+
+        def run_journey(username):
+            try:
+                Journey(username, timings, errors).run()
+                return True
+            except JourneyFailed:
+                return False
+
+        started = time.perf_counter()
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                    for ok in pool.map(run_journey, usernames):
+                        outcomes["completed" if ok else "failed"] += 1
+            wall = time.perf_counter() - started
+        finally:
+            if not options["keep"]:
+                StudentUser.objects.filter(username__startswith=prefix).delete()
+
+        endpoints = {}
+        for name, samples in timings.items():
+            latencies = sorted(sample * 1000 for sample in samples)
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": len(errors[name]),
+                "error_rate": round(len(errors[name]) / len(latencies), 4),
+                "throughput_rps": round(len(latencies) / wall, 2),
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+                "max_ms": round(latencies[-1], 1),
+                "sample_errors": sorted(set(errors[name]))[:5],
+            }
+
+        total_requests = sum(e["requests"] for e in endpoints.values())
+        report = {
+            "config": {key: options[key] for key in ("users", "concurrency", "iterations")},
+            "wall_seconds": round(wall, 2),
+            "journeys": outcomes,
+            "requests": total_requests,
+            "throughput_rps": round(total_requests / wall, 2),
+            "endpoints": endpoints,
+        }
+
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(text + "\n")
+            self.stdout.write(self.style.SUCCESS(
+                f"🎉 {outcomes['completed']} journeys completed, {outcomes['failed']} failed; "
+                f"report written to {options['output']}"
+            ))
+        else:
+            self.stdout.write(text)
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.avatars import (
+    AVATAR_SIZES, PENDING_DIR, avatar_name, content_hash, finish_variants, is_image, pending_name,
+    store_variants,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build avatar variants for profile pictures uploaded before the avatar pipeline, "
+        "finish uploads whose background processing never completed, and prune pending "
+        "originals left by rolled-back signups"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-minutes", type=int, default=60,
+            help="Only prune unreferenced pending originals older than this (signups may still be committing)",
+        )
+
+    def handle(self, *args, **options):
+        StudentUser = get_user_model()
+        users = (
+            StudentUser.objects.filter(profile_picture_hash="")
+            .exclude(profile_picture="").exclude(profile_picture__isnull=True)
+            .only("id", "profile_picture")
+        )
+
+        processed = missing = 0
+        for user in users.iterator():
+            name = user.profile_picture.name
+            if not default_storage.exists(name):
+                missing += 1
+                continue
+            with default_storage.open(name, "rb") as f:
+                data = f.read()
+            if not is_image(data):
+                self.stdout.write(self.style.ERROR(f" {user.pk}: {name} is not an image"))
+                continue
+
+            digest = content_hash(data)
+            store_variants(digest, data)
+            StudentUser.objects.filter(pk=user.pk).update(profile_picture_hash=digest)
+            processed += 1
+
+        # Uploads whose background job died before storing every variant
+        resumed = lost = 0
+        hashes = StudentUser.objects.exclude(profile_picture_hash="").values_list("profile_picture_hash", flat=True)
+        for digest in hashes.distinct().iterator():
+            if all(default_storage.exists(avatar_name(digest, size)) for size in AVATAR_SIZES):
+                continue
+            name = pending_name(digest)
+            if not default_storage.exists(name):
+                lost += 1
+                self.stdout.write(self.style.ERROR(f" {digest}: variants and pending original are missing"))
+                continue
+            with default_storage.open(name, "rb") as f:
+                finish_variants(digest, f.read())
+            resumed += 1
+
+        pruned = self.prune_pending(StudentUser, timedelta(minutes=options["grace_minutes"]))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n🎉 Done! {processed} profile pictures processed, {missing} missing on disk, "
+            f"{resumed} unfinished uploads completed, {lost} lost, {pruned} stale pending originals pruned."
+        ))
+
+    def prune_pending(self, StudentUser, grace):
+        """
+        Delete pending originals that are done with: their variants exist, or
+        no user refers to them (a signup that rolled back).
+        """
+        if not default_storage.exists(PENDING_DIR):
+            return 0
+        cutoff = timezone.now() - grace
+        pruned = 0
+        for digest in default_storage.listdir(PENDING_DIR)[1]:
+            name = pending_name(digest)
+            if default_storage.get_modified_time(name) > cutoff:
+                continue
+            done = all(default_storage.exists(avatar_name(digest, size)) for size in AVATAR_SIZES)
+            if not done and StudentUser.objects.filter(profile_picture_hash=digest).exists():
+                continue
+            default_storage.delete(name)
+            pruned += 1
+        return pruned
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_remove_studentuser_activity_level_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentuser',
+            name='profile_picture_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
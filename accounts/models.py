@@ -26,6 +26,8 @@ class StudentUser(AbstractUser):
         null=True,
         default='profile_pics/default_user.png'
     )
+    # SHA-256 of the uploaded photo; its avatar variants are named after it
+    profile_picture_hash = models.CharField(max_length=64, blank=True)
 
     # --- Verification & Status ---
     is_verified_university_email = models.BooleanField(default=False)
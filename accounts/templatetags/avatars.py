@@ -0,0 +1,11 @@
+from django import template
+
+from accounts.avatars import avatar_url as variant_url
+
+register = template.Library()
+
+
+@register.filter
+def avatar_url(user, size=256):
+    """``{{ user|avatar_url:130 }}``: smallest stored variant covering ``size`` px, or None."""
+    return variant_url(getattr(user, "profile_picture_hash", ""), int(size))
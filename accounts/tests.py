@@ -1,3 +1,131 @@
-from django.test import TestCase
+import io
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .avatars import (
+    _store_in_background, avatar_url, content_hash, is_image, pending_name, queue_variants, read_upload,
+)
+
+
+def png_bytes(size=(32, 32)):
+    out = io.BytesIO()
+    Image.new("RGB", size, "orange").save(out, "PNG")
+    return out.getvalue()
+
+
+class AvatarUploadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = self.settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def signup(self, **overrides):
+        data = {
+            "username": "alice", "full_name": "Alice", "email": "alice@uni.edu",
+            "password": "pass12345", "confirm_password": "pass12345",
+            "university_name": "Uni", "student_id": "S1",
+            "profile_picture": SimpleUploadedFile("me.png", png_bytes(), "image/png"),
+        }
+        data.update(overrides)
+        return self.client.post(reverse("accounts:register"), data)
+
+    def test_rejects_non_images_and_decompression_bombs(self):
+        self.assertTrue(is_image(png_bytes()))
+        self.assertFalse(is_image(b"not an image"))
+        # Over twice MAX_IMAGE_PIXELS raises DecompressionBombError, which is not an OSError
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            self.assertFalse(is_image(png_bytes((64, 64))))
+
+    def test_variants_are_queued_only_after_the_user_is_committed(self):
+        with mock.patch("accounts.avatars._submit") as submit:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.signup()
+                self.assertFalse(submit.called)
+
+        self.assertRedirects(response, reverse("accounts:login"), fetch_redirect_response=False)
+        self.assertEqual(len(callbacks), 1)
+        user = get_user_model().objects.get(username="alice")
+        submit.assert_called_once_with(user.profile_picture_hash, png_bytes())
+
+    def test_rolled_back_signup_queues_nothing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    queue_variants("ab" * 32, png_bytes())
+                    raise RuntimeError("signup failed")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+
+    def test_oversized_picture_is_rejected_at_signup(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            response = self.signup(
+                profile_picture=SimpleUploadedFile("big.png", png_bytes((64, 64)), "image/png"),
+            )
+
+        self.assertRedirects(response, reverse("accounts:register"), fetch_redirect_response=False)
+        self.assertFalse(get_user_model().objects.exists())
+
+    @override_settings(AVATAR_MAX_UPLOAD_BYTES=50)
+    def test_oversized_upload_is_rejected_before_reading(self):
+        upload = mock.Mock(size=51)
+        self.assertIsNone(read_upload(upload))
+        upload.read.assert_not_called()
+
+        response = self.signup()
+
+        self.assertRedirects(response, reverse("accounts:register"), fetch_redirect_response=False)
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_upload_interrupted_before_variants_is_finished_later(self):
+        digest = content_hash(png_bytes())
+        # The background job never runs, as if the worker died
+        with mock.patch("accounts.avatars._submit"):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.signup()
+        self.assertTrue(default_storage.exists(pending_name(digest)))
+        self.assertIsNone(avatar_url(digest, 64))
+
+        out = StringIO()
+        call_command("process_profile_pictures", stdout=out)
+
+        self.assertIn("1 unfinished uploads completed, 0 lost", out.getvalue())
+        self.assertIsNotNone(avatar_url(digest, 64))
+        self.assertFalse(default_storage.exists(pending_name(digest)))
+
+    def test_background_job_drops_the_pending_original(self):
+        digest = content_hash(png_bytes())
+        with mock.patch("accounts.avatars._submit", side_effect=lambda *args: _store_in_background(*args)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.signup()
+
+        self.assertIsNotNone(avatar_url(digest, 256))
+        self.assertFalse(default_storage.exists(pending_name(digest)))
+
+    def test_pending_original_of_rolled_back_signup_is_pruned(self):
+        digest = content_hash(png_bytes())
+        with self.captureOnCommitCallbacks():
+            try:
+                with transaction.atomic():
+                    queue_variants(digest, png_bytes())
+                    raise RuntimeError("signup failed")
+            except RuntimeError:
+                pass
+        self.assertTrue(default_storage.exists(pending_name(digest)))
+
+        call_command("process_profile_pictures", "--grace-minutes", "0", stdout=StringIO())
+
+        self.assertFalse(default_storage.exists(pending_name(digest)))
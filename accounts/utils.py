@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+UNIQUE_SIGNUP_FIELDS = ("username", "email", "student_id")
+
+# Messages shown for each colliding field, in the order they are reported
+COLLISION_MESSAGES = {
+    "username": "Username already taken.",
+    "email": "Email already registered.",
+    "student_id": "Student ID already registered.",
+}
+
+
+def find_signup_collisions(username, email, student_id):
+    """
+    Which of username / email / student_id already belong to an account,
+    answered by a single query. Returns the field names in
+    UNIQUE_SIGNUP_FIELDS order.
+    """
+    wanted = {"username": username, "email": email, "student_id": student_id}
+    rows = (
+        get_user_model().objects
+        .filter(Q(username=username) | Q(email=email) | Q(student_id=student_id))
+        .values_list(*UNIQUE_SIGNUP_FIELDS)[:len(UNIQUE_SIGNUP_FIELDS)]
+    )
+    taken = set()
+    for row in rows:
+        taken.update(field for field, value in zip(UNIQUE_SIGNUP_FIELDS, row) if value == wanted[field])
+    return [field for field in UNIQUE_SIGNUP_FIELDS if field in taken]
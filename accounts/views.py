@@ -2,6 +2,10 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import get_user_model, authenticate, login as auth_login, logout as auth_logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError, transaction
+
+from .avatars import max_upload_bytes, queue_variants, read_upload
+from .utils import COLLISION_MESSAGES, find_signup_collisions
 
 StudentUser = get_user_model()
 
@@ -14,7 +18,7 @@ def register(request):
         email = request.POST.get("email", "").strip().lower()
         password = request.POST.get("password")
         confirm_password = request.POST.get("confirm_password")
-        gender = request.POST.get("gender")
+        gender = request.POST.get("gender", "")
         age = request.POST.get("age")
         university_name = request.POST.get("university_name", "").strip()
         student_id = request.POST.get("student_id", "").strip()
@@ -29,38 +33,52 @@ def register(request):
             messages.error(request, "Passwords do not match.")
             return redirect("accounts:register")
 
-        if StudentUser.objects.filter(username=username).exists():
-            messages.error(request, "Username already taken.")
-            return redirect("accounts:register")
-
-        if StudentUser.objects.filter(email=email).exists():
-            messages.error(request, "Email already registered.")
+        # One query for all three unique fields, before paying for password hashing
+        collisions = find_signup_collisions(username, email, student_id)
+        if collisions:
+            for field in collisions:
+                messages.error(request, COLLISION_MESSAGES[field])
             return redirect("accounts:register")
 
-        if StudentUser.objects.filter(student_id=student_id).exists():
-            messages.error(request, "Student ID already registered.")
-            return redirect("accounts:register")
+        # Hash and sniff the photo now; resizing happens in the background
+        upload = None
+        if profile_picture:
+            upload = read_upload(profile_picture)
+            if upload is None:
+                messages.error(
+                    request,
+                    f"Profile picture must be an image file of at most {max_upload_bytes() // (1024 * 1024)} MB.",
+                )
+                return redirect("accounts:register")
 
         # Convert age safely
         age_value = int(age) if age else None
 
         # === Create User ===
-        user = StudentUser.objects.create_user(
-            username=username,
-            password=password,
-            full_name=full_name,
-            email=email,
-            gender=gender,
-            age=age_value,
-            university_name=university_name,
-            student_id=student_id,
-            is_verified_university_email=True
-        )
-
-        # Add profile picture if uploaded
-        if profile_picture:
-            user.profile_picture = profile_picture
-            user.save()
+        # The unique constraints settle signups racing past the check above
+        try:
+            with transaction.atomic():
+                StudentUser.objects.create_user(
+                    username=username,
+                    password=password,
+                    full_name=full_name,
+                    email=email,
+                    gender=gender,
+                    age=age_value,
+                    university_name=university_name,
+                    student_id=student_id,
+                    profile_picture_hash=upload[0] if upload else "",
+                    is_verified_university_email=True
+                )
+                if upload:
+                    queue_variants(*upload)
+        except IntegrityError:
+            collisions = find_signup_collisions(username, email, student_id)
+            for field in collisions:
+                messages.error(request, COLLISION_MESSAGES[field])
+            if not collisions:
+                messages.error(request, "Could not create your account, please try again.")
+            return redirect("accounts:register")
 
         messages.success(request, "🎉 Account created successfully! You can now log in.")
         return redirect("accounts:login")
@@ -0,0 +1,10 @@
+"""
+Microbenchmarks for the recommender, normalizer, grocery and plan
+generator hot paths.
+
+``cases.py`` holds the benchmarks; each takes a pytest-benchmark style
+``benchmark`` callable plus a prepared ``ctx``. ``runner.py`` supplies a
+compatible ``Benchmark``, times every case against synthetic catalogs of
+several sizes in a throwaway test database, and keeps a JSON history with
+a regression check. Run them with ``python manage.py run_benchmarks``.
+"""
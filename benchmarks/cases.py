@@ -0,0 +1,112 @@
+"""
+Benchmark cases.
+
+Every case is ``case(benchmark, ctx)``: ``benchmark(fn, *args, **kwargs)``
+times ``fn`` exactly like pytest-benchmark's fixture, so the same function
+works with either runner (``manage.py run_benchmarks``, or ``pytest
+benchmarks --benchmark-only`` through conftest.py). ``ctx`` is built once
+per catalog size by ``build_context``.
+"""
+
+import io
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from grocery.utils import compare_outlet_prices, create_shopping_list_from_mealplan
+from leftovers.recommendations import (
+    find_meals_from_leftovers,
+    meal_recommend_tfidf,
+    rule_based_ranking,
+    substitution_match,
+)
+from meal.models import Meal, MealPlan, MealQuiz
+from meal.normalization import normalize_ingredient
+
+LEFTOVERS = ["Chicken", "rice", "Tomatoes", "onion", "garlic", "eggs", "milk"]
+SAMPLE_SIZE = 500
+
+
+def build_context(size, previous=None):
+    """
+    Grow the (test) database's catalog to ``size`` meals with seed_scale_data
+    and gather the inputs every case needs.
+    """
+    missing = size - Meal.objects.count()
+    if missing > 0:
+        call_command(
+            "seed_scale_data", seed=size, meals=missing, users=2 if previous is None else 0,
+            plans_per_user=1, log_days=0, lists_per_user=0, outlets=8,
+            end_date=date(2026, 1, 4), stdout=io.StringIO(),
+        )
+
+    if previous is not None:
+        ctx = dict(previous)
+    else:
+        plan = MealPlan.objects.select_related("user").order_by("pk").first()
+        user = plan.user
+        MealQuiz.objects.update_or_create(user=user, defaults={
+            "goal": "general_health", "food_preference": "omnivore", "meal_frequency": "3_meals",
+        })
+        client = Client()
+        client.force_login(user)
+        ctx = {
+            "user": user,
+            "plan": plan,
+            "client": client,
+            "shopping_list": create_shopping_list_from_mealplan(user, plan),
+        }
+
+    texts = list(Meal.objects.order_by("pk").values_list("ingredients", flat=True)[:SAMPLE_SIZE])
+    ctx["ingredient_texts"] = [text.lower() for text in texts]
+    ctx["raw_ingredients"] = [part for text in texts for part in text.split(", ")][:SAMPLE_SIZE]
+    ctx["tfidf_meals"] = meal_recommend_tfidf(LEFTOVERS)
+    return ctx
+
+
+def bench_normalize_ingredient(benchmark, ctx):
+    """Uncached normalization of SAMPLE_SIZE raw catalog ingredient strings."""
+    normalize = normalize_ingredient.__wrapped__
+    benchmark(lambda: [normalize(raw) for raw in ctx["raw_ingredients"]])
+
+
+def bench_substitution_match(benchmark, ctx):
+    benchmark(lambda: [substitution_match(LEFTOVERS, text) for text in ctx["ingredient_texts"]])
+
+
+def bench_meal_recommend_tfidf(benchmark, ctx):
+    benchmark(meal_recommend_tfidf, LEFTOVERS)
+
+
+def bench_rule_based_ranking(benchmark, ctx):
+    benchmark(rule_based_ranking, ctx["tfidf_meals"], LEFTOVERS)
+
+
+def bench_find_meals_from_leftovers(benchmark, ctx):
+    benchmark(find_meals_from_leftovers, LEFTOVERS)
+
+
+def bench_create_shopping_list_from_mealplan(benchmark, ctx):
+    benchmark(create_shopping_list_from_mealplan, ctx["user"], ctx["plan"])
+
+
+def bench_compare_outlet_prices(benchmark, ctx):
+    benchmark(compare_outlet_prices, ctx["shopping_list"])
+
+
+def bench_generate_meal_plan(benchmark, ctx):
+    """The whole view through the test client (filter, sampling, inserts, redirect)."""
+    url = reverse("meal:generate")
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        benchmark(ctx["client"].get, url)
+
+
+CASES = {
+    name.removeprefix("bench_"): case
+    for name, case in list(globals().items())
+    if name.startswith("bench_") and callable(case)
+}
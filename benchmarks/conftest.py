@@ -0,0 +1,64 @@
+"""
+pytest entry point for the cases in ``cases.py``::
+
+    pytest benchmarks --benchmark-only --sizes 1000,10000
+
+Every case runs once per catalog size against a throwaway test database,
+like ``manage.py run_benchmarks``. The ``ctx`` fixture builds each size
+once, growing the catalog from the previous one. Without pytest-benchmark
+installed, ``benchmark`` is the runner's stand-in and timings are not
+reported.
+"""
+
+import os
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_meal_planner.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from benchmarks.cases import build_context  # noqa: E402
+from benchmarks.runner import Benchmark  # noqa: E402
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    @pytest.fixture
+    def benchmark():
+        return Benchmark()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--sizes", default="1000", help="Comma-separated catalog sizes (meals)")
+
+
+def pytest_generate_tests(metafunc):
+    if "ctx" in metafunc.fixturenames:
+        option = metafunc.config.getoption("sizes")
+        try:
+            sizes = sorted({int(size) for size in option.split(",") if size.strip()})
+        except ValueError:
+            raise pytest.UsageError("--sizes must be comma-separated integers")
+        # Session scope groups the cases by size, smallest first
+        metafunc.parametrize("catalog_size", sizes, scope="session")
+
+
+@pytest.fixture(scope="session")
+def test_database():
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+_contexts = {}
+
+
+@pytest.fixture(scope="session")
+def ctx(test_database, catalog_size):
+    previous = _contexts[max(_contexts)] if _contexts else None
+    _contexts[catalog_size] = build_context(catalog_size, previous)
+    return _contexts[catalog_size]
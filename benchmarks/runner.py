@@ -0,0 +1,132 @@
+"""
+Timing, history and regression comparison for the benchmark cases.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+
+class Benchmark:
+    """
+    Minimal stand-in for pytest-benchmark's ``benchmark`` fixture: calling it
+    runs ``fn`` for at least ``min_rounds`` rounds and ``min_time`` seconds
+    (capped at ``max_rounds``), records the timings and returns the last result.
+    """
+
+    def __init__(self, min_rounds=3, max_rounds=50, min_time=0.5, warmup=1):
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.min_time = min_time
+        self.warmup = warmup
+        self.timings = []
+
+    def __call__(self, fn, *args, **kwargs):
+        result = None
+        for _ in range(self.warmup):
+            result = fn(*args, **kwargs)
+
+        started = time.perf_counter()
+        while len(self.timings) < self.max_rounds and (
+            len(self.timings) < self.min_rounds or time.perf_counter() - started < self.min_time
+        ):
+            round_started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.timings.append(time.perf_counter() - round_started)
+        return result
+
+    def pedantic(self, fn, args=(), kwargs=None, setup=None, rounds=1, iterations=1, warmup_rounds=0):
+        kwargs = kwargs or {}
+        result = None
+        for _ in range(warmup_rounds):
+            result = fn(*args, **kwargs)
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            round_started = time.perf_counter()
+            for _ in range(iterations):
+                result = fn(*args, **kwargs)
+            self.timings.append((time.perf_counter() - round_started) / iterations)
+        return result
+
+    def stats(self):
+        ms = [t * 1000 for t in self.timings]
+        return {
+            "rounds": len(ms),
+            "min_ms": round(min(ms), 4),
+            "median_ms": round(statistics.median(ms), 4),
+            "mean_ms": round(statistics.fmean(ms), 4),
+            "stdev_ms": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+        }
+
+
+def result_key(case, size):
+    return f"{case}[{size}]"
+
+
+def git_revision(cwd):
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd,
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def new_entry(results, label=None, cwd=None):
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "label": label,
+        "git_rev": git_revision(cwd),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def find_baseline(history, baseline=None):
+    """The entry labelled ``baseline``, or the most recent one."""
+    if baseline is None:
+        return history[-1] if history else None
+    for entry in reversed(history):
+        if entry.get("label") == baseline:
+            return entry
+    return None
+
+
+def compare(baseline, current, threshold):
+    """
+    Rows of (key, baseline median, current median, ratio, regressed) for
+    the cases present in both runs. Medians are compared since they are
+    the least sensitive to one-off hiccups.
+    """
+    rows = []
+    for key, stats in current["results"].items():
+        before = baseline["results"].get(key)
+        if not before:
+            continue
+        ratio = stats["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+        rows.append((key, before["median_ms"], stats["median_ms"], ratio, ratio > 1 + threshold))
+    return rows
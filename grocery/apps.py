@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GroceryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'grocery'
+
+    def ready(self):
+        from grocery import signals  # noqa: F401
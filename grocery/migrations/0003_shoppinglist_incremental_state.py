@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grocery', '0002_shoppinglistitem_is_purchased'),
+        ('meal', '0007_mealquiz_food_preference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='ingredient_counts',
+            field=models.JSONField(blank=True, default=dict, help_text='Normalized ingredient -> count across all plan items'),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='meal_plan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shopping_lists', to='meal.mealplan'),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='source_items',
+            field=models.JSONField(blank=True, default=dict, help_text='Plan item id -> fingerprint and counted ingredients'),
+        ),
+        migrations.AddField(
+            model_name='shoppinglistitem',
+            name='name',
+            field=models.CharField(blank=True, help_text='Normalized ingredient this row counts', max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grocery', '0003_shoppinglist_incremental_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='cost_shares',
+            field=models.JSONField(blank=True, default=dict, help_text='Username -> share of total cost (household lists)'),
+        ),
+    ]
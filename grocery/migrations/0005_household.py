@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:41
+
+import django.db.models.deletion
+import grocery.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grocery', '0004_shoppinglist_cost_shares'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Household',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('invite_token', models.CharField(default=grocery.models.new_invite_token, max_length=32, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_households', to=settings.AUTH_USER_MODEL)),
+                ('members', models.ManyToManyField(related_name='households', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
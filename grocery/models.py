@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from decimal import Decimal
+import secrets
 
 
 class GroceryOutlet(models.Model):
@@ -20,10 +21,50 @@ class GroceryItem(models.Model):
         return f"{self.name} (${self.base_price})"
 
 
+def new_invite_token():
+    return secrets.token_urlsafe(12)
+
+
+class Household(models.Model):
+    """
+    Students who share groceries. Joining (with the invite token) is what
+    lets the other members merge your meal plans into a household list.
+    """
+    name = models.CharField(max_length=100)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="created_households"
+    )
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name="households")
+    invite_token = models.CharField(max_length=32, unique=True, default=new_invite_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
 class ShoppingList(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    meal_plan = models.ForeignKey(
+        'meal.MealPlan', null=True, blank=True,
+        on_delete=models.SET_NULL, related_name="shopping_lists"
+    )
     title = models.CharField(max_length=255, default="Weekly Shopping List")
     total_cost = models.DecimalField(max_digits=8, decimal_places=2, default=0.0)
+
+    # Incremental regeneration state
+    source_items = models.JSONField(
+        default=dict, blank=True,
+        help_text="Plan item id -> fingerprint and counted ingredients"
+    )
+    ingredient_counts = models.JSONField(
+        default=dict, blank=True,
+        help_text="Normalized ingredient -> count across all plan items"
+    )
+    cost_shares = models.JSONField(
+        default=dict, blank=True,
+        help_text="Username -> share of total cost (household lists)"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -33,6 +74,7 @@ class ShoppingList(models.Model):
 class ShoppingListItem(models.Model):
     shopping_list = models.ForeignKey(ShoppingList, related_name="items", on_delete=models.CASCADE)
     item = models.ForeignKey(GroceryItem, on_delete=models.CASCADE)
+    name = models.CharField(max_length=100, blank=True, help_text="Normalized ingredient this row counts")
     quantity = models.PositiveIntegerField(default=1)
     cost = models.DecimalField(max_digits=8, decimal_places=2, default=0.0)
     is_purchased = models.BooleanField(default=False)
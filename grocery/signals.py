@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from grocery.models import GroceryItem, GroceryOutlet, ShoppingListItem
+from grocery.utils import bump_price_version, invalidate_outlet_comparison
+
+
+@receiver([post_save, post_delete], sender=GroceryOutlet)
+@receiver([post_save, post_delete], sender=GroceryItem)
+def prices_changed(sender, **kwargs):
+    """Outlet price factors or base prices changed: every comparison is stale."""
+    bump_price_version()
+
+
+@receiver([post_save, post_delete], sender=ShoppingListItem)
+def shopping_list_item_changed(sender, instance, update_fields=None, **kwargs):
+    # Ticking an item off doesn't change what it costs
+    if update_fields is not None and set(update_fields) <= {"is_purchased"}:
+        return
+    invalidate_outlet_comparison(instance.shopping_list_id)
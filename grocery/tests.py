@@ -1,3 +1,330 @@
-from django.test import TestCase
+import json
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from grocery.models import GroceryItem, GroceryOutlet, Household, ShoppingList, ShoppingListItem
+from grocery.utils import (
+    OUTLET_COMPARISON_KEY, PRICE_VERSION_KEY, create_shopping_list_from_mealplan, get_outlet_comparison,
+    refresh_shopping_list, resolve_grocery_items,
+)
+from meal.models import Meal, MealPlan, MealPlanItem
+from smart_meal_planner.routers import use_replicas
+
+
+def make_student(username):
+    return get_user_model().objects.create_user(
+        username=username, password="pass12345",
+        student_id=f"{username}-id", email=f"{username}@uni.example",
+    )
+
+
+def make_plan(user, *meals):
+    plan = MealPlan.objects.create(user=user)
+    for meal in meals:
+        MealPlanItem.objects.create(meal_plan=plan, meal=meal, day_of_week="monday", meal_time="dinner")
+    return plan
+
+
+class HouseholdShoppingListTests(TestCase):
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.bob = make_student("bob")
+        self.curry = Meal.objects.create(name="Chicken Curry", ingredients="Chicken, Rice, Onion")
+        self.pasta = Meal.objects.create(name="Tomato Pasta", ingredients="Pasta, Tomato, Onion")
+        self.client.force_login(self.alice)
+
+    def test_merges_own_plans(self):
+        first = make_plan(self.alice, self.curry)
+        second = make_plan(self.alice, self.pasta)
+
+        response = self.client.post(reverse("grocery:household_list"), {"plan_ids": [first.id, second.id]})
+
+        shopping_list = ShoppingList.objects.get(user=self.alice)
+        self.assertRedirects(response, reverse("grocery:shopping_list_detail", args=[shopping_list.id]),
+                             fetch_redirect_response=False)
+        self.assertEqual(shopping_list.ingredient_counts["onion"], 2)
+        self.assertEqual(set(shopping_list.cost_shares), {"alice"})
+
+    def test_other_students_plan_is_not_found(self):
+        own = make_plan(self.alice, self.curry)
+        other = make_plan(self.bob, self.pasta)
+
+        response = self.client.post(reverse("grocery:household_list"), {"plan_ids": f"{own.id},{other.id}"})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ShoppingList.objects.exists())
+
+    def test_unknown_plan_is_not_found(self):
+        own = make_plan(self.alice, self.curry)
+
+        response = self.client.post(reverse("grocery:household_list"), {"plan_ids": [own.id, own.id + 100]})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_selection_redirects_back(self):
+        response = self.client.post(reverse("grocery:household_list"), {"plan_ids": ""})
+
+        self.assertRedirects(response, reverse("meal:plan"), fetch_redirect_response=False)
+        self.assertFalse(ShoppingList.objects.exists())
+
+    def make_household(self, *members):
+        household = Household.objects.create(name="Flat 4B", created_by=members[0])
+        household.members.add(*members)
+        return household
+
+    def test_merges_household_members_plans_with_per_person_shares(self):
+        household = self.make_household(self.alice, self.bob)
+        own = make_plan(self.alice, self.curry)
+        flatmate = make_plan(self.bob, self.pasta, self.pasta)
+
+        self.client.post(reverse("grocery:household_list"), {
+            "household_id": household.id, "plan_ids": [own.id, flatmate.id],
+        })
+
+        shopping_list = ShoppingList.objects.get(user=self.alice)
+        # Every placeholder item costs 1.50; alice's onion is one of three
+        self.assertEqual(shopping_list.cost_shares, {"alice": "4.50", "bob": "9.00"})
+        self.assertEqual(shopping_list.total_cost, Decimal("13.50"))
+
+    def test_household_plans_need_membership(self):
+        household = self.make_household(self.alice)
+        own = make_plan(self.alice, self.curry)
+        outsider = make_plan(self.bob, self.pasta)
+
+        response = self.client.post(reverse("grocery:household_list"), {
+            "household_id": household.id, "plan_ids": [own.id, outsider.id],
+        })
+        self.assertEqual(response.status_code, 404)
+
+        # Nor can a student merge plans through someone else's household
+        foreign = self.make_household(self.bob)
+        response = self.client.post(reverse("grocery:household_list"), {
+            "household_id": foreign.id, "plan_ids": [outsider.id],
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ShoppingList.objects.exists())
+
+
+class HouseholdMembershipTests(TestCase):
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.bob = make_student("bob")
+
+    def test_create_join_and_leave(self):
+        self.client.force_login(self.alice)
+        self.client.post(reverse("grocery:create_household"), {"name": "Flat 4B"})
+        household = Household.objects.get(name="Flat 4B")
+        self.assertEqual(list(household.members.all()), [self.alice])
+
+        self.client.force_login(self.bob)
+        self.client.post(reverse("grocery:join_household"), {"invite_token": household.invite_token})
+        self.assertEqual(set(household.members.all()), {self.alice, self.bob})
+
+        self.client.post(reverse("grocery:leave_household", args=[household.id]))
+        self.assertEqual(list(household.members.all()), [self.alice])
+
+    def test_invalid_invite_code_joins_nothing(self):
+        household = Household.objects.create(name="Flat 4B", created_by=self.alice)
+        household.members.add(self.alice)
+        self.client.force_login(self.bob)
+
+        for token in ("", "guess"):
+            with self.subTest(token=token):
+                self.client.post(reverse("grocery:join_household"), {"invite_token": token})
+        self.assertEqual(list(household.members.all()), [self.alice])
+
+    def test_page_lists_members_plans(self):
+        household = Household.objects.create(name="Flat 4B", created_by=self.alice)
+        household.members.add(self.alice, self.bob)
+        plan = make_plan(self.bob)
+        self.client.force_login(self.alice)
+
+        response = self.client.get(reverse("grocery:households"))
+
+        self.assertContains(response, household.invite_token)
+        self.assertContains(response, f'name="plan_ids" value="{plan.id}"')
+
+
+class SyncItemStatusTests(TestCase):
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.client.force_login(self.alice)
+        rice = GroceryItem.objects.create(name="rice", base_price="1.20")
+        onion = GroceryItem.objects.create(name="onion", base_price="0.40")
+        shopping_list = ShoppingList.objects.create(user=self.alice)
+        self.rice = ShoppingListItem.objects.create(shopping_list=shopping_list, item=rice, name="rice")
+        self.onion = ShoppingListItem.objects.create(shopping_list=shopping_list, item=onion, name="onion")
+
+    def sync(self, changes):
+        return self.client.post(
+            reverse("grocery:sync_item_status"), json.dumps({"changes": changes}),
+            content_type="application/json",
+        )
+
+    def test_applies_batch_with_last_change_winning(self):
+        response = self.sync([
+            {"id": self.rice.id, "purchased": True},
+            {"id": self.onion.id, "purchased": True},
+            {"id": self.onion.id, "purchased": False},
+        ])
+
+        self.assertEqual(response.json()["items"], {str(self.rice.id): True, str(self.onion.id): False})
+        self.rice.refresh_from_db()
+        self.assertTrue(self.rice.is_purchased)
+
+    def test_ignores_other_students_items(self):
+        bob = make_student("bob")
+        foreign = ShoppingListItem.objects.create(
+            shopping_list=ShoppingList.objects.create(user=bob), item=self.rice.item, name="rice",
+        )
+
+        response = self.sync([{"id": foreign.id, "purchased": True}])
+
+        self.assertEqual(response.json()["items"], {})
+        foreign.refresh_from_db()
+        self.assertFalse(foreign.is_purchased)
+
+    def test_rejects_malformed_changes(self):
+        for changes in (
+            [{"id": self.rice.id, "purchased": "false"}],
+            [{"id": self.rice.id, "purchased": 1}],
+            [{"purchased": True}],
+            [{"id": str(self.rice.id), "purchased": True}],
+            [{"id": True, "purchased": True}],
+            "rice",
+        ):
+            with self.subTest(changes=changes):
+                self.assertEqual(self.sync(changes).status_code, 400)
+        self.rice.refresh_from_db()
+        self.assertFalse(self.rice.is_purchased)
+
+
+class RefreshShoppingListTests(TestCase):
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.curry = Meal.objects.create(name="Chicken Curry", ingredients="Chicken, Rice, Onion")
+        self.pasta = Meal.objects.create(name="Tomato Pasta", ingredients="Pasta, Tomato, Onion")
+        self.salad = Meal.objects.create(name="Salad", ingredients="Lettuce, Tomato")
+        self.plan = make_plan(self.alice, self.curry, self.pasta)
+        self.shopping_list = create_shopping_list_from_mealplan(self.alice, self.plan)
+
+    def rows(self):
+        return {row.name: row for row in self.shopping_list.items.all()}
+
+    def test_unchanged_plan_writes_nothing(self):
+        with self.assertNumQueries(1):
+            refresh_shopping_list(self.shopping_list)
+
+    def test_applies_only_the_changes(self):
+        before = self.rows()
+        ShoppingListItem.objects.filter(id=before["rice"].id).update(is_purchased=True)
+        self.plan.mealplanitem_set.filter(meal=self.pasta).delete()
+        MealPlanItem.objects.create(meal_plan=self.plan, meal=self.salad, day_of_week="tuesday", meal_time="lunch")
+
+        with CaptureQueriesContext(connection) as queries:
+            refresh_shopping_list(self.shopping_list)
+
+        after = self.rows()
+        self.assertEqual({name: row.quantity for name, row in after.items()},
+                         {"chicken": 1, "rice": 1, "onion": 1, "tomato": 1, "lettuce": 1})
+        self.assertTrue(after["rice"].is_purchased)
+        # Untouched rows are the same rows; only onion's quantity changed
+        for name in ("chicken", "rice", "onion", "tomato"):
+            self.assertEqual(after[name].id, before[name].id)
+        self.assertEqual(self.shopping_list.total_cost, sum(row.cost for row in after.values()))
+
+        # One statement per kind of change: new grocery item, stale row,
+        # changed row, new row, list totals
+        writes = [q["sql"] for q in queries.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+        self.assertEqual([sql.split(" WHERE ")[0].split(" (")[0].split(" SET ")[0] for sql in writes], [
+            'INSERT INTO "grocery_groceryitem"',
+            'DELETE FROM "grocery_shoppinglistitem"',
+            'UPDATE "grocery_shoppinglistitem"',
+            'INSERT INTO "grocery_shoppinglistitem"',
+            'UPDATE "grocery_shoppinglist"',
+        ])
+        self.assertTrue(writes[1].endswith(f"IN ({before['pasta'].id})"))
+        self.assertTrue(writes[2].endswith(f"IN ({before['onion'].id})"))
+
+
+@override_settings(DATABASE_REPLICAS=["default"])
+class ResolveGroceryItemsTests(TestCase):
+    def test_lookup_alone_does_not_pin_the_request(self):
+        GroceryItem.objects.create(name="basmati rice", base_price="2.00")
+
+        with use_replicas() as scope:
+            resolved = resolve_grocery_items(["rice"])
+            self.assertFalse(scope.wrote)
+
+        self.assertEqual(resolved["rice"].name, "basmati rice")
+
+    def test_creating_placeholders_pins_the_request(self):
+        with use_replicas() as scope:
+            resolve_grocery_items(["saffron"])
+            self.assertTrue(scope.wrote)
+
+
+class OutletComparisonCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.rice = GroceryItem.objects.create(name="rice", base_price="2.00")
+        self.outlet = GroceryOutlet.objects.create(name="Campus Mart", price_factor=1.5)
+        self.shopping_list = ShoppingList.objects.create(user=make_student("alice"))
+        self.row = ShoppingListItem.objects.create(
+            shopping_list=self.shopping_list, item=self.rice, name="rice", quantity=2, cost="4.00",
+        )
+
+    def totals(self):
+        return {r["outlet"]: r["total"] for r in get_outlet_comparison(self.shopping_list)}
+
+    def assertCached(self):
+        with self.assertNumQueries(0):
+            get_outlet_comparison(self.shopping_list)
+
+    def test_repeat_reads_are_cached(self):
+        self.assertEqual(self.totals(), {"Campus Mart": Decimal("6.00")})
+        self.assertCached()
+
+    def test_price_changes_bump_the_version(self):
+        self.totals()
+        version = cache.get(PRICE_VERSION_KEY)
+
+        self.rice.base_price = Decimal("3.00")
+        self.rice.save()
+        self.assertNotEqual(cache.get(PRICE_VERSION_KEY), version)
+        self.assertEqual(self.totals(), {"Campus Mart": Decimal("9.00")})
+
+        GroceryOutlet.objects.create(name="Discounter", price_factor=0.5)
+        self.assertEqual(self.totals(), {"Campus Mart": Decimal("9.00"), "Discounter": Decimal("3.00")})
+
+        self.outlet.delete()
+        self.assertEqual(self.totals(), {"Discounter": Decimal("3.00")})
+
+    def test_ticking_an_item_off_keeps_the_entry(self):
+        self.totals()
+
+        self.row.is_purchased = True
+        self.row.save(update_fields=["is_purchased"])
+
+        self.assertCached()
+
+    def test_other_list_changes_drop_the_entry(self):
+        key = OUTLET_COMPARISON_KEY.format(self.shopping_list.id)
+        self.totals()
+
+        self.row.quantity = 3
+        self.row.save()
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(self.totals(), {"Campus Mart": Decimal("9.00")})
+
+        self.row.delete()
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(self.totals(), {"Campus Mart": Decimal("0.00")})
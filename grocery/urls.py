@@ -5,6 +5,12 @@ app_name = "grocery"
 
 urlpatterns = [
     path("generate/<int:plan_id>/", views.generate_shopping_list, name="generate_from_plan"),
+    path("household/", views.household_shopping_list, name="household_list"),
+    path("households/", views.households, name="households"),
+    path("households/create/", views.create_household, name="create_household"),
+    path("households/join/", views.join_household, name="join_household"),
+    path("households/<int:pk>/leave/", views.leave_household, name="leave_household"),
     path("list/<int:pk>/", views.shopping_list_detail, name="shopping_list_detail"),
     path("toggle-item/<int:item_id>/", views.toggle_item_status, name="toggle_item_status"),
+    path("sync-items/", views.sync_item_status, name="sync_item_status"),
 ]
@@ -1,116 +1,340 @@
 from grocery.models import GroceryItem, ShoppingList, ShoppingListItem, GroceryOutlet
+from meal.models import MealPlanItem
+from meal.normalization import normalize_ingredient
+from smart_meal_planner.metrics import SHOPPING_LISTS_CREATED, STAGE_SECONDS, timed
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
 from decimal import Decimal
 from collections import Counter
-import re
-
-
-def normalize_ingredient(name):
-    """Clean and normalize ingredient names."""
-    # Remove quantities and parentheses
-    name = re.sub(r"\(.*?\)", "", name).strip().lower()
-
-    # Simplify plurals (e.g., onions → onion)
-    if name.endswith("s") and len(name) > 3:
-        name = name[:-1]
-
-    # Basic normalization mapping
-    common_map = {
-        "red onion": "onion",
-        "yellow onion": "onion",
-        "white onion": "onion",
-        "garlic clove": "garlic",
-        "clove garlic": "garlic",
-        "bell pepper": "pepper",
-        "red pepper": "pepper",
-        "green pepper": "pepper",
-        "olive oil": "oil",
-        "vegetable oil": "oil",
-        "butter": "butter",
-        "egg": "eggs",
-        "tomatoes": "tomato",
-        "potatoes": "potato",
-        "chilies": "chili",
-        "chillies": "chili",
-        "milk": "milk",
-        "cheese": "cheese",
-    }
-    for key, val in common_map.items():
-        if key in name:
-            name = val
-            break
+import hashlib
+import time
+
+
+# Ignore generic, trivial ingredients
+IGNORE_LIST = {
+    "salt", "water", "oil", "pepper", "sugar",
+    "flour", "seasoning", "spices", "stock", "broth",
+    "butter", "vinegar"
+}
+
+# Reduce to top N by frequency for simplicity
+MAX_LIST_ITEMS = 25
+
+
+def plan_item_fingerprint(item):
+    """Content fingerprint of a plan item: changes when its meal or ingredients do."""
+    content = f"{item.meal_id}|{item.meal.ingredients or ''}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def parse_meal_ingredients(meal):
+    """Normalized, countable ingredient names for a single meal."""
+    names = []
+    for i in (meal.ingredients or "").split(","):
+        name = normalize_ingredient(i)
+        if name and name not in IGNORE_LIST and len(name) > 2:
+            names.append(name)
+    return names
+
+
+def top_ingredients(counts):
+    """
+    Most frequent ingredients that make it onto the list.
+
+    Ties are broken by name so incremental refreshes pick the same items
+    as a full rebuild.
+    """
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return dict(ranked[:MAX_LIST_ITEMS])
+
+
+def resolve_grocery_items(names):
+    """
+    Map ingredient names to GroceryItems in bulk.
+
+    Each name resolves to the oldest item whose name contains it (the same
+    rule as a per-name ``name__icontains`` lookup), using one candidate
+    query plus one insert for any placeholders that have to be created.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    match_any = Q()
+    for name in names:
+        match_any |= Q(name__icontains=name)
+    # Check-then-create: read from the primary so a replica's lag cannot duplicate items.
+    # Not via db_for_write, which would pin the request to the primary even when
+    # nothing turns out to be created
+    candidates = list(
+        GroceryItem.objects.using(DEFAULT_DB_ALIAS).filter(match_any).order_by("pk")
+    )
+
+    resolved, placeholders = {}, []
+    for name in names:
+        for grocery_item in candidates + placeholders:
+            if name.lower() in grocery_item.name.lower():
+                resolved[name] = grocery_item
+                break
+        else:
+            # Create placeholder if not found
+            placeholder = GroceryItem(name=name, base_price=Decimal("1.50"))
+            placeholders.append(placeholder)
+            resolved[name] = placeholder
 
-    return name.strip()
+    GroceryItem.objects.bulk_create(placeholders)
+    return resolved
 
 
+@timed(STAGE_SECONDS, operation="create_shopping_list_from_mealplan", stage="total")
 def create_shopping_list_from_mealplan(user, mealplan):
     """Generate a simplified and realistic shopping list from the meal plan."""
-    ingredients = []
+    source_items = {}
+    counts = Counter()
 
     # Collect all meal ingredients
     for item in mealplan.mealplanitem_set.select_related("meal"):
-        ing_str = item.meal.ingredients or ""
-        for i in ing_str.split(","):
-            name = normalize_ingredient(i)
-            if name:
-                ingredients.append(name)
-
-    counts = Counter(ingredients)
-
-    # Ignore generic, trivial ingredients
-    ignore_list = {
-        "salt", "water", "oil", "pepper", "sugar",
-        "flour", "seasoning", "spices", "stock", "broth",
-        "butter", "vinegar"
-    }
-
-    filtered_counts = {
-        name: qty for name, qty in counts.items()
-        if name not in ignore_list and len(name) > 2
-    }
-
-    # Reduce to top 25 by frequency for simplicity
-    top_items = dict(Counter(filtered_counts).most_common(25))
+        names = parse_meal_ingredients(item.meal)
+        source_items[str(item.id)] = {
+            "fingerprint": plan_item_fingerprint(item),
+            "ingredients": names,
+        }
+        counts.update(names)
 
     # Create shopping list
     shopping_list = ShoppingList.objects.create(
-        user=user, title=f"Shopping List for {mealplan.week_start_date}"
+        user=user,
+        meal_plan=mealplan,
+        title=f"Shopping List for {mealplan.week_start_date}",
+        source_items=source_items,
+        ingredient_counts=dict(counts),
     )
 
-    total = Decimal("0.00")
+    top_items = top_ingredients(counts)
+    grocery_items = resolve_grocery_items(top_items)
 
+    rows = []
     for name, qty in top_items.items():
-        grocery_item = GroceryItem.objects.filter(name__icontains=name).first()
+        grocery_item = grocery_items[name]
+        rows.append(ShoppingListItem(
+            shopping_list=shopping_list,
+            item=grocery_item,
+            name=name,
+            quantity=qty,
+            cost=Decimal(grocery_item.base_price) * qty,
+        ))
+    ShoppingListItem.objects.bulk_create(rows)
 
-        if not grocery_item:
-            # Create placeholder if not found
-            grocery_item = GroceryItem.objects.create(name=name, base_price=1.50)
+    shopping_list.total_cost = sum((row.cost for row in rows), Decimal("0.00"))
+    shopping_list.save(update_fields=["total_cost"])
+    SHOPPING_LISTS_CREATED.inc()
+    return shopping_list
+
+
+def refresh_shopping_list(shopping_list):
+    """
+    Bring a plan-linked shopping list up to date with its meal plan.
+
+    Only plan items whose fingerprint was added, removed or changed are
+    re-parsed, and only the affected rows are written, so purchased
+    flags on untouched rows survive.
+    """
+    plan_items = {
+        str(item.id): item
+        for item in shopping_list.meal_plan.mealplanitem_set.select_related("meal")
+    }
+    source_items = dict(shopping_list.source_items)
+    fingerprints = {key: plan_item_fingerprint(item) for key, item in plan_items.items()}
+
+    removed = [
+        key for key, entry in source_items.items()
+        if fingerprints.get(key) != entry["fingerprint"]
+    ]
+    added = [
+        key for key, fingerprint in fingerprints.items()
+        if key not in source_items or source_items[key]["fingerprint"] != fingerprint
+    ]
+
+    if not removed and not added:
+        return shopping_list
+
+    counts = Counter(shopping_list.ingredient_counts)
+    for key in removed:
+        counts.subtract(source_items.pop(key)["ingredients"])
+    for key in added:
+        names = parse_meal_ingredients(plan_items[key].meal)
+        source_items[key] = {"fingerprint": fingerprints[key], "ingredients": names}
+        counts.update(names)
+    counts = +counts  # drop ingredients no longer in the plan
+
+    top_items = top_ingredients(counts)
+    existing = {row.name: row for row in shopping_list.items.select_related("item")}
+
+    changed, stale = [], []
+    for name, row in existing.items():
+        qty = top_items.get(name)
+        if qty is None:
+            stale.append(row.id)
+        elif qty != row.quantity:
+            row.quantity = qty
+            row.cost = Decimal(row.item.base_price) * qty
+            changed.append(row)
 
+    missing = [name for name in top_items if name not in existing]
+    grocery_items = resolve_grocery_items(missing)
+
+    created = []
+    for name in missing:
+        qty = top_items[name]
+        grocery_item = grocery_items[name]
+        created.append(ShoppingListItem(
+            shopping_list=shopping_list,
+            item=grocery_item,
+            name=name,
+            quantity=qty,
+            cost=Decimal(grocery_item.base_price) * qty,
+        ))
+
+    with transaction.atomic():
+        if stale:
+            ShoppingListItem.objects.filter(id__in=stale).delete()
+        if changed:
+            ShoppingListItem.objects.bulk_update(changed, ["quantity", "cost"])
+        if created:
+            ShoppingListItem.objects.bulk_create(created)
+
+        kept = [row for row in existing.values() if row.id not in stale]
+        shopping_list.total_cost = sum((row.cost for row in kept + created), Decimal("0.00"))
+        shopping_list.source_items = source_items
+        shopping_list.ingredient_counts = dict(counts)
+        shopping_list.save(update_fields=["total_cost", "source_items", "ingredient_counts"])
+        transaction.on_commit(lambda: invalidate_outlet_comparison(shopping_list.id))
+
+    return shopping_list
+
+
+def create_household_shopping_list(user, mealplans):
+    """
+    Merge several students' meal plans into one shared shopping list.
+
+    All plan items are streamed in a single query and counted in one pass;
+    each row's cost is split between plan owners in proportion to how
+    many of the ingredient's uses came from their plan.
+    """
+    owners = {plan.id: plan.user.username for plan in mealplans}
+
+    counts = Counter()
+    per_owner = {}
+    parsed = {}  # meals repeat across plans: parse each once
+
+    items = (
+        MealPlanItem.objects.filter(meal_plan_id__in=owners)
+        .select_related("meal")
+        .only("meal_plan_id", "meal__id", "meal__ingredients")
+        .iterator(chunk_size=2000)
+    )
+    for item in items:
+        names = parsed.get(item.meal_id)
+        if names is None:
+            names = parsed[item.meal_id] = parse_meal_ingredients(item.meal)
+        counts.update(names)
+        per_owner.setdefault(owners[item.meal_plan_id], Counter()).update(names)
+
+    top_items = top_ingredients(counts)
+    grocery_items = resolve_grocery_items(top_items)
+
+    shopping_list = ShoppingList.objects.create(
+        user=user,
+        title=f"Household Shopping List ({len(owners)} plans)",
+        ingredient_counts=dict(counts),
+    )
+
+    rows = []
+    shares = Counter()
+    for name, qty in top_items.items():
+        grocery_item = grocery_items[name]
         cost = Decimal(grocery_item.base_price) * qty
-        ShoppingListItem.objects.create(
+        rows.append(ShoppingListItem(
             shopping_list=shopping_list,
             item=grocery_item,
+            name=name,
             quantity=qty,
             cost=cost,
-        )
-        total += cost
+        ))
+        for owner, owner_counts in per_owner.items():
+            if owner_counts[name]:
+                shares[owner] += cost * owner_counts[name] / qty
+    ShoppingListItem.objects.bulk_create(rows)
 
-    shopping_list.total_cost = total
-    shopping_list.save()
+    shopping_list.total_cost = sum((row.cost for row in rows), Decimal("0.00"))
+    shopping_list.cost_shares = {
+        owner: str(round(amount, 2)) for owner, amount in sorted(shares.items())
+    }
+    shopping_list.save(update_fields=["total_cost", "cost_shares"])
     return shopping_list
 
 
+@timed(STAGE_SECONDS, operation="compare_outlet_prices", stage="total")
 def compare_outlet_prices(shopping_list):
     """Compare total grocery cost across outlets."""
     outlets = GroceryOutlet.objects.all()
     results = []
 
+    # Outlets only scale prices, so the base total is the same for all of them
+    base_total = sum(
+        (Decimal(item.item.base_price) * item.quantity
+         for item in shopping_list.items.select_related("item")),
+        Decimal("0.00"),
+    )
+
     for outlet in outlets:
-        outlet_total = Decimal("0.00")
-        for item in shopping_list.items.all():
-            outlet_total += Decimal(item.item.base_price) * Decimal(outlet.price_factor) * item.quantity
+        outlet_total = base_total * Decimal(outlet.price_factor)
         results.append({
             "outlet": outlet.name,
             "total": round(outlet_total, 2)
         })
 
     return results
+
+
+OUTLET_COMPARISON_KEY = "grocery:outlets:{}"
+PRICE_VERSION_KEY = "grocery:prices:version"
+
+
+def bump_price_version():
+    """Invalidate every cached outlet comparison after a price change."""
+    try:
+        cache.incr(PRICE_VERSION_KEY)
+    except ValueError:
+        # Seed from the clock so a lost counter never reuses an old version
+        cache.set(PRICE_VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_outlet_comparison(shopping_list_id):
+    cache.delete(OUTLET_COMPARISON_KEY.format(shopping_list_id))
+
+
+def get_outlet_comparison(shopping_list):
+    """
+    Cached compare_outlet_prices().
+
+    The entry and the current price version come back in a single cache
+    read; list edits delete the entry and price edits bump the version
+    (see grocery.signals).
+    """
+    key = OUTLET_COMPARISON_KEY.format(shopping_list.id)
+    cached = cache.get_many([key, PRICE_VERSION_KEY])
+
+    price_version = cached.get(PRICE_VERSION_KEY)
+    if price_version is None:
+        bump_price_version()
+        price_version = cache.get(PRICE_VERSION_KEY)
+
+    entry = cached.get(key)
+    if entry and entry["price_version"] == price_version:
+        return entry["results"]
+
+    results = compare_outlet_prices(shopping_list)
+    cache.set(key, {"price_version": price_version, "results": results}, None)
+    return results
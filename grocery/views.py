@@ -1,34 +1,185 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib import messages
 from django.views.decorators.http import require_POST
 from meal.models import MealPlan
-from grocery.utils import create_shopping_list_from_mealplan, compare_outlet_prices
-from grocery.models import ShoppingList, ShoppingListItem
-from django.http import JsonResponse
+from grocery.utils import (
+    create_shopping_list_from_mealplan,
+    refresh_shopping_list,
+    create_household_shopping_list,
+    get_outlet_comparison,
+)
+from grocery.models import Household, ShoppingList, ShoppingListItem
+from django.http import Http404, JsonResponse
+from django.db import transaction
+import json
+
+# Recent plans offered per member on the households page
+PLANS_PER_MEMBER = 4
 
 
 @login_required
 def generate_shopping_list(request, plan_id):
     plan = get_object_or_404(MealPlan, id=plan_id, user=request.user)
-    shopping_list = create_shopping_list_from_mealplan(request.user, plan)
+
+    # Reuse the plan's existing list so purchased flags survive regeneration
+    shopping_list = (
+        ShoppingList.objects.filter(user=request.user, meal_plan=plan)
+        .order_by("-created_at")
+        .first()
+    )
+    if shopping_list:
+        refresh_shopping_list(shopping_list)
+    else:
+        shopping_list = create_shopping_list_from_mealplan(request.user, plan)
+    return redirect("grocery:shopping_list_detail", pk=shopping_list.id)
+
+
+@login_required
+def households(request):
+    """The student's households with their members' recent plans, and forms to create or join one."""
+    households = list(request.user.households.prefetch_related("members").order_by("name"))
+    member_ids = {member.id for household in households for member in household.members.all()}
+
+    plans_by_user = {}
+    for plan in MealPlan.objects.filter(user_id__in=member_ids):
+        plans_by_user.setdefault(plan.user_id, []).append(plan)
+    for household in households:
+        household.member_plans = [
+            (member, plans_by_user.get(member.id, [])[:PLANS_PER_MEMBER])
+            for member in household.members.all()
+        ]
+    return render(request, "households.html", {"households": households})
+
+
+@login_required
+@require_POST
+def create_household(request):
+    name = request.POST.get("name", "").strip()
+    if not name:
+        messages.error(request, "Give your household a name.")
+        return redirect("grocery:households")
+
+    with transaction.atomic():
+        household = Household.objects.create(name=name[:100], created_by=request.user)
+        household.members.add(request.user)
+    messages.success(request, f"{household.name} created. Share its invite code with your flatmates.")
+    return redirect("grocery:households")
+
+
+@login_required
+@require_POST
+def join_household(request):
+    token = request.POST.get("invite_token", "").strip()
+    household = Household.objects.filter(invite_token=token).first() if token else None
+    if household is None:
+        messages.error(request, "That invite code is not valid.")
+        return redirect("grocery:households")
+
+    household.members.add(request.user)
+    messages.success(request, f"You joined {household.name}. Its members can now merge your meal plans.")
+    return redirect("grocery:households")
+
+
+@login_required
+@require_POST
+def leave_household(request, pk):
+    household = get_object_or_404(Household, id=pk, members=request.user)
+    household.members.remove(request.user)
+    messages.success(request, f"You left {household.name}.")
+    return redirect("grocery:households")
+
+
+@login_required
+@require_POST
+def household_shopping_list(request):
+    """
+    Merge the selected meal plans into one shared shopping list.
+
+    With ``household_id`` the plans may belong to any member of that
+    household (joining it is each student's consent to have their plans
+    merged); without it only the student's own plans can be merged. Any
+    other plan is treated as not found rather than exposing its meals and
+    owner's username through the cost shares.
+    """
+    household_id = request.POST.get("household_id", "")
+    back = "grocery:households" if household_id else "meal:plan"
+    raw_ids = ",".join(request.POST.getlist("plan_ids"))
+    plan_ids = {int(i) for i in raw_ids.split(",") if i.strip().isdigit()}
+    if not plan_ids:
+        messages.error(request, "Select the meal plans to merge.")
+        return redirect(back)
+
+    if household_id:
+        if not household_id.isdigit():
+            raise Http404("No Household matches the given query.")
+        household = get_object_or_404(Household, id=household_id, members=request.user)
+        owners = household.members.all()
+    else:
+        owners = [request.user]
+
+    plans = list(MealPlan.objects.filter(id__in=plan_ids, user__in=owners).select_related("user"))
+    if len(plans) != len(plan_ids):
+        raise Http404("No MealPlan matches the given query.")
+
+    shopping_list = create_household_shopping_list(request.user, plans)
     return redirect("grocery:shopping_list_detail", pk=shopping_list.id)
 
 
 @login_required
-def shopping_list_detail(request, pk):
-    shopping_list = get_object_or_404(ShoppingList, id=pk, user=request.user)
-    outlet_comparisons = compare_outlet_prices(shopping_list)
+async def shopping_list_detail(request, pk):
+    shopping_list = await aget_object_or_404(ShoppingList, id=pk, user=await request.auser())
+    # Cache lookups and, on a miss, the price comparison queries are synchronous
+    outlet_comparisons = await sync_to_async(get_outlet_comparison)(shopping_list)
 
     context = {
         "shopping_list": shopping_list,
         "outlet_comparisons": outlet_comparisons,
     }
-    return render(request, "shopping_list_detail.html", context)
+    # The template walks shopping_list.items lazily, so render in a sync thread
+    return await sync_to_async(render)(request, "shopping_list_detail.html", context)
 
 @login_required
 @require_POST
 def toggle_item_status(request, item_id):
     item = get_object_or_404(ShoppingListItem, id=item_id, shopping_list__user=request.user)
     item.is_purchased = not item.is_purchased
-    item.save()
+    item.save(update_fields=["is_purchased"])
     return JsonResponse({"status": "ok", "purchased": item.is_purchased})
+
+
+@login_required
+@require_POST
+def sync_item_status(request):
+    """
+    Apply a batch of queued purchase toggles in one round-trip.
+
+    Expects a JSON body like ``{"changes": [{"id": 12, "purchased": true}, ...]}``
+    and issues at most one UPDATE per target state, scoped to the user's lists.
+    """
+    try:
+        changes = json.loads(request.body or b"{}").get("changes", [])
+        # Later changes to the same item win
+        desired = {c["id"]: c["purchased"] for c in changes}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({"status": "error", "message": "Invalid payload."}, status=400)
+    # Strict types: bool("false") is True, and True passes as an int id
+    if not all(
+        type(item_id) is int and isinstance(purchased, bool)
+        for item_id, purchased in desired.items()
+    ):
+        return JsonResponse({"status": "error", "message": "Invalid payload."}, status=400)
+
+    items = ShoppingListItem.objects.filter(shopping_list__user=request.user)
+    with transaction.atomic():
+        for state in (True, False):
+            ids = [item_id for item_id, purchased in desired.items() if purchased is state]
+            if ids:
+                items.filter(id__in=ids).update(is_purchased=state)
+
+    current = dict(items.filter(id__in=desired).values_list("id", "is_purchased"))
+    return JsonResponse({
+        "status": "ok",
+        "items": {str(item_id): purchased for item_id, purchased in current.items()},
+    })
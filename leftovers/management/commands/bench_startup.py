@@ -0,0 +1,113 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: argv is <mode> <eager>, and the last stdout
+# line is a JSON report of resident memory and which heavy modules loaded.
+PROBE = """
+import json, os, sys
+
+mode, eager = sys.argv[1], sys.argv[2] == "1"
+if eager:
+    # What every process imported when leftovers.recommendations loaded scikit-learn at module level
+    import numpy, sklearn.feature_extraction.text, sklearn.metrics.pairwise
+
+if mode == "check":
+    from django.core.management import execute_from_command_line
+    execute_from_command_line(["manage.py", "check"])
+else:
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+    get_wsgi_application()
+    get_resolver().url_patterns  # Imports every app's urls and views, as a worker's first request does
+    if mode == "recommend":
+        from leftovers.recommendations import meal_recommend_tfidf
+        meal_recommend_tfidf(["chicken", "rice", "tomato"])
+
+rss_kb = None
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rss_kb": rss_kb, "loaded": [m for m in ("numpy", "scipy", "sklearn") if m in sys.modules]}))
+"""
+
+SCENARIOS = {
+    # name: (probe mode, eager imports, description)
+    "check_eager": ("check", True, "manage.py check, scikit-learn imported at module level (before)"),
+    "check_lazy": ("check", False, "manage.py check, lazy imports (after)"),
+    "worker_eager": ("worker", True, "web worker after loading the URLconf (before)"),
+    "worker_lazy": ("worker", False, "web worker after loading the URLconf (after)"),
+    "worker_recommend": ("recommend", False, "worker after its first in-process recommendation"),
+}
+
+
+class Command(BaseCommand):
+    help = "Measure manage.py check time and per-worker RSS with eager versus lazy scikit-learn/NumPy imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+        parser.add_argument("--socket", help="Also measure a worker whose recommendation goes to "
+                                             "this run_recommender socket")
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def run_probe(self, mode, eager, socket_path=None):
+        env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        env.pop("RECOMMENDER_SOCKET", None)
+        if socket_path:
+            env["RECOMMENDER_SOCKET"] = socket_path
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, mode, "1" if eager else "0"],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - started
+        if result.returncode != 0:
+            raise CommandError(f"{mode} probe failed:\n{result.stderr[-2000:]}")
+        return wall, json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        scenarios = dict(SCENARIOS)
+        if options["socket"]:
+            scenarios["worker_service"] = ("recommend", False, "worker after its first recommendation "
+                                                              "served by run_recommender")
+
+        report = {}
+        for name, (mode, eager, description) in scenarios.items():
+            socket_path = options["socket"] if name == "worker_service" else None
+            self.run_probe(mode, eager, socket_path)  # Warm the OS page cache
+            walls, rss, loaded = [], [], []
+            for _ in range(max(options["runs"], 1)):
+                wall, probe = self.run_probe(mode, eager, socket_path)
+                walls.append(wall)
+                rss.append(probe["rss_kb"])
+                loaded = probe["loaded"]
+            report[name] = {
+                "description": description,
+                "wall_ms": round(statistics.median(walls) * 1000, 1),
+                "rss_mb": round(statistics.median(rss) / 1024, 1),
+                "loaded": loaded,
+            }
+            self.stdout.write(
+                f"   {name:<18} {report[name]['wall_ms']:>8.1f} ms  {report[name]['rss_mb']:>7.1f} MB  "
+                f"[{', '.join(loaded) or '-'}]  {description}"
+            )
+
+        for kind in ("check", "worker"):
+            before, after = report[f"{kind}_eager"], report[f"{kind}_lazy"]
+            self.stdout.write(self.style.SUCCESS(
+                f"🎉 {kind}: {before['wall_ms'] - after['wall_ms']:.0f} ms faster, "
+                f"{before['rss_mb'] - after['rss_mb']:.1f} MB less resident memory"
+            ))
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(json.dumps(report, indent=2) + "\n")
@@ -0,0 +1,37 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from leftovers.recommendations import rank_by_tfidf, tfidf_scores
+from leftovers.service import bind
+
+
+class Command(BaseCommand):
+    help = "Serve TF-IDF leftover recommendations over a Unix socket so web workers never load scikit-learn"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=settings.RECOMMENDER_SOCKET,
+                            help="Socket path (default: RECOMMENDER_SOCKET)")
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"]
+        if not socket_path:
+            raise CommandError("Pass --socket or set RECOMMENDER_SOCKET")
+
+        # Pay for the scikit-learn import now rather than on the first request
+        rank_by_tfidf(["rice"], ["rice"])
+
+        try:
+            server = bind(socket_path, tfidf_scores)
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(f"🎉 Recommender listening on {socket_path}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
@@ -1,9 +1,14 @@
 # recommendations.py
 
+import logging
+
+from django.conf import settings
+
 from meal.models import Meal
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from meal.normalization import ingredient_terms, normalize_ingredient
+from .service import RecommenderUnavailable, request_scores
+
+logger = logging.getLogger(__name__)
 
 
 #INGREDIENT SUBSTITUTION DICTIONARY
@@ -78,40 +83,62 @@ SUBSTITUTIONS = {
 }
 
 
+# Same table keyed by normalized names, so leftovers entered as "Eggs" or
+# "olive oil" find the substitutes for "egg" / "oil".
+SUBSTITUTION_INDEX = {}
+for _key, _subs in SUBSTITUTIONS.items():
+    _merged = SUBSTITUTION_INDEX.setdefault(normalize_ingredient(_key), [])
+    _merged.extend(s for s in _subs if s not in _merged)
+
+
+def normalize_leftovers(leftover_list):
+    """Leftover names in the grocery list's canonical form."""
+    return [name for name in (normalize_ingredient(x) for x in leftover_list) if name]
+
+
 #SUBSTITUTE MATCHING ENGINE
 def substitution_match(leftovers, ingredient_text):
     """
     Count substitution matches.
     If a meal requires ingredient (A) but user has substitute (B), 
     count it as a partial match.
+    Returns the count and the matches ({"needed", "used"}) for display.
     """
-    ingredient_text = ingredient_text.lower()
-    leftovers = [i.lower() for i in leftovers]
+    terms = ingredient_terms(ingredient_text)
+    leftovers = set(normalize_leftovers(leftovers))
 
     count = 0
+    matches = []
 
     for key, substitutes in SUBSTITUTIONS.items():
 
         # If the meal contains this ingredient
-        if key in ingredient_text:
+        if normalize_ingredient(key) in terms:
 
             # Check if user has any substitute available
             for sub in substitutes:
-                if sub.lower() in leftovers:
+                if normalize_ingredient(sub) in leftovers:
                     count += 1  # Partial match found
+                    matches.append({"needed": key, "used": sub})
 
-    return count
+    return count, matches
 
 
 #TF-IDF CONTENT-BASED RECOMMENDATION
-def meal_recommend_tfidf(leftover_list):
-    meals = Meal.objects.all()
-    if not meals:
-        return []
+def ingredient_document(text):
+    """A meal's ingredients as canonical names, the same vocabulary as the leftovers."""
+    return " ".join(normalize_ingredient(ingredient) for ingredient in (text or "").split(","))
+
 
-    leftover_query = " ".join(leftover_list).lower()
-    ingredient_texts = [meal.ingredients.lower() for meal in meals]
-    corpus = ingredient_texts + [leftover_query]
+def rank_by_tfidf(ingredient_texts, leftovers):
+    """(index, similarity) of the texts sharing terms with the leftovers, best first."""
+    # Imported on first use: at module level they cost every process that
+    # loads the URLconf (web workers, migrate, check) ~0.5 s and tens of MB.
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    corpus = ingredient_texts + [" ".join(leftovers)]
 
     vectorizer = TfidfVectorizer(stop_words="english")
     tfidf_matrix = vectorizer.fit_transform(corpus)
@@ -122,12 +149,52 @@ def meal_recommend_tfidf(leftover_list):
 
     ranked_indexes = np.argsort(similarity_scores)[::-1]
 
+    return [
+        (int(idx), float(similarity_scores[idx]))
+        for idx in ranked_indexes
+        if similarity_scores[idx] > 0
+    ]
+
+
+def tfidf_scores(leftover_list):
+    """[(meal_id, similarity)], best first; what run_recommender serves."""
+    rows = list(Meal.objects.values_list("id", "ingredients"))
+    if not rows:
+        return []
+    ranked = rank_by_tfidf([ingredient_document(text) for _, text in rows], normalize_leftovers(leftover_list))
+    return [(rows[idx][0], score) for idx, score in ranked]
+
+
+def meal_recommend_tfidf(leftover_list):
+    socket_path = getattr(settings, "RECOMMENDER_SOCKET", None)
+    if socket_path:
+        try:
+            scores = request_scores(leftover_list, socket_path, settings.RECOMMENDER_TIMEOUT)
+        except RecommenderUnavailable as exc:
+            logger.warning("Recommender service unavailable (%s); scoring in-process", exc)
+        else:
+            meals = Meal.objects.in_bulk([meal_id for meal_id, _ in scores])
+            recommended = []
+            for meal_id, score in scores:
+                meal = meals.get(meal_id)
+                if meal is not None:  # Deleted since the service read the catalog
+                    meal.similarity_score = score
+                    recommended.append(meal)
+            return recommended
+
+    meals = list(Meal.objects.all())
+    if not meals:
+        return []
+
+    ranked = rank_by_tfidf(
+        [ingredient_document(meal.ingredients) for meal in meals], normalize_leftovers(leftover_list)
+    )
+
     recommended = []
-    for idx in ranked_indexes:
-        if similarity_scores[idx] > 0:
-            meal = meals[int(idx)]
-            meal.similarity_score = float(similarity_scores[idx])
-            recommended.append(meal)
+    for idx, score in ranked:
+        meal = meals[idx]
+        meal.similarity_score = score
+        recommended.append(meal)
 
     return recommended
 
@@ -135,12 +202,13 @@ def meal_recommend_tfidf(leftover_list):
 #RULE-BASED BOOSTING (COOKING LOGIC)
 def rule_based_ranking(meals, leftover_list):
     boosted = []
+    leftover_list = normalize_leftovers(leftover_list)
 
     for meal in meals:
         score = getattr(meal, "similarity_score", 0)
 
-        ingredient_text = meal.ingredients.lower()
-        match_count = sum(1 for x in leftover_list if x in ingredient_text)
+        terms = ingredient_terms(meal.ingredients)
+        match_count = sum(1 for x in leftover_list if x in terms)
 
         score += match_count * 0.2  # direct match reward
 
@@ -158,17 +226,16 @@ def find_meals_from_leftovers(leftover_list):
     meals = Meal.objects.all()
     ranked = []
 
-    leftovers = [x.lower() for x in leftover_list]
+    leftovers = normalize_leftovers(leftover_list)
 
     for meal in meals:
-        ingredients = meal.ingredients.lower()
-
         # DIRECT MATCHES + Record names for HTML
-        direct_match_list = [item for item in leftovers if item in ingredients]
+        terms = ingredient_terms(meal.ingredients)
+        direct_match_list = [item for item in leftovers if item in terms]
         direct_match = len(direct_match_list)
 
         # SUBSTITUTION MATCHES (count + detailed list)
-        substitute_match, substitute_match_list = substitution_match(leftovers, ingredients)
+        substitute_match, substitute_match_list = substitution_match(leftovers, meal.ingredients)
 
         total_match = direct_match + substitute_match
 
@@ -0,0 +1,95 @@
+"""
+Optional out-of-process TF-IDF recommender.
+
+scikit-learn (with SciPy and NumPy) takes about half a second to import and
+tens of MB of resident memory in every process that loads it.
+``leftovers.recommendations`` already imports it only on a worker's first
+recommendation. To keep it out of the web workers entirely, run one
+``manage.py run_recommender`` process and set ``RECOMMENDER_SOCKET`` to its
+Unix socket.
+
+Protocol: the worker sends ``{"leftovers": [...]}`` as one JSON line. The
+service replies with one line, either ``{"scores": [[meal_id, similarity],
+...]}`` (best first) or ``{"error": "..."}``. A worker that cannot reach the
+service in time scores in-process instead.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+
+from django.db import connections
+
+from smart_meal_planner.routers import use_replicas
+
+logger = logging.getLogger(__name__)
+
+
+class RecommenderUnavailable(Exception):
+    pass
+
+
+def request_scores(leftovers, socket_path, timeout):
+    """[(meal_id, similarity)] from the service at ``socket_path``."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps({"leftovers": list(leftovers)}).encode() + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError as exc:  # Includes connection refused, missing socket and timeouts
+        raise RecommenderUnavailable(str(exc) or type(exc).__name__) from exc
+
+    try:
+        response = json.loads(line)
+    except ValueError:
+        raise RecommenderUnavailable("malformed response")
+    if "error" in response:
+        raise RecommenderUnavailable(response["error"])
+    return [(int(meal_id), float(score)) for meal_id, score in response["scores"]]
+
+
+class RecommenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, score):
+        self.score = score
+        super().__init__(socket_path, RecommenderHandler)
+
+
+class RecommenderHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            leftovers = json.loads(self.rfile.readline())["leftovers"]
+            # The catalog scan is read-only: let the router send it to a replica
+            with use_replicas():
+                response = {"scores": self.server.score(leftovers)}
+        except Exception as exc:
+            logger.exception("Recommendation failed")
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            # Each request runs in its own thread, with its own DB connection
+            connections.close_all()
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def bind(socket_path, score):
+    """
+    A server for ``score(leftovers) -> [(meal_id, similarity)]`` on
+    ``socket_path``. A socket file left behind by a dead service is replaced;
+    a live one is an error.
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+        else:
+            raise OSError(f"A recommender is already listening on {socket_path}")
+        finally:
+            probe.close()
+    return RecommenderServer(socket_path, score)
@@ -1,3 +1,42 @@
 from django.test import TestCase
 
-# Create your tests here.
+from meal.models import Meal
+from .recommendations import find_meals_from_leftovers, substitution_match
+from .views import rank_leftover_meals
+
+
+class LeftoverMatchingTests(TestCase):
+    def setUp(self):
+        self.omelette = Meal.objects.create(name="Omelette", ingredients="Egg (2), Milk (50ml), Butter (10g)")
+        self.curry = Meal.objects.create(
+            name="Chilli Curry", ingredients="Green Chillies (3 chopped), Beef Stock (400ml), Onions (2)",
+        )
+        self.salad = Meal.objects.create(name="Salad", ingredients="Lettuce (1), Cucumber (1)")
+
+    def test_canonical_leftovers_match_raw_ingredient_spellings(self):
+        # "egg" -> "eggs" and "chillies" -> "chili" are not substrings of the raw text
+        ranked = find_meals_from_leftovers(["Egg", "chillies"])
+
+        self.assertEqual({meal.name for meal in ranked}, {"Omelette", "Chilli Curry"})
+        by_name = {meal.name: meal for meal in ranked}
+        self.assertEqual(by_name["Omelette"].direct_match_list, ["eggs"])
+        self.assertEqual(by_name["Chilli Curry"].direct_match_list, ["chili"])
+
+    def test_single_word_leftover_matches_compound_ingredient(self):
+        ranked = find_meals_from_leftovers(["beef"])
+
+        self.assertEqual([meal.name for meal in ranked], ["Chilli Curry"])
+
+    def test_substitutes_match_normalized_ingredients(self):
+        count, matches = substitution_match(["yogurt"], self.omelette.ingredients)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(matches, [{"needed": "milk", "used": "yogurt"}])
+
+    def test_hybrid_ranking_counts_direct_matches(self):
+        meals = rank_leftover_meals(["eggs", "onion"])
+
+        by_name = {meal.name: meal for meal in meals}
+        self.assertEqual(by_name["Omelette"].direct_match_list, ["eggs"])
+        self.assertEqual(by_name["Chilli Curry"].direct_match_list, ["onion"])
+        self.assertNotIn("Salad", by_name)
@@ -1,10 +1,13 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
+from meal.normalization import ingredient_terms, normalize_ingredient
+from smart_meal_planner.metrics import RECOMMENDATIONS_SERVED, STAGE_SECONDS, timed
 from .models import Leftover
 from .recommendations import (
-    SUBSTITUTIONS,
+    SUBSTITUTION_INDEX,
     find_meals_from_leftovers,
     meal_recommend_tfidf,
     rule_based_ranking
@@ -17,8 +20,10 @@ def leftover_input(request):
     if request.method == "POST":
         raw_input = request.POST.get("leftovers", "")
 
-        # Convert "tomato, rice" → ["tomato", "rice"]
-        items = [i.strip().lower() for i in raw_input.split(",") if i.strip()]
+        # Convert "Tomatoes, rice" → ["tomato", "rice"], same names the grocery list uses
+        items = list(dict.fromkeys(
+            name for name in (normalize_ingredient(i) for i in raw_input.split(",")) if name
+        ))
 
         if not items:
             messages.warning(request, "Please enter at least one leftover ingredient.")
@@ -38,66 +43,79 @@ def leftover_input(request):
 
 
 @login_required
-def leftover_recommend(request):
-    leftover_items = list(
-        Leftover.objects.filter(user=request.user).values_list("name", flat=True)
-    )
+async def leftover_recommend(request):
+    user = await request.auser()
+    leftover_items = [
+        name async for name in Leftover.objects.filter(user=user).values_list("name", flat=True)
+    ]
 
     if not leftover_items:
         messages.info(request, "Please enter leftover items first.")
         return redirect("leftovers:input")
 
-    # Content-Based Filtering
-    tfidf_meals = meal_recommend_tfidf(leftover_items)
-
-    # Rule-Based Ranking
-    ranked_meals = rule_based_ranking(tfidf_meals, leftover_items)
-
-    # Ingredient Substitution Engine
-    final_meals = []
+    # Scoring is CPU-bound (and reads the whole catalog synchronously), so it
+    # runs in a worker thread and the event loop keeps serving other requests
+    final_meals = await sync_to_async(rank_leftover_meals)(leftover_items)
 
-    for meal in ranked_meals:
-        ingredients = meal.ingredients.lower()
-
-        # Direct matches + list of matched items
-        direct_match_list = [item for item in leftover_items if item.lower() in ingredients]
-        direct_match = len(direct_match_list)
-
-        # Substitution matches + detailed list
-        substitute_match = 0
-        substitute_match_list = []
+    context = {
+        "leftovers": leftover_items,
+        "meals": final_meals,
+    }
 
-        for item in leftover_items:
-            subs = SUBSTITUTIONS.get(item.lower(), [])
-            for sub in subs:
-                if sub.lower() in ingredients:
-                    substitute_match += 1
-                    substitute_match_list.append({
-                        "leftover": item,
-                        "used": sub
-                    })
+    RECOMMENDATIONS_SERVED.inc()
+    with timed(STAGE_SECONDS, operation="leftover_recommend", stage="render"):
+        return await sync_to_async(render)(request, "leftovers_recommend.html", context)
 
-        # Attach to meal object
-        meal.direct_match = direct_match
-        meal.direct_match_list = direct_match_list
 
-        meal.substitute_match = substitute_match
-        meal.substitute_match_list = substitute_match_list
+def rank_leftover_meals(leftover_items):
+    """Top 12 meals for the leftovers: TF-IDF, rule-based boosts, then substitutions."""
+    # Content-Based Filtering
+    with timed(STAGE_SECONDS, operation="leftover_recommend", stage="tfidf"):
+        tfidf_meals = meal_recommend_tfidf(leftover_items)
 
-        # Final hybrid score
-        meal.score = round(
-            float(meal.final_score) + (direct_match * 0.5) + (substitute_match * 0.3),
-            2
-        )
+    # Rule-Based Ranking
+    with timed(STAGE_SECONDS, operation="leftover_recommend", stage="rank"):
+        ranked_meals = rule_based_ranking(tfidf_meals, leftover_items)
 
-        final_meals.append(meal)
+    # Ingredient Substitution Engine
+    final_meals = []
+    with timed(STAGE_SECONDS, operation="leftover_recommend", stage="substitution"):
+        for meal in ranked_meals:
+            # Canonical names, compared with the leftovers' (also canonical) names
+            terms = ingredient_terms(meal.ingredients)
+
+            # Direct matches + list of matched items
+            direct_match_list = [item for item in leftover_items if item in terms]
+            direct_match = len(direct_match_list)
+
+            # Substitution matches + detailed list
+            substitute_match = 0
+            substitute_match_list = []
+
+            for item in leftover_items:
+                subs = SUBSTITUTION_INDEX.get(item, [])
+                for sub in subs:
+                    if normalize_ingredient(sub) in terms:
+                        substitute_match += 1
+                        substitute_match_list.append({
+                            "leftover": item,
+                            "used": sub
+                        })
+
+            # Attach to meal object
+            meal.direct_match = direct_match
+            meal.direct_match_list = direct_match_list
+
+            meal.substitute_match = substitute_match
+            meal.substitute_match_list = substitute_match_list
+
+            # Final hybrid score
+            meal.score = round(
+                float(meal.final_score) + (direct_match * 0.5) + (substitute_match * 0.3),
+                2
+            )
+
+            final_meals.append(meal)
 
     # Sort + show top 12
-    final_meals = sorted(final_meals, key=lambda x: x.score, reverse=True)[:12]
-
-    context = {
-        "leftovers": leftover_items,
-        "meals": final_meals,
-    }
-
-    return render(request, "leftovers_recommend.html", context)
+    return sorted(final_meals, key=lambda x: x.score, reverse=True)[:12]
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.cases import build_context
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import reverse
+from leftovers.models import Leftover
+from nutrition.models import NutritionGoal
+from smart_meal_planner.benchutil import percentile
+
+PAGES = {
+    "plan": lambda ctx: reverse("meal:plan"),
+    "shopping_list": lambda ctx: reverse("grocery:shopping_list_detail", args=[ctx["shopping_list"].id]),
+    "nutrition": lambda ctx: reverse("nutrition:nutrition_dashboard"),
+    "leftovers": lambda ctx: reverse("leftovers:recommend"),
+}
+
+
+def wsgi_get(app, path, cookie):
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update(PATH_INFO=path, HTTP_COOKIE=cookie, HTTP_HOST="testserver", SERVER_NAME="testserver")
+    status = []
+
+    def start_response(line, headers, exc_info=None):
+        status.append(int(line.split()[0]))
+
+    result = app(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return status[0]
+
+
+async def asgi_get(app, path, cookie):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    body = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+
+    async def receive():
+        if body:
+            return body.pop()
+        await asyncio.Future()  # No disconnect; Django cancels this once it has responded
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+class Command(BaseCommand):
+    help = ("Compare WSGI (fixed thread pool) and ASGI (one event loop) throughput and latency "
+            "for the async read pages, against a throwaway test database")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", default="plan,shopping_list,nutrition",
+                            help=f"Comma-separated subset of {','.join(PAGES)}")
+        parser.add_argument("--meals", type=int, default=2000, help="Catalog size")
+        parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+        parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+        parser.add_argument("--wsgi-threads", type=int, default=4,
+                            help="Request threads of the WSGI worker (e.g. gunicorn --threads)")
+        parser.add_argument("--db-latency-ms", type=float, default=2.0,
+                            help="Added to every query to model a networked database (0 for local SQLite)")
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args, **options):
+        pages = [page for page in options["pages"].split(",") if page]
+        if not pages or not set(pages) <= set(PAGES):
+            raise CommandError(f"--pages must be a subset of {','.join(PAGES)}")
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            ctx = build_context(options["meals"])
+            user = ctx["user"]
+            NutritionGoal.objects.get_or_create(user=user)
+            Leftover.objects.bulk_create(
+                [Leftover(user=user, name=name) for name in ("chicken", "rice", "tomato", "onion")]
+            )
+            paths = [(page, PAGES[page](ctx)) for page in pages]
+            cookie = f"{settings.SESSION_COOKIE_NAME}={ctx['client'].cookies[settings.SESSION_COOKIE_NAME].value}"
+
+            latency = options["db_latency_ms"] / 1000
+
+            def slow_query(execute, sql, params, many, context):
+                time.sleep(latency)
+                return execute(sql, params, many, context)
+
+            def add_latency(connection, **kwargs):
+                if slow_query not in connection.execute_wrappers:
+                    connection.execute_wrappers.append(slow_query)
+
+            if latency:
+                connection_created.connect(add_latency, dispatch_uid="bench_async_views")
+                for conn in connections.all(initialized_only=True):
+                    add_latency(conn)
+            try:
+                # Sampling off so the instrumentation does not skew either side
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], PERF_SAMPLE_RATE=0):
+                    report = {
+                        "config": {key: options[key] for key in
+                                   ("meals", "clients", "requests", "wsgi_threads", "db_latency_ms")},
+                        "pages": dict(paths),
+                        "wsgi": self.summarize(*self.run_wsgi(paths, cookie, options)),
+                        "asgi": self.summarize(*self.run_asgi(paths, cookie, options)),
+                    }
+            finally:
+                connection_created.disconnect(dispatch_uid="bench_async_views")
+                for conn in connections.all(initialized_only=True):
+                    if slow_query in conn.execute_wrappers:
+                        conn.execute_wrappers.remove(slow_query)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for mode in ("wsgi", "asgi"):
+            result = report[mode]
+            self.stdout.write(self.style.WARNING(
+                f"\n {mode.upper()}: {result['throughput_rps']} req/s, {result['errors']} errors"
+            ))
+            for page, stats in result["pages"].items():
+                self.stdout.write(f"   {page:<14} p50 {stats['p50_ms']:>8.1f} ms  "
+                                  f"p95 {stats['p95_ms']:>8.1f} ms  p99 {stats['p99_ms']:>8.1f} ms")
+
+        gain = report["asgi"]["throughput_rps"] / report["wsgi"]["throughput_rps"]
+        self.stdout.write(self.style.SUCCESS(f"\n🎉 ASGI throughput is {gain:.2f}x WSGI's"))
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(json.dumps(report, indent=2) + "\n")
+
+    def schedule(self, paths, client):
+        """The pages one client requests, staggered so clients do not move in lockstep."""
+        return [paths[(client + i) % len(paths)] for i in range(self.options["requests"])]
+
+    def run_wsgi(self, paths, cookie, options):
+        self.options = options
+        app = get_wsgi_application()
+        # A WSGI worker serves at most --wsgi-threads requests at once; the rest queue (FIFO)
+        server = ThreadPoolExecutor(max_workers=options["wsgi_threads"])
+
+        def client(n):
+            samples = []
+            for page, path in self.schedule(paths, n):
+                started = time.perf_counter()
+                status = server.submit(wsgi_get, app, path, cookie).result()
+                samples.append((page, time.perf_counter() - started, status))
+            return samples
+
+        started = time.perf_counter()
+        with server, ThreadPoolExecutor(max_workers=options["clients"]) as clients:
+            samples = [sample for result in clients.map(client, range(options["clients"])) for sample in result]
+        return samples, time.perf_counter() - started
+
+    def run_asgi(self, paths, cookie, options):
+        self.options = options
+        app = get_asgi_application()
+
+        async def client(n):
+            samples = []
+            for page, path in self.schedule(paths, n):
+                started = time.perf_counter()
+                status = await asgi_get(app, path, cookie)
+                samples.append((page, time.perf_counter() - started, status))
+            return samples
+
+        async def main():
+            results = await asyncio.gather(*(client(n) for n in range(options["clients"])))
+            return [sample for result in results for sample in result]
+
+        started = time.perf_counter()
+        samples = asyncio.run(main())
+        return samples, time.perf_counter() - started
+
+    def summarize(self, samples, wall):
+        by_page = defaultdict(list)
+        errors = 0
+        for page, seconds, status in samples:
+            by_page[page].append(seconds * 1000)
+            errors += status != 200
+        pages = {}
+        for page, latencies in by_page.items():
+            latencies.sort()
+            pages[page] = {
+                "requests": len(latencies),
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+            }
+        return {
+            "wall_seconds": round(wall, 2),
+            "requests": len(samples),
+            "errors": errors,
+            "throughput_rps": round(len(samples) / wall, 1),
+            "pages": pages,
+        }
@@ -0,0 +1,189 @@
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from meal.models import Meal, MealPlanItem
+from nutrition.utils import log_meals
+from smart_meal_planner.benchutil import percentile
+
+PROFILES = {
+    # SQLite's and Django's defaults: rollback journal, deferred transactions,
+    # the sqlite3 module's 5 s busy timeout, a new connection per request
+    "default": {"OPTIONS": {"init_command": "PRAGMA journal_mode=DELETE"}, "CONN_MAX_AGE": 0},
+    # What settings.DATABASES configures
+    "tuned": {
+        "OPTIONS": settings.DATABASES["default"].get("OPTIONS", {}),
+        "CONN_MAX_AGE": settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+    },
+}
+KINDS = ("generator", "logger", "reader")
+LOG_START = date(2020, 1, 1)
+
+
+def run_worker(kind, user_id, meal_ids, start_at, seconds):
+    """
+    Repeat one kind of operation until the deadline; runs in a forked child,
+    so settings (pointing at the scratch database) are inherited.
+    Returns (kind, latencies in ms, error counts).
+    """
+    user = get_user_model().objects.get(pk=user_id)
+    rng = random.Random(user_id)
+    client = Client()
+    client.force_login(user)
+    generate_url = reverse("meal:generate")
+
+    def generate():
+        response = client.get(generate_url)
+        if response.status_code != 302:
+            raise OperationalError(f"HTTP {response.status_code}")
+
+    days = itertools.count()
+
+    def log():
+        log_meals(user, rng.sample(meal_ids, 3), LOG_START + timedelta(days=next(days)))
+
+    def read():
+        list(MealPlanItem.objects.filter(meal_plan__user=user).select_related("meal").order_by("-id")[:21])
+
+    operation = {"generator": generate, "logger": log, "reader": read}[kind]
+
+    latencies, errors = [], Counter()
+    time.sleep(max(start_at - time.time(), 0))
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            operation()
+        except OperationalError as exc:
+            errors[str(exc)] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    return kind, latencies, dict(errors)
+
+
+class Command(BaseCommand):
+    help = ("Run concurrent plan generators, nutrition loggers and readers against a scratch SQLite "
+            "database with the default and the tuned connection profile, and report lock waits")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--generators", type=int, default=4, help="Processes generating meal plans")
+        parser.add_argument("--loggers", type=int, default=4, help="Processes logging meals")
+        parser.add_argument("--readers", type=int, default=4, help="Processes reading plans")
+        parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each contended run")
+        parser.add_argument("--meals", type=int, default=2000, help="Catalog size")
+        parser.add_argument("--profiles", default=",".join(PROFILES),
+                            help=f"Comma-separated subset of {','.join(PROFILES)}")
+        parser.add_argument("--output", help="Also write the JSON report here")
+
+    def handle(self, *args, **options):
+        counts = {kind: options[f"{kind}s"] for kind in KINDS}
+        workdir = tempfile.mkdtemp(prefix="write-contention-")
+        db = connection.settings_dict
+        saved = {key: db.get(key) for key in ("OPTIONS", "CONN_MAX_AGE", "TEST")}
+        db["TEST"] = {**db.get("TEST", {}), "NAME": os.path.join(workdir, "contention.sqlite3")}
+        old_name = db["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        report = {"config": {**counts, "seconds": options["seconds"], "meals": options["meals"]}, "profiles": {}}
+        try:
+            with open(os.devnull, "w") as devnull:
+                call_command(
+                    "seed_scale_data", seed=7, meals=options["meals"], users=sum(counts.values()),
+                    plans_per_user=1, log_days=0, lists_per_user=0, end_date=date(2026, 1, 4),
+                    stdout=devnull,
+                )
+            user_ids = list(get_user_model().objects.order_by("pk").values_list("pk", flat=True))
+            meal_ids = list(Meal.objects.values_list("pk", flat=True))
+            pristine = os.path.join(workdir, "pristine.sqlite3")
+            connections.close_all()
+            shutil.copyfile(db["NAME"], pristine)
+
+            workers = [kind for kind in KINDS for _ in range(counts[kind])]
+            for profile in options["profiles"].split(","):
+                db.update(PROFILES[profile])
+                for suffix in ("-wal", "-shm", "-journal"):
+                    if os.path.exists(db["NAME"] + suffix):
+                        os.unlink(db["NAME"] + suffix)
+                shutil.copyfile(pristine, db["NAME"])
+
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], PERF_SAMPLE_RATE=0):
+                    # Uncontended medians first: waiting is measured against them
+                    solo = {
+                        kind: statistics.median(self.run(
+                            [kind], user_ids, meal_ids, min(options["seconds"], 2.0))[kind]["latencies"])
+                        for kind in KINDS if counts[kind]
+                    }
+                    results = self.run(workers, user_ids, meal_ids, options["seconds"])
+                report["profiles"][profile] = self.summarize(results, solo, options["seconds"])
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            db.update(saved)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        for profile, kinds in report["profiles"].items():
+            self.stdout.write(self.style.WARNING(f"\n Profile {profile}"))
+            for kind, stats in kinds.items():
+                self.stdout.write(
+                    f"   {kind:<10} {stats['ops_per_second']:>8.1f} ops/s  p50 {stats['p50_ms']:>8.1f} ms  "
+                    f"p99 {stats['p99_ms']:>8.1f} ms  max {stats['max_ms']:>8.1f} ms  "
+                    f"waited {stats['wait_share']:>6.1%}  locked errors {stats['locked_errors']}"
+                )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(json.dumps(report, indent=2) + "\n")
+        self.stdout.write(self.style.SUCCESS("\n🎉 Write contention benchmark finished."))
+
+    def run(self, workers, user_ids, meal_ids, seconds):
+        # Children are forked with the scratch database settings; none may inherit an open connection
+        connections.close_all()
+        start_at = time.time() + 1.0 + 0.05 * len(workers)
+        results = defaultdict(lambda: {"latencies": [], "errors": Counter()})
+        with ProcessPoolExecutor(max_workers=len(workers), mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = [
+                pool.submit(run_worker, kind, user_ids[i], meal_ids, start_at, seconds)
+                for i, kind in enumerate(workers)
+            ]
+            for future in futures:
+                kind, latencies, errors = future.result()
+                results[kind]["latencies"].extend(latencies)
+                results[kind]["errors"].update(errors)
+        return results
+
+    def summarize(self, results, solo, seconds):
+        summary = {}
+        for kind, result in results.items():
+            latencies = sorted(result["latencies"])
+            # Time above the uncontended median: waiting on the lock (and, with
+            # more processes than cores, on the CPU)
+            waited = sum(max(latency - solo[kind], 0) for latency in latencies)
+            summary[kind] = {
+                "ops": len(latencies),
+                "ops_per_second": round(len(latencies) / seconds, 1),
+                "solo_median_ms": round(solo[kind], 2),
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+                "max_ms": round(latencies[-1], 1),
+                "wait_ms": round(waited, 1),
+                "wait_share": round(waited / sum(latencies), 3) if latencies else 0.0,
+                "locked_errors": sum(n for error, n in result["errors"].items() if "locked" in error),
+                "errors": dict(result["errors"]),
+            }
+        return summary
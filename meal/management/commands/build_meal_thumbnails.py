@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from meal.models import Meal
+from meal.thumbnails import THUMBNAIL_ERRORS, generate_thumbnail
+
+
+class Command(BaseCommand):
+    help = "Pre-generate WebP thumbnails for every meal image"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source-dir",
+                            help="Read originals from this directory (by file name) instead of downloading")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--force", action="store_true", help="Rebuild existing thumbnails")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        urls = set(
+            Meal.objects.exclude(image_url__isnull=True).exclude(image_url="")
+            .values_list("image_url", flat=True)
+        )
+
+        def build(url):
+            try:
+                return generate_thumbnail(url, options["source_dir"], options["force"]), None
+            except THUMBNAIL_ERRORS as exc:
+                return False, f"{url}: {exc}"
+
+        created = failed = 0
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            for written, error in pool.map(build, sorted(urls)):
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f" {error}"))
+                created += written
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n🎉 Done! {created} thumbnails created, {len(urls) - created - failed} already present, "
+            f"{failed} failed ({time.perf_counter() - started:.1f}s)"
+        ))
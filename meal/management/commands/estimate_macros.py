@@ -1,32 +1,79 @@
+import time
+
+import numpy as np
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 from meal.models import Meal
 
+# Share of calories from (protein, carbs, fat) per TheMealDB category
+RATIO_PROFILES = {
+    "Beef": (0.35, 0.30, 0.35),
+    "Chicken": (0.40, 0.35, 0.25),
+    "Goat": (0.35, 0.30, 0.35),
+    "Lamb": (0.30, 0.25, 0.45),
+    "Pork": (0.30, 0.30, 0.40),
+    "Seafood": (0.40, 0.30, 0.30),
+    "Pasta": (0.15, 0.60, 0.25),
+    "Vegetarian": (0.15, 0.55, 0.30),
+    "Vegan": (0.15, 0.60, 0.25),
+    "Breakfast": (0.20, 0.50, 0.30),
+    "Side": (0.10, 0.60, 0.30),
+    "Starter": (0.20, 0.45, 0.35),
+    "Dessert": (0.05, 0.65, 0.30),
+    "Miscellaneous": (0.25, 0.50, 0.25),
+}
+DEFAULT_RATIO = (0.25, 0.50, 0.25)  # general health
+
+# kcal per gram of protein, carbs, fat
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+MACRO_FIELDS = ["protein", "carbs", "fats"]
+
+
+def estimate_grams(calories, categories):
+    """Vectorized kcal → grams for a chunk of meals, rounded to 0.1 g."""
+    ratios = np.array([RATIO_PROFILES.get(c, DEFAULT_RATIO) for c in categories])
+    grams = np.asarray(calories, dtype=float)[:, None] * ratios / KCAL_PER_GRAM
+    return np.round(grams, 1)
+
+
 class Command(BaseCommand):
     help = "Estimate macros for meals based on calories"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--only-missing", action="store_true",
+                            help="Only fill meals with no protein/carbs/fats yet")
+
     def handle(self, *args, **options):
-        for meal in Meal.objects.all():
-            if not meal.calories:
-                continue
+        chunk_size = options["chunk_size"]
 
-            calories = meal.calories
+        meals = Meal.objects.exclude(calories=0).only("id", "category", "calories").order_by("pk")
+        if options["only_missing"]:
+            meals = meals.filter(Q(protein__isnull=True) | Q(carbs__isnull=True) | Q(fats__isnull=True))
 
-            # Choose ratio (example: general health)
-            protein_ratio = 0.25
-            carb_ratio = 0.50
-            fat_ratio = 0.25
+        started = time.perf_counter()
+        updated = 0
+        last_pk = 0
 
-            # Convert kcal → grams
-            protein = (calories * protein_ratio) / 4
-            carbs = (calories * carb_ratio) / 4
-            fats = (calories * fat_ratio) / 9
+        while True:
+            # Keyset chunks rather than one long-lived cursor: SQLite gives no
+            # isolation between the read and our bulk_update on the same table.
+            chunk = list(meals.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
 
-            # Round & save
-            meal.protein = round(protein, 1)
-            meal.carbs = round(carbs, 1)
-            meal.fats = round(fats, 1)
-            meal.save()
+            grams = estimate_grams([m.calories for m in chunk], [m.category for m in chunk])
+            for meal, (protein, carbs, fats) in zip(chunk, grams.tolist()):
+                meal.protein, meal.carbs, meal.fats = protein, carbs, fats
 
-            self.stdout.write(f"✅ Updated {meal.name}: {meal.protein}g P, {meal.carbs}g C, {meal.fats}g F")
+            # Only the macro columns; leaves updated_at alone
+            Meal.objects.bulk_update(chunk, MACRO_FIELDS)
+            updated += len(chunk)
+            self.stdout.write(f"✅ Updated {updated} meals...")
 
-        self.stdout.write(self.style.SUCCESS("🎉 Macro estimation completed!"))
+        elapsed = time.perf_counter() - started
+        rate = updated / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 Macro estimation completed! {updated} meals in {elapsed:.2f}s ({rate:,.0f} meals/sec)"
+        ))
@@ -1,66 +1,120 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
-import random
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from meal.mealdb import API_BASE, CATEGORIES, LISTING_MAX_AGE, MealDBClient, meal_fields
 from meal.models import Meal
 
-CATEGORIES = [
-    "Beef", "Chicken", "Dessert", "Lamb", "Miscellaneous",
-    "Pasta", "Pork", "Seafood", "Side", "Starter",
-    "Vegan", "Vegetarian", "Breakfast", "Goat"
-]
-
-API_BASE = "https://www.themealdb.com/api/json/v1/1"
 
 class Command(BaseCommand):
     help = "Import meals from TheMealDB API into the Meal model"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--api-base", default=API_BASE,
+                            help="API root (point at a local stand-in server for testing)")
+        parser.add_argument("--category", action="append", dest="categories",
+                            help="Only import these categories (repeatable)")
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent lookups")
+        parser.add_argument("--timeout", type=float, default=10, help="Per-request timeout (s)")
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--cache-dir", default=str(settings.BASE_DIR / ".cache" / "mealdb"),
+                            help="On-disk response cache; re-runs skip the network")
+        parser.add_argument("--no-cache", action="store_true")
+        parser.add_argument("--refresh", action="store_true",
+                            help="Re-fetch category listings even if cached (they expire after a day)")
+
     def handle(self, *args, **options):
+        started = time.perf_counter()
+        categories = options["categories"] or CATEGORIES
+        batch_size = options["batch_size"]
+
+        client = MealDBClient(
+            api_base=options["api_base"],
+            cache_dir=None if options["no_cache"] else options["cache_dir"],
+            pool_size=options["workers"],
+            timeout=options["timeout"],
+            listing_max_age=0 if options["refresh"] else LISTING_MAX_AGE,
+        )
+
+        # One query each for dedup instead of an exists() per meal. The id is
+        # checked first (it is unique); names catch meals imported without one
+        known_ids = set(Meal.objects.exclude(external_id=None).values_list("external_id", flat=True))
+        known_names = {name.lower() for name in Meal.objects.values_list("name", flat=True)}
+
+        def is_known(external_id, name):
+            return external_id in known_ids or name.lower() in known_names
+
         total_imported = 0
+        failures = 0
+        batch = []
+
+        def flush():
+            nonlocal total_imported, batch
+            if batch:
+                Meal.objects.bulk_create(batch)
+                total_imported += len(batch)
+                batch = []
 
-        for category in CATEGORIES:
-            self.stdout.write(self.style.WARNING(f"\n Fetching meals from category: {category}"))
-            list_url = f"{API_BASE}/filter.php?c={category}"
-            response = requests.get(list_url)
-            data = response.json()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            listings = {pool.submit(client.category_meals, c): c for c in categories}
 
-            if not data.get("meals"):
-                self.stdout.write(self.style.ERROR(f" No meals found for {category}."))
-                continue
+            meal_ids = []
+            seen_ids = set()
+            for future in as_completed(listings):
+                category = listings[future]
+                try:
+                    summaries = future.result()
+                except (requests.RequestException, ValueError) as exc:
+                    self.stdout.write(self.style.ERROR(f" Could not fetch {category}: {exc}"))
+                    failures += 1
+                    continue
+
+                if not summaries:
+                    self.stdout.write(self.style.ERROR(f" No meals found for {category}."))
+                    continue
+
+                new_ids = [
+                    s["idMeal"] for s in summaries
+                    # Partial records are skipped
+                    if s.get("idMeal") and s.get("strMeal")
+                    and not is_known(s["idMeal"], s["strMeal"]) and s["idMeal"] not in seen_ids
+                ]
+                seen_ids.update(new_ids)
+                meal_ids.extend(new_ids)
+                self.stdout.write(self.style.WARNING(
+                    f" {category}: {len(summaries)} meals, {len(new_ids)} new"
+                ))
 
-            for meal_summary in data["meals"]:
-                meal_id = meal_summary["idMeal"]
+            lookups = {pool.submit(client.lookup, meal_id): meal_id for meal_id in meal_ids}
+            for future in as_completed(lookups):
+                try:
+                    meal_data = future.result()
+                except (requests.RequestException, ValueError) as exc:
+                    self.stdout.write(self.style.ERROR(f" Lookup {lookups[future]} failed: {exc}"))
+                    failures += 1
+                    continue
+                if not meal_data or not meal_data.get("idMeal") or not meal_data.get("strMeal"):
+                    continue
 
+                fields = meal_fields(meal_data)
                 # Skip duplicates
-                if Meal.objects.filter(name__iexact=meal_summary["strMeal"]).exists():
+                if is_known(fields["external_id"], fields["name"]):
                     continue
+                known_ids.add(fields["external_id"])
+                known_names.add(fields["name"].lower())
+
+                batch.append(Meal(**fields))
+                if len(batch) >= batch_size:
+                    flush()
+
+        flush()
+        client.close()
 
-                # Get full meal details
-                meal_url = f"{API_BASE}/lookup.php?i={meal_id}"
-                meal_data = requests.get(meal_url).json().get("meals", [])[0]
-
-                ingredients = []
-                for i in range(1, 21):
-                    ingredient = meal_data.get(f"strIngredient{i}")
-                    measure = meal_data.get(f"strMeasure{i}")
-                    if ingredient:
-                        ingredients.append(f"{ingredient} ({measure.strip()})" if measure else ingredient)
-
-                Meal.objects.create(
-                    name=meal_data.get("strMeal", "Unknown Meal"),
-                    category=meal_data.get("strCategory", ""),
-                    area=meal_data.get("strArea", ""),
-                    tags=meal_data.get("strTags", "") or "",
-                    description=meal_data.get("strMeal", ""),
-                    ingredients=", ".join(ingredients),
-                    instructions=meal_data.get("strInstructions", ""),
-                    cooking_time=random.randint(15, 30),
-                    calories=random.randint(250, 700),
-                    price_per_serving=round(random.uniform(2.5, 8.0), 2),
-                    image_url=meal_data.get("strMealThumb", ""),
-                )
-
-                total_imported += 1
-
-            self.stdout.write(self.style.SUCCESS(f" Imported meals from category: {category}"))
-
-        self.stdout.write(self.style.SUCCESS(f"\n Done! Imported {total_imported} meals successfully!"))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"\n Done! Imported {total_imported} meals successfully! "
+            f"({client.network_requests} requests, {client.cache_hits} cache hits, "
+            f"{failures} failures, {elapsed:.1f}s)"
+        ))
@@ -0,0 +1,124 @@
+import os
+import resource
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from meal.mealdb import iter_dump_records, meal_fields_batch
+from meal.models import Meal
+
+# Fields refreshed when a record is re-imported; local estimates
+# (cooking time, calories, macros, price) and ratings are left alone
+SOURCE_FIELDS = [
+    "name", "category", "area", "tags", "description",
+    "ingredients", "instructions", "image_url", "updated_at",
+]
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Import (or update) meals from a local TheMealDB-schema dump (.json, .jsonl, optionally .gz)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Dump file: {\"meals\": [...]}, a JSON array, or JSON Lines")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Transformation processes (0 = transform in this process)")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Records per transformation task and per upsert transaction")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"No such file: {path}")
+
+        started = time.perf_counter()
+        workers = max(options["workers"], 0)
+        batches = batched(iter_dump_records(path), max(options["batch_size"], 1))
+
+        # Meals imported before external ids existed are matched once by name
+        # and adopted, instead of being duplicated by the upsert
+        self.legacy = {
+            name.lower(): pk
+            for pk, name in Meal.objects.filter(external_id__isnull=True).values_list("pk", "name")
+        }
+        self.stats = dict(records=0, created=0, updated=0, adopted=0, skipped=0)
+
+        try:
+            if workers:
+                # Keep a bounded number of batches in flight so memory stays flat
+                # however large the dump is; results are applied in file order
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    pending = deque()
+                    for batch in batches:
+                        pending.append(pool.submit(meal_fields_batch, batch))
+                        if len(pending) >= workers * 2:
+                            self.upsert(pending.popleft().result())
+                    while pending:
+                        self.upsert(pending.popleft().result())
+            else:
+                for batch in batches:
+                    self.upsert(meal_fields_batch(batch))
+        except ValueError as exc:
+            raise CommandError(f"Could not parse {path}: {exc}")
+
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        # ru_maxrss is in KiB on Linux; the children figure covers the worker pool
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        peak_child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f"\n🎉 Done! {stats['records']} records: {stats['created']} created, "
+            f"{stats['updated']} updated ({stats['adopted']} matched by name), "
+            f"{stats['skipped']} skipped without idMeal."
+        ))
+        self.stdout.write(
+            f"   {elapsed:.1f}s, {stats['records'] / elapsed if elapsed else 0:,.0f} records/s, "
+            f"peak RSS {peak_rss:.0f} MiB (workers {peak_child_rss:.0f} MiB)"
+        )
+
+    def upsert(self, rows):
+        self.stats["records"] += len(rows)
+
+        # Last occurrence wins when a dump repeats an id
+        by_id = {}
+        for fields in rows:
+            if fields["external_id"]:
+                by_id[str(fields["external_id"])] = fields
+            else:
+                self.stats["skipped"] += 1
+        if not by_id:
+            return
+
+        with transaction.atomic():
+            existing = set(
+                Meal.objects.filter(external_id__in=by_id).values_list("external_id", flat=True)
+            )
+
+            adopted = []
+            for external_id, fields in by_id.items():
+                if external_id in existing:
+                    continue
+                pk = self.legacy.pop(fields["name"].lower(), None)
+                if pk is not None:
+                    adopted.append(Meal(pk=pk, external_id=external_id))
+                    existing.add(external_id)
+            Meal.objects.bulk_update(adopted, ["external_id"])
+
+            Meal.objects.bulk_create(
+                [Meal(**fields) for fields in by_id.values()],
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=SOURCE_FIELDS,
+            )
+
+        self.stats["adopted"] += len(adopted)
+        self.stats["updated"] += len(existing)
+        self.stats["created"] += len(by_id) - len(existing)
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ("Stand-in for replication in local setups: copy the primary SQLite database onto every "
+            "DB_REPLICAS file, once or every --interval seconds")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Seconds between copies (replication lag); 0 copies once and exits")
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES["default"]
+        replicas = [(alias, settings.DATABASES[alias]["NAME"]) for alias in settings.DATABASE_REPLICAS]
+        if not replicas:
+            raise CommandError("No replicas configured; set DB_REPLICAS to a comma-separated list of files")
+        if "sqlite3" not in primary["ENGINE"] or any(
+            "sqlite3" not in settings.DATABASES[alias]["ENGINE"] for alias, _ in replicas
+        ):
+            raise CommandError("replicate_sqlite only copies SQLite databases")
+
+        try:
+            while True:
+                started = time.perf_counter()
+                # The backup API copies a consistent snapshot (WAL lets the
+                # primary keep taking writes meanwhile) and takes the replica's
+                # write lock, so its readers see either the old or the new copy
+                source = sqlite3.connect(primary["NAME"])
+                try:
+                    for alias, path in replicas:
+                        target = sqlite3.connect(path, timeout=30)
+                        try:
+                            source.backup(target)
+                        finally:
+                            target.close()
+                finally:
+                    source.close()
+
+                self.stdout.write(self.style.SUCCESS(
+                    f"🎉 Replicated to {', '.join(alias for alias, _ in replicas)} "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+                ))
+                if not options["interval"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,80 @@
+from benchmarks.cases import CASES, build_context
+from benchmarks.runner import (
+    Benchmark, compare, find_baseline, load_history, new_entry, result_key, save_history,
+)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Run the hot-path microbenchmarks against synthetic catalogs in a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000",
+                            help="Comma-separated catalog sizes (meals)")
+        parser.add_argument("--only", action="append", choices=sorted(CASES),
+                            help="Run only these cases (repeatable)")
+        parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per case and size")
+        parser.add_argument("--history", default=str(settings.BASE_DIR / "benchmarks" / "history.json"))
+        parser.add_argument("--label", help="Name this run in the history (e.g. a branch or release)")
+        parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+        parser.add_argument("--compare", action="store_true",
+                            help="Fail if a median is slower than the baseline by more than --threshold")
+        parser.add_argument("--baseline", help="Label of the run to compare with (default: the latest)")
+        parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options["sizes"].split(",") if size.strip()})
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+        cases = {name: CASES[name] for name in (options["only"] or CASES)}
+
+        history = load_history(options["history"])
+        baseline = find_baseline(history, options["baseline"]) if options["compare"] else None
+        if options["compare"] and baseline is None:
+            raise CommandError("No baseline run in the history to compare with")
+
+        results = {}
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            ctx = None
+            for size in sizes:
+                ctx = build_context(size, ctx)
+                self.stdout.write(self.style.WARNING(f"\n Catalog of {size:,} meals"))
+                for name, case in cases.items():
+                    benchmark = Benchmark(min_time=options["min_time"])
+                    case(benchmark, ctx)
+                    stats = benchmark.stats()
+                    results[result_key(name, size)] = stats
+                    self.stdout.write(
+                        f"   {name:<36} median {stats['median_ms']:>10.3f} ms  "
+                        f"min {stats['min_ms']:>10.3f} ms  ({stats['rounds']} rounds)"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        entry = new_entry(results, options["label"], cwd=settings.BASE_DIR)
+        if not options["no_save"]:
+            history.append(entry)
+            save_history(options["history"], history)
+            self.stdout.write(f"\n Saved to {options['history']}")
+
+        if baseline is None:
+            return
+
+        rows = compare(baseline, entry, options["threshold"])
+        self.stdout.write(f"\n Compared with {baseline.get('label') or baseline['timestamp']}"
+                          f" ({baseline.get('git_rev') or 'unknown rev'}):")
+        for key, before, after, ratio, regressed in rows:
+            line = f"   {key:<44} {before:>10.3f} -> {after:>10.3f} ms  {ratio:>6.2f}x"
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmark(s) regressed by more than {options['threshold']:.0%}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"\n🎉 No regressions beyond {options['threshold']:.0%}."))
@@ -0,0 +1,378 @@
+import random
+import time
+from array import array
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from grocery.models import GroceryItem, GroceryOutlet, ShoppingList, ShoppingListItem
+from grocery.utils import IGNORE_LIST, parse_meal_ingredients
+from leftovers.recommendations import SUBSTITUTIONS
+from meal.management.commands.estimate_macros import estimate_grams
+from meal.mealdb import CATEGORIES
+from meal.models import Meal, MealPlan, MealPlanItem, MealQuiz
+from nutrition.models import NutritionDailySummary, NutritionGoal, NutritionLog
+
+AREAS = [
+    "American", "British", "Canadian", "Chinese", "French", "Greek", "Indian",
+    "Italian", "Japanese", "Mexican", "Moroccan", "Thai", "Turkish", "Vietnamese",
+]
+DISHES = ["Bowl", "Curry", "Stew", "Salad", "Bake", "Stir Fry", "Wrap", "Soup", "Skillet", "Pie"]
+MEASURES = ["1 cup", "2 tbsp", "1 tsp", "200g", "100g", "2", "1 clove", "pinch", "1/2 cup", "400ml"]
+UNIVERSITIES = [
+    "State University", "Tech Institute", "City College", "Valley University",
+    "Coastal University", "Northern College", "Metro University", "Lakeside Institute",
+]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MEAL_TIMES = ["breakfast", "lunch", "dinner"]
+QUIZ_GOALS = [choice for choice, _ in MealQuiz.GOAL_CHOICES]
+FOOD_PREFERENCES = [choice for choice, _ in MealQuiz.FOOD_PREFERENCES]
+PASSWORD = "Scale-Test-2026"
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic meals, students, plans, logs and shopping lists at scale"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--meals", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--plans-per-user", type=int, default=4, help="Weekly plans going back from --end-date")
+        parser.add_argument("--log-days", type=int, default=30, help="Days of nutrition history per user")
+        parser.add_argument("--lists-per-user", type=int, default=1)
+        parser.add_argument("--outlets", type=int, default=8)
+        parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                            help="Last day of generated history (YYYY-MM-DD); fix it for reproducible runs")
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.end_date = options["end_date"]
+        self.tag = f"scale{options['seed']}"
+        self.report = []
+
+        StudentUser = get_user_model()
+        if (Meal.objects.filter(external_id__startswith=f"{self.tag}-").exists()
+                or StudentUser.objects.filter(username__startswith=f"{self.tag}_").exists()):
+            raise CommandError(f"Data for seed {options['seed']} already exists; use another --seed.")
+
+        self.vocabulary = self.ingredient_vocabulary()
+        self.stdout.write(f"Vocabulary: {len(self.vocabulary)} ingredients")
+
+        self.seed_outlets(options["outlets"])
+        grocery_ids = self.seed_grocery_items()
+        self.seed_meals(options["meals"])
+        self.load_meal_pool()
+        user_ids = self.seed_users(options["users"])
+        self.seed_plans(user_ids, options["plans_per_user"])
+        self.seed_logs(user_ids, options["log_days"])
+        self.seed_lists(user_ids, options["lists_per_user"], grocery_ids)
+
+        total_rows = sum(rows for _, rows, _ in self.report)
+        total_seconds = sum(seconds for _, _, seconds in self.report)
+        self.stdout.write(f"\n  {'table':<20} {'rows':>10} {'seconds':>10} {'rows/s':>10}")
+        for table, rows, seconds in self.report:
+            self.stdout.write(f"  {table:<20} {rows:>10,} {seconds:>10.1f} {rows / seconds if seconds else 0:>10,.0f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n🎉 Done! {total_rows:,} rows in {total_seconds:.1f}s "
+            f"({total_rows / total_seconds if total_seconds else 0:,.0f} rows/s)"
+        ))
+
+    # --- helpers ---
+
+    def insert(self, model, objects, **kwargs):
+        """bulk_create a generator of objects in batches; returns the number of rows."""
+        rows = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+                rows += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+            rows += len(batch)
+        return rows
+
+    def record(self, table, rows, started):
+        seconds = time.perf_counter() - started
+        self.report.append((table, rows, seconds))
+        self.stdout.write(f"  {table}: {rows:,} rows ({rows / seconds if seconds else 0:,.0f}/s)")
+
+    def ingredient_vocabulary(self):
+        """Normalized names from the real catalog plus the substitution table."""
+        names = set(SUBSTITUTIONS)
+        for subs in SUBSTITUTIONS.values():
+            names.update(sub for sub in subs if "+" not in sub)
+        for meal in Meal.objects.exclude(external_id__startswith="scale").only("ingredients").iterator():
+            names.update(parse_meal_ingredients(meal))
+        return sorted(name for name in names if name and name not in IGNORE_LIST)
+
+    # --- tables ---
+
+    def seed_outlets(self, count):
+        started = time.perf_counter()
+        with transaction.atomic():
+            rows = self.insert(GroceryOutlet, (
+                GroceryOutlet(name=f"Scale Outlet {i + 1}", price_factor=round(self.rng.uniform(0.85, 1.25), 2))
+                for i in range(count)
+            ), ignore_conflicts=True)
+        self.record("grocery outlets", rows, started)
+
+    def seed_grocery_items(self):
+        started = time.perf_counter()
+        with transaction.atomic():
+            rows = self.insert(GroceryItem, (
+                GroceryItem(name=name[:100], base_price=Decimal(f"{self.rng.uniform(0.5, 6.0):.2f}"))
+                for name in self.vocabulary
+            ), ignore_conflicts=True)
+        self.record("grocery items", rows, started)
+        return list(
+            GroceryItem.objects.filter(name__in=[name[:100] for name in self.vocabulary])
+            .order_by("name").values_list("id", "name", "base_price")
+        )
+
+    def seed_meals(self, count):
+        rng = self.rng
+        vocabulary = self.vocabulary
+
+        def meals():
+            for start in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - start)
+                categories = [rng.choice(CATEGORIES) for _ in range(size)]
+                calories = [rng.randint(250, 900) for _ in range(size)]
+                grams = estimate_grams(calories, categories).tolist()
+                for offset in range(size):
+                    i = start + offset
+                    ingredients = rng.sample(vocabulary, min(len(vocabulary), rng.randint(5, 12)))
+                    main = ingredients[0].title()
+                    area = rng.choice(AREAS)
+                    name = f"{area} {main} {rng.choice(DISHES)}"
+                    protein, carbs, fats = grams[offset]
+                    yield Meal(
+                        external_id=f"{self.tag}-{i}",
+                        name=name[:200],
+                        category=categories[offset],
+                        area=area,
+                        tags=",".join(rng.sample(["Quick", "Budget", "Spicy", "Healthy", "Comfort"], 2)),
+                        description=name,
+                        ingredients=", ".join(f"{ing.title()} ({rng.choice(MEASURES)})" for ing in ingredients),
+                        instructions=f"Prepare the {ingredients[0]}, combine everything and cook through.",
+                        cooking_time=rng.randint(10, 90),
+                        calories=calories[offset],
+                        protein=protein, carbs=carbs, fats=fats,
+                        price_per_serving=Decimal(f"{rng.uniform(2.0, 12.0):.2f}"),
+                        image_url="",
+                        average_rating=round(rng.uniform(2.5, 5.0), 1),
+                        rating_count=rng.randint(0, 500),
+                    )
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            rows = self.insert(Meal, meals())
+        self.record("meals", rows, started)
+
+    def load_meal_pool(self):
+        """Compact columns of every meal (real and synthetic) to draw plans and logs from."""
+        self.meal_ids = array("q")
+        self.meal_calories = array("l")
+        self.meal_prices = array("d")
+        self.meal_macros = [array("d"), array("d"), array("d")]
+        rows = Meal.objects.order_by("pk").values_list(
+            "id", "calories", "price_per_serving", "protein", "carbs", "fats"
+        )
+        for pk, calories, price, protein, carbs, fats in rows.iterator(chunk_size=20_000):
+            self.meal_ids.append(pk)
+            self.meal_calories.append(calories or 0)
+            self.meal_prices.append(float(price or 0))
+            for column, value in zip(self.meal_macros, (protein, carbs, fats)):
+                column.append(value or 0)
+        if not self.meal_ids:
+            raise CommandError("No meals to build plans from; run with --meals > 0.")
+
+    def seed_users(self, count):
+        rng = self.rng
+        StudentUser = get_user_model()
+        password_hash = make_password(PASSWORD)
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            rows = self.insert(StudentUser, (
+                StudentUser(
+                    username=f"{self.tag}_{i:07d}",
+                    email=f"{self.tag}_{i:07d}@scale.edu",
+                    student_id=f"{self.tag}-{i:07d}",
+                    password=password_hash,
+                    full_name=f"Student {i}",
+                    university_name=rng.choice(UNIVERSITIES),
+                    gender=rng.choice(["male", "female", "other"]),
+                    age=rng.randint(17, 30),
+                    is_verified_university_email=True,
+                )
+                for i in range(count)
+            ))
+        self.record("users", rows, started)
+
+        user_ids = list(
+            StudentUser.objects.filter(username__startswith=f"{self.tag}_").order_by("username")
+            .values_list("id", flat=True)
+        )
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            rows = self.insert(MealQuiz, (
+                MealQuiz(
+                    user_id=user_id,
+                    weekly_budget_limit=Decimal(rng.choice([30, 40, 50, 60, 80, 100])),
+                    meal_frequency=rng.choice(["3_meals", "3_meals", "5_meals"]),
+                    goal=rng.choice(QUIZ_GOALS),
+                    food_preference=rng.choice(FOOD_PREFERENCES),
+                    max_calories=rng.choice([None, 500, 600, 700, 800]),
+                )
+                for user_id in user_ids
+            ))
+            rows += self.insert(NutritionGoal, (
+                NutritionGoal(
+                    user_id=user_id,
+                    daily_calorie_goal=rng.randrange(1600, 3201, 50),
+                    daily_protein_goal=float(rng.randrange(60, 181, 5)),
+                    daily_carbs_goal=float(rng.randrange(150, 351, 10)),
+                    daily_fats_goal=float(rng.randrange(45, 111, 5)),
+                )
+                for user_id in user_ids
+            ))
+        self.record("quizzes + goals", rows, started)
+        return user_ids
+
+    def seed_plans(self, user_ids, plans_per_user):
+        rng = self.rng
+        pool_size = len(self.meal_ids)
+        last_monday = self.end_date - timedelta(days=self.end_date.weekday())
+        per_plan = len(DAYS) * len(MEAL_TIMES)
+
+        started = time.perf_counter()
+        plan_rows = item_rows = 0
+        # Plans are created a chunk of users at a time so their ids come back
+        # for the items without holding every plan in memory
+        chunk = max(1, self.batch_size // max(plans_per_user, 1))
+        with transaction.atomic():
+            for start in range(0, len(user_ids), chunk):
+                plans, picks = [], []
+                for user_id in user_ids[start:start + chunk]:
+                    for week in range(plans_per_user):
+                        week_start = last_monday - timedelta(weeks=week)
+                        positions = [rng.randrange(pool_size) for _ in range(per_plan)]
+                        picks.append(positions)
+                        plans.append(MealPlan(
+                            user_id=user_id,
+                            week_start_date=week_start,
+                            week_end_date=week_start + timedelta(days=6),
+                            total_calories=sum(self.meal_calories[p] for p in positions),
+                            total_budget=Decimal(f"{sum(self.meal_prices[p] for p in positions):.2f}"),
+                            goal=rng.choice(QUIZ_GOALS),
+                        ))
+                MealPlan.objects.bulk_create(plans, batch_size=self.batch_size)
+                plan_rows += len(plans)
+                item_rows += self.insert(MealPlanItem, (
+                    MealPlanItem(
+                        meal_plan_id=plan.pk,
+                        meal_id=self.meal_ids[positions[slot]],
+                        day_of_week=DAYS[slot // len(MEAL_TIMES)],
+                        meal_time=MEAL_TIMES[slot % len(MEAL_TIMES)],
+                    )
+                    for plan, positions in zip(plans, picks)
+                    for slot in range(per_plan)
+                ))
+        self.record("plans + items", plan_rows + item_rows, started)
+
+    def seed_logs(self, user_ids, days):
+        rng = self.rng
+        pool_size = len(self.meal_ids)
+        protein, carbs, fats = self.meal_macros
+
+        logs, summaries = [], []
+
+        def generate():
+            for user_id in user_ids:
+                for back in range(days):
+                    day = self.end_date - timedelta(days=back)
+                    count = rng.choices([0, 1, 2, 3, 4], weights=[10, 15, 30, 35, 10])[0]
+                    positions = rng.sample(range(pool_size), min(count, pool_size))
+                    if not positions:
+                        continue
+                    totals = [0, 0.0, 0.0, 0.0]
+                    for p in positions:
+                        totals[0] += self.meal_calories[p]
+                        totals[1] += protein[p]
+                        totals[2] += carbs[p]
+                        totals[3] += fats[p]
+                        logs.append(NutritionLog(
+                            user_id=user_id, meal_id=self.meal_ids[p], date=day,
+                            calories=self.meal_calories[p], protein=protein[p], carbs=carbs[p], fats=fats[p],
+                        ))
+                    # Keep the daily rollup consistent without a rebuild pass
+                    summaries.append(NutritionDailySummary(
+                        user_id=user_id, date=day, calories=totals[0],
+                        protein=round(totals[1], 1), carbs=round(totals[2], 1), fats=round(totals[3], 1),
+                        meal_count=len(positions),
+                    ))
+                    yield
+
+        started = time.perf_counter()
+        log_rows = summary_rows = 0
+        with transaction.atomic():
+            for _ in generate():
+                if len(logs) >= self.batch_size:
+                    NutritionLog.objects.bulk_create(logs, batch_size=self.batch_size)
+                    NutritionDailySummary.objects.bulk_create(summaries, batch_size=self.batch_size)
+                    log_rows += len(logs)
+                    summary_rows += len(summaries)
+                    logs.clear()
+                    summaries.clear()
+            NutritionLog.objects.bulk_create(logs, batch_size=self.batch_size)
+            NutritionDailySummary.objects.bulk_create(summaries, batch_size=self.batch_size)
+            log_rows += len(logs)
+            summary_rows += len(summaries)
+        self.record("logs + summaries", log_rows + summary_rows, started)
+
+    def seed_lists(self, user_ids, lists_per_user, grocery_items):
+        """
+        Standalone lists (no meal_plan link), so the incremental refresh of a
+        plan's list never tries to diff against synthetic state.
+        """
+        rng = self.rng
+        if not grocery_items or not lists_per_user:
+            return
+
+        started = time.perf_counter()
+        list_rows = item_rows = 0
+        chunk = max(1, self.batch_size // lists_per_user)
+        with transaction.atomic():
+            for start in range(0, len(user_ids), chunk):
+                lists, contents = [], []
+                for user_id in user_ids[start:start + chunk]:
+                    for week in range(lists_per_user):
+                        picked = rng.sample(grocery_items, min(len(grocery_items), rng.randint(10, 25)))
+                        rows = [(item_id, name, price, rng.randint(1, 6)) for item_id, name, price in picked]
+                        contents.append(rows)
+                        lists.append(ShoppingList(
+                            user_id=user_id,
+                            title=f"Shopping List for {self.end_date - timedelta(weeks=week)}",
+                            total_cost=sum((price * qty for _, _, price, qty in rows), Decimal("0.00")),
+                        ))
+                ShoppingList.objects.bulk_create(lists, batch_size=self.batch_size)
+                list_rows += len(lists)
+                item_rows += self.insert(ShoppingListItem, (
+                    ShoppingListItem(
+                        shopping_list_id=shopping_list.pk, item_id=item_id, name=name,
+                        quantity=qty, cost=price * qty, is_purchased=rng.random() < 0.3,
+                    )
+                    for shopping_list, rows in zip(lists, contents)
+                    for item_id, name, price, qty in rows
+                ))
+        self.record("lists + items", list_rows + item_rows, started)
@@ -0,0 +1,276 @@
+"""
+TheMealDB client and record transformation shared by the import commands.
+
+``MealDBClient`` keeps one pooled ``requests.Session`` (safe to share across
+the importer's worker threads), applies timeouts and retries, and stores
+every response body in an on-disk cache keyed by a hash of its URL, so a
+re-run of an import never touches the network for meals it already has.
+Category listings expire after ``LISTING_MAX_AGE`` so new upstream meals
+are still discovered.
+``iter_dump_records`` streams the same records from an offline dump file.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from meal.normalization import tidy_ingredient
+
+API_BASE = "https://www.themealdb.com/api/json/v1/1"
+
+CATEGORIES = [
+    "Beef", "Chicken", "Dessert", "Lamb", "Miscellaneous",
+    "Pasta", "Pork", "Seafood", "Side", "Starter",
+    "Vegan", "Vegetarian", "Breakfast", "Goat"
+]
+
+MAX_INGREDIENTS = 20
+
+# Category listings change as meals are added upstream; lookups are kept
+LISTING_MAX_AGE = 24 * 3600
+
+
+class ResponseCache:
+    """Response bodies on disk, one file per URL hash (``ab/abcdef….json``)."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, url):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, url, max_age=None):
+        """The cached body, or None if missing or older than ``max_age`` seconds."""
+        path = self._path(url)
+        try:
+            if max_age is not None and time.time() - path.stat().st_mtime >= max_age:
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, url, body):
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+
+class MealDBClient:
+    def __init__(self, api_base=API_BASE, cache_dir=None, pool_size=8, timeout=10, retries=3,
+                 listing_max_age=LISTING_MAX_AGE):
+        self.api_base = api_base.rstrip("/")
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.listing_max_age = listing_max_age
+        self.timeout = timeout
+        self.network_requests = 0
+        self.cache_hits = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries, backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_json(self, endpoint, max_age=None, **params):
+        url = requests.Request("GET", f"{self.api_base}/{endpoint}", params=params).prepare().url
+
+        body = self.cache.get(url, max_age) if self.cache else None
+        if body is not None:
+            self.cache_hits += 1
+        else:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.content
+            self.network_requests += 1
+            if self.cache:
+                self.cache.set(url, body)
+
+        return json.loads(body)
+
+    def category_meals(self, category):
+        """Summaries (idMeal, strMeal, strMealThumb) for one category."""
+        return self.get_json("filter.php", max_age=self.listing_max_age, c=category).get("meals") or []
+
+    def lookup(self, meal_id):
+        """Full record for one meal, or None if the API has no such id."""
+        meals = self.get_json("lookup.php", i=meal_id).get("meals") or []
+        return meals[0] if meals else None
+
+    def close(self):
+        self.session.close()
+
+
+def meal_fields(meal_data):
+    """Meal model fields for one TheMealDB record (strIngredient1..20 schema)."""
+    ingredients = []
+    for i in range(1, MAX_INGREDIENTS + 1):
+        ingredient = tidy_ingredient(meal_data.get(f"strIngredient{i}"))
+        measure = tidy_ingredient(meal_data.get(f"strMeasure{i}"))
+        if ingredient:
+            ingredients.append(f"{ingredient} ({measure})" if measure else ingredient)
+
+    return dict(
+        external_id=meal_data.get("idMeal") or None,
+        name=meal_data.get("strMeal") or "Unknown Meal",
+        category=meal_data.get("strCategory") or "",
+        area=meal_data.get("strArea") or "",
+        tags=meal_data.get("strTags") or "",
+        description=meal_data.get("strMeal") or "",
+        ingredients=", ".join(ingredients),
+        instructions=meal_data.get("strInstructions") or "",
+        cooking_time=random.randint(15, 30),
+        calories=random.randint(250, 700),
+        price_per_serving=round(random.uniform(2.5, 8.0), 2),
+        image_url=meal_data.get("strMealThumb") or "",
+    )
+
+
+def meal_fields_batch(records):
+    """``meal_fields`` over a list of records; the unit of work for the import pool."""
+    return [meal_fields(record) for record in records]
+
+
+def _open_dump(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"line {line_number}: {exc}") from None
+
+
+NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _JSONStream:
+    """Just enough of an incremental JSON reader to walk a dump's top level."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf, self.pos, self.eof = "", 0, False
+
+    def _fill(self):
+        """Append the next chunk, dropping what has been consumed. False at end of file."""
+        more = "" if self.eof else self.f.read(self.chunk_size)
+        if not more:
+            self.eof = True
+            return False
+        self.buf, self.pos = self.buf[self.pos:] + more, 0
+        return True
+
+    def peek(self):
+        """The next non-whitespace character, not consumed; "" at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        """Consume and return the next character, which must be one of ``chars``."""
+        char = self.peek()
+        if not char or char not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise ValueError(f"expected {expected}, found {repr(char) if char else 'end of file'}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value, reading more until it is whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value straddles the chunk boundary
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the chunk boundary ("12" of "12345", "7" of "7.25")
+            # decodes fine; only what follows it shows whether it is whole
+            if (end == len(self.buf) or self.buf[end] in NUMBER_CHARS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_array(f, chunk_size=1 << 20):
+    """
+    Yield the elements of a top-level array, or of the top-level ``"meals"``
+    array in a ``{"meals": [...]}`` object, decoding one element at a time so
+    only a chunk or so of the file is ever held in memory (other top-level
+    keys are decoded whole and discarded).
+    """
+    stream = _JSONStream(f, chunk_size)
+    if stream.peek() not in ("[", "{"):
+        raise ValueError('expected a JSON array or an object with a "meals" array')
+
+    if stream.expect("[{") == "{":
+        while True:
+            if stream.peek() != '"':
+                raise ValueError('expected an object with a "meals" array')
+            key = stream.value()
+            stream.expect(":")
+            if key == "meals":
+                break
+            stream.value()
+            stream.expect(",}")
+        if stream.peek() != "[":
+            if stream.value() is None:
+                return  # The API's shape for no meals
+            raise ValueError('"meals" is not an array')
+        stream.expect("[")
+
+    if stream.peek() == "]":
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def iter_dump_records(path):
+    """
+    Stream TheMealDB-schema records from a dump file.
+
+    ``.jsonl``/``.ndjson`` files hold one record per line; anything else is
+    parsed as JSON (a bare array or an API-shaped ``{"meals": [...]}``).
+    Either may be gzip-compressed (``.gz``).
+    """
+    name = str(path).removesuffix(".gz")
+    with _open_dump(path) as f:
+        if name.endswith((".jsonl", ".ndjson")):
+            yield from _iter_jsonl(f)
+        else:
+            yield from _iter_json_array(f)
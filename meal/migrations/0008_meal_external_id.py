@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal', '0007_mealquiz_food_preference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Stable source id (TheMealDB idMeal) used to upsert imports', max_length=50, null=True, unique=True),
+        ),
+    ]
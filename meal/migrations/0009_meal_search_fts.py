@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:20
+
+from django.db import migrations
+
+COLUMNS = "name, ingredients, tags, category, area, instructions"
+NEW = ", ".join(f"new.{column}" for column in COLUMNS.split(", "))
+OLD = ", ".join(f"old.{column}" for column in COLUMNS.split(", "))
+
+# External-content FTS5 index over meal_meal: the text lives once, in the
+# meal table; triggers keep the index in step with every insert, delete and
+# text update (price and macro updates do not touch it).
+# SQLite's schema editor rebuilds meal_meal for most AlterField/RemoveField
+# operations, which drops these triggers: re-create them in such a migration.
+CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE meal_meal_fts USING fts5(
+        {COLUMNS},
+        content='meal_meal', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    # Default ORDER BY rank: BM25 weighted name > ingredients > tags/category > area > instructions
+    "INSERT INTO meal_meal_fts(meal_meal_fts, rank) VALUES('rank', 'bm25(10.0, 5.0, 3.0, 3.0, 2.0, 1.0)')",
+    f"""
+    CREATE TRIGGER meal_meal_fts_insert AFTER INSERT ON meal_meal BEGIN
+        INSERT INTO meal_meal_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER meal_meal_fts_delete AFTER DELETE ON meal_meal BEGIN
+        INSERT INTO meal_meal_fts(meal_meal_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER meal_meal_fts_update AFTER UPDATE OF {COLUMNS} ON meal_meal BEGIN
+        INSERT INTO meal_meal_fts(meal_meal_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD});
+        INSERT INTO meal_meal_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW});
+    END
+    """,
+    "INSERT INTO meal_meal_fts(meal_meal_fts) VALUES('rebuild')",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS meal_meal_fts_update",
+    "DROP TRIGGER IF EXISTS meal_meal_fts_delete",
+    "DROP TRIGGER IF EXISTS meal_meal_fts_insert",
+    "DROP TABLE IF EXISTS meal_meal_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # Full-text search (meal/search.py) is SQLite-only
+    for statement in CREATE:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal', '0008_meal_external_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
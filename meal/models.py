@@ -4,6 +4,10 @@ from django.utils import timezone
 
 
 class Meal(models.Model):
+    external_id = models.CharField(
+        max_length=50, unique=True, null=True, blank=True,
+        help_text="Stable source id (TheMealDB idMeal) used to upsert imports"
+    )
     name = models.CharField(max_length=200)
     category = models.CharField(max_length=100, blank=True, help_text="e.g., Beef, Chicken, Vegan")
     area = models.CharField(max_length=100, blank=True, help_text="Country or region of origin")
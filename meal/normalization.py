@@ -0,0 +1,129 @@
+"""
+Ingredient name normalization shared by the grocery, leftovers and meal apps.
+
+Everything here is built once at import time: the regexes are compiled,
+the rule table is split into an exact-match dict and a token trie, and
+results are memoized so repeated ingredients (the common case across a
+week of meals) cost a single dict lookup.
+
+Canonical names are not substrings of the raw text they come from ("Egg"
+becomes "eggs", "Chillies" becomes "chili"), so match leftovers against a
+meal's ``ingredient_terms``, never against its raw ingredient text.
+"""
+
+from functools import lru_cache
+import re
+
+PARENTHESES_RE = re.compile(r"\(.*?\)")
+WHITESPACE_RE = re.compile(r"\s+")
+TOKEN_RE = re.compile(r"[a-z]+")
+
+# Canonical names, in priority order: when several phrases occur in one
+# ingredient the earliest rule wins.
+RULES = [
+    ("red onion", "onion"),
+    ("yellow onion", "onion"),
+    ("white onion", "onion"),
+    ("garlic clove", "garlic"),
+    ("clove garlic", "garlic"),
+    ("bell pepper", "pepper"),
+    ("red pepper", "pepper"),
+    ("green pepper", "pepper"),
+    ("olive oil", "oil"),
+    ("vegetable oil", "oil"),
+    ("butter", "butter"),
+    ("egg", "eggs"),
+    ("tomatoes", "tomato"),
+    ("potatoes", "potato"),
+    ("chilies", "chili"),
+    ("chillies", "chili"),
+    ("milk", "milk"),
+    ("cheese", "cheese"),
+]
+
+CACHE_SIZE = 4096
+
+
+def singularize(word):
+    """Simplify plurals (e.g., onions → onion)."""
+    if word.endswith("s") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _tokens(text):
+    return [singularize(token) for token in TOKEN_RE.findall(text)]
+
+
+def _build_tables(rules):
+    exact, trie = {}, {}
+    for rank, (phrase, canonical) in enumerate(rules):
+        exact.setdefault(phrase, canonical)
+        exact.setdefault(singularize(phrase), canonical)
+
+        node = trie
+        for token in _tokens(phrase):
+            node = node.setdefault(token, {})
+        # Keep the highest-priority rule if two phrases share a path
+        node.setdefault(None, (rank, canonical))
+    return exact, trie
+
+
+EXACT_MATCHES, RULE_TRIE = _build_tables(RULES)
+
+
+def tidy_ingredient(text):
+    """Collapse stray whitespace/newlines in a raw ingredient or measure."""
+    return WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def clean_ingredient(text):
+    """Lowercase and drop quantities in parentheses, keeping the words as typed."""
+    return tidy_ingredient(PARENTHESES_RE.sub("", text or "")).lower()
+
+
+def _match_rule(tokens):
+    best = None
+    for start in range(len(tokens)):
+        node = RULE_TRIE
+        for token in tokens[start:]:
+            node = node.get(token)
+            if node is None:
+                break
+            match = node.get(None)
+            if match and (best is None or match[0] < best[0]):
+                best = match
+    return best[1] if best else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_ingredient(name):
+    """Clean and normalize ingredient names."""
+    name = clean_ingredient(name)
+    if not name:
+        return ""
+
+    canonical = EXACT_MATCHES.get(name)
+    if canonical:
+        return canonical
+
+    name = singularize(name)
+    canonical = EXACT_MATCHES.get(name) or _match_rule(_tokens(name))
+    return canonical or name
+
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def ingredient_terms(text):
+    """
+    Normalized names a comma-separated ingredient list can be matched on:
+    each ingredient's canonical name plus that of each of its words, so
+    leftover "beef" still matches "Beef Stock".
+    """
+    terms = set()
+    for ingredient in (text or "").split(","):
+        name = normalize_ingredient(ingredient)
+        if name:
+            terms.add(name)
+            terms.update(normalize_ingredient(word) for word in TOKEN_RE.findall(name))
+    return frozenset(terms)
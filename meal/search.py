@@ -0,0 +1,124 @@
+"""
+Full-text meal search over the ``meal_meal_fts`` FTS5 index (migration 0009).
+
+Every word of the query is a prefix term ("chick tik" finds Chicken Tikka)
+and all of them must match, in any of name, ingredients, tags, category,
+area or instructions. Results come in BM25 order (column weights are set in
+the migration). The numeric filters are plain conditions on the joined meal
+row.
+
+A search ranks its matches once: the ids of the best ``MAX_RESULTS`` are
+kept in the cache for ``MEAL_SEARCH_SNAPSHOT_SECONDS`` and the cursor is a
+position in that list. Paging stops there; a search that matched more
+meals reports ``truncated`` and should be narrowed with more words or
+filters. Later pages cost a primary-key lookup and never
+repeat or skip rows, even though BM25 scores shift as meals are added
+(they depend on the document count and average length). Meals deleted in
+the meantime are left out. If the snapshot is gone (expired, or in another
+worker's local-memory cache) the search is re-run and paging carries on
+from the same position, which can then repeat or skip rows if the catalog
+has changed.
+
+Known limitation: FTS5 scores every matching row before it can sort, so
+the first page costs time in proportion to the number of matches. On a
+200k-meal catalog that is ~5-8 ms for a selective query ("massaman"),
+~15-25 ms for two common words ("beef stew") and ~50-90 ms for a single
+word in a fifth of the catalog ("chicken"); later pages take ~1 ms. Only
+selective queries meet a single-digit-ms budget.
+"""
+
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+from meal.models import Meal
+
+WORD_RE = re.compile(r"\w+")
+TOKEN_RE = re.compile(r"[0-9a-f]{32}")
+MAX_TERMS = 8
+MAX_RESULTS = 500
+
+FILTERS = {
+    "min_calories": ("m.calories >= %s", int),
+    "max_calories": ("m.calories <= %s", int),
+    "min_protein": ("m.protein >= %s", float),
+    "max_price": ("m.price_per_serving <= %s", float),
+}
+
+COLUMNS = ("id", "name", "category", "area", "calories", "protein", "price_per_serving", "image_url")
+
+
+def fts_query(text):
+    """'Chick tikka' -> '"chick"* AND "tikka"*', or None if there is nothing to search for."""
+    # \w+ never contains FTS5 syntax (quotes, operators, column filters)
+    words = WORD_RE.findall(text.lower())[:MAX_TERMS]
+    return " AND ".join(f'"{word}"*' for word in words) or None
+
+
+def encode_cursor(token, offset):
+    return f"{token}_{offset}"
+
+
+def decode_cursor(cursor):
+    """Raises ValueError on a malformed cursor."""
+    token, offset = cursor.split("_")
+    if not TOKEN_RE.fullmatch(token) or not offset.isdigit():
+        raise ValueError(f"Invalid search cursor: {cursor!r}")
+    return token, int(offset)
+
+
+def search_meals(text, filters=None, cursor=None, limit=20):
+    """
+    ``(meals, next cursor, truncated)``: one page of matches as dicts
+    (COLUMNS), the cursor of the next page (None on the last one) and
+    whether results past MAX_RESULTS were cut off. ``filters`` maps FILTERS
+    keys to already-parsed values; ``cursor`` is a decoded cursor from a
+    previous page of the same search.
+    """
+    match = fts_query(text)
+    if match is None:
+        return [], None, False
+    filters = filters or {}
+
+    token, offset = cursor or (uuid.uuid4().hex, 0)
+    # A cursor only resumes the search it came from
+    search = hashlib.sha1(repr((match, sorted(filters.items()))).encode()).hexdigest()
+    key = f"meal_search:{token}:{search}"
+    snapshot = cache.get(key) if cursor else None
+    if snapshot is None:
+        snapshot = _ranked_ids(match, filters)
+        # A single page needs no snapshot
+        if cursor or len(snapshot[0]) > limit:
+            cache.set(key, snapshot, getattr(settings, "MEAL_SEARCH_SNAPSHOT_SECONDS", 600))
+    ids, truncated = snapshot
+
+    page_ids = ids[offset:offset + limit]
+    rows = Meal.objects.using(router.db_for_read(Meal)).filter(id__in=page_ids).values(*COLUMNS)
+    by_id = {row["id"]: row for row in rows}
+    meals = [by_id[meal_id] for meal_id in page_ids if meal_id in by_id]
+    has_more = offset + limit < len(ids)
+    return meals, encode_cursor(token, offset + limit) if has_more else None, truncated
+
+
+def _ranked_ids(match, filters):
+    """Ids of the best MAX_RESULTS matches, best first, and whether there were more."""
+    params = [match]
+    if filters:
+        # The filters need the meal row, so join before ranking
+        where = " AND ".join(["meal_meal_fts MATCH %s", *(FILTERS[name][0] for name in filters)])
+        sql = (
+            "SELECT m.id FROM meal_meal_fts JOIN meal_meal AS m ON m.id = meal_meal_fts.rowid "
+            f"WHERE {where} ORDER BY meal_meal_fts.rank, m.id LIMIT %s"
+        )
+        params += list(filters.values())
+    else:
+        sql = "SELECT rowid FROM meal_meal_fts WHERE meal_meal_fts MATCH %s ORDER BY rank, rowid LIMIT %s"
+
+    with connections[router.db_for_read(Meal)].cursor() as db:
+        db.execute(sql, [*params, MAX_RESULTS + 1])
+        ids = [meal_id for meal_id, in db.fetchall()]
+    return ids[:MAX_RESULTS], len(ids) > MAX_RESULTS
@@ -0,0 +1,11 @@
+from django import template
+
+from meal.thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def meal_thumbnail(image_url):
+    """``{{ meal.image_url|meal_thumbnail }}``: local WebP thumbnail when ready."""
+    return thumbnail_url(image_url)
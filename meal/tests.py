@@ -1,3 +1,597 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, transaction
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from meal import thumbnails
+from meal.management.commands.bench_write_contention import PROFILES, Command as ContentionCommand
+from meal.mealdb import _iter_json_array, iter_dump_records
+from meal.models import Meal
+from meal.normalization import ingredient_terms, normalize_ingredient
+from meal.search import decode_cursor, search_meals
+
+
+class NormalizationTests(SimpleTestCase):
+    def test_canonical_names(self):
+        cases = {
+            "Red Onion (1 sliced)": "onion",
+            "Onions (2)": "onion",
+            "Garlic Clove (3 minced)": "garlic",
+            "Chopped Tomatoes (400g)": "tomato",
+            "Olive Oil (2 tbs)": "oil",
+            "Egg": "eggs",
+            "Egg Yolks (2)": "eggs",
+            "Green Chillies": "chili",
+            "Basmati Rice (300g)": "basmati rice",
+            " (pinch) ": "",
+        }
+        for raw, canonical in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_ingredient(raw), canonical)
+
+    def test_ingredient_terms_cover_names_and_words(self):
+        terms = ingredient_terms("Egg (1), Green Chillies (2), Beef Stock (400ml), , Olive Oil (1 tbs)")
+
+        self.assertEqual(terms, {"eggs", "chili", "beef stock", "beef", "stock", "oil"})
+
+    def test_leftover_and_meal_spellings_meet(self):
+        # Leftovers are stored in canonical form; they must be found among the terms
+        terms = ingredient_terms("Eggs (3), Chillies (2), Tomatoes (4)")
+        for leftover in ("egg", "eggs", "chillies", "chilies", "tomato", "tomatoes"):
+            with self.subTest(leftover=leftover):
+                self.assertIn(normalize_ingredient(leftover), terms)
+
+
+class StubMealDBHandler(BaseHTTPRequestHandler):
+    """Serves ``server.listings`` (category -> summaries) and ``server.records`` (id -> record)."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.server.hits.append(url.path)
+        if url.path.endswith("/filter.php"):
+            meals = self.server.listings.get(query.get("c"))
+        elif url.path.endswith("/lookup.php"):
+            record = self.server.records.get(query.get("i"))
+            meals = [record] if record else None
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps({"meals": meals}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def record(meal_id, name, category="Beef"):
+    return {
+        "idMeal": meal_id, "strMeal": name, "strCategory": category, "strArea": "British",
+        "strInstructions": "Cook it.", "strMealThumb": "", "strTags": None,
+        "strIngredient1": "Beef", "strMeasure1": "500g", "strIngredient2": "Onion", "strMeasure2": "1",
+    }
+
+
+class ImportMealDBTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubMealDBHandler)
+        self.server.hits = []
+        self.server.records = {
+            "1": record("1", "Beef Pie"),
+            "2": record("2", "Beef Stew"),
+            "3": record("3", "Renamed Upstream"),
+            "4": record("4", "Legacy Lasagne"),
+            "5": {"idMeal": "5", "strCategory": "Beef"},  # No strMeal
+        }
+        self.server.listings = {
+            "Beef": [
+                {"idMeal": meal_id, "strMeal": data.get("strMeal")}
+                for meal_id, data in self.server.records.items()
+            ] + [{"strMeal": "No Id"}],
+        }
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        cache = tempfile.TemporaryDirectory()
+        self.addCleanup(cache.cleanup)
+        self.cache_dir = cache.name
+
+    def run_import(self, *args):
+        out = StringIO()
+        host, port = self.server.server_address
+        call_command(
+            "import_mealdb", "--api-base", f"http://{host}:{port}/api", "--category", "Beef",
+            "--cache-dir", self.cache_dir, "--workers", "2", *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_imports_new_meals_and_skips_known_and_partial_records(self):
+        # Same external id under an old name, and a legacy meal without one
+        Meal.objects.create(name="Old Name", external_id="3")
+        Meal.objects.create(name="Legacy Lasagne")
+
+        self.run_import()
+
+        self.assertEqual(
+            set(Meal.objects.values_list("external_id", "name")),
+            {("1", "Beef Pie"), ("2", "Beef Stew"), ("3", "Old Name"), (None, "Legacy Lasagne")},
+        )
+        self.assertEqual(Meal.objects.get(external_id="1").ingredients, "Beef (500g), Onion (1)")
+
+    def test_partial_lookup_record_is_skipped(self):
+        self.server.listings["Beef"] = [{"idMeal": "5", "strMeal": "Listed Fine"}]
+
+        self.run_import()
+
+        self.assertFalse(Meal.objects.exists())
+
+    def test_reruns_use_cache_until_listings_are_refreshed(self):
+        self.run_import()
+        self.server.hits.clear()
+        self.server.records["6"] = record("6", "Beef Wellington")
+        self.server.listings["Beef"].append({"idMeal": "6", "strMeal": "Beef Wellington"})
+
+        self.run_import()
+        self.assertEqual(self.server.hits, [])
+        self.assertFalse(Meal.objects.filter(external_id="6").exists())
+
+        self.run_import("--refresh")
+        self.assertEqual(self.server.hits, ["/api/filter.php", "/api/lookup.php"])
+        self.assertTrue(Meal.objects.filter(external_id="6", name="Beef Wellington").exists())
+
+
+class MealSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(get_user_model().objects.create_user(
+            username="alice", password="pass12345", student_id="alice-id", email="alice@uni.example",
+        ))
+
+    def search(self, **params):
+        return self.client.get(reverse("meal:search"), params)
+
+    def names(self, text, **filters):
+        return [meal["name"] for meal in search_meals(text, filters, limit=100)[0]]
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        meal = Meal.objects.create(name="Beef Stew", ingredients="Beef, Carrot")
+        self.assertEqual(self.names("stew"), ["Beef Stew"])
+        self.assertEqual(self.names("carr"), ["Beef Stew"])
+
+        meal.name = "Lamb Hotpot"
+        meal.save()
+        self.assertEqual(self.names("stew"), [])
+        self.assertEqual(self.names("lamb hot"), ["Lamb Hotpot"])
+
+        meal.delete()
+        self.assertEqual(self.names("lamb"), [])
+
+    def test_pages_follow_the_first_ranking(self):
+        for number in range(8):
+            Meal.objects.create(name=f"Curry {number}")
+
+        first, cursor, truncated = search_meals("curry", limit=3)
+        self.assertEqual(len(first), 3)
+        self.assertFalse(truncated)
+        # New matches and deletions after the first page
+        Meal.objects.create(name="Curry Late")
+        deleted = Meal.objects.filter(name__startswith="Curry").order_by("-id")[1]
+        deleted.delete()
+
+        seen = [meal["id"] for meal in first]
+        while cursor:
+            page, cursor, _ = search_meals("curry", cursor=decode_cursor(cursor), limit=3)
+            seen += [meal["id"] for meal in page]
+
+        expected = set(Meal.objects.exclude(name="Curry Late").values_list("id", flat=True))
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), expected)
+
+    def test_expired_snapshot_resumes_at_the_same_position(self):
+        for number in range(5):
+            Meal.objects.create(name=f"Soup {number}")
+        first, cursor, _ = search_meals("soup", limit=2)
+        cache.clear()
+
+        second, _, _ = search_meals("soup", cursor=decode_cursor(cursor), limit=2)
+
+        self.assertEqual(len(second), 2)
+        self.assertFalse({meal["id"] for meal in first} & {meal["id"] for meal in second})
+
+    def test_single_page_has_no_cursor(self):
+        Meal.objects.create(name="Pho")
+
+        meals, cursor, _ = search_meals("pho", limit=2)
+
+        self.assertEqual([meal["name"] for meal in meals], ["Pho"])
+        self.assertIsNone(cursor)
+
+    def test_results_past_the_snapshot_are_reported_as_truncated(self):
+        for number in range(5):
+            Meal.objects.create(name=f"Ramen {number}")
+
+        with mock.patch("meal.search.MAX_RESULTS", 3):
+            first = self.search(q="ramen", limit=2).json()
+            last = self.search(q="ramen", limit=2, cursor=first["next"]).json()
+
+        self.assertTrue(first["truncated"])
+        self.assertEqual(len(last["results"]), 1)
+        self.assertIsNone(last["next"])
+        self.assertTrue(last["truncated"])
+        self.assertFalse(self.search(q="ramen 1").json()["truncated"])
+
+    def test_filters(self):
+        Meal.objects.create(name="Light Salad", calories=250, protein=8, price_per_serving=3)
+        Meal.objects.create(name="Big Salad", calories=700, protein=30, price_per_serving=6)
+
+        self.assertEqual(self.names("salad", max_calories=300), ["Light Salad"])
+        self.assertEqual(self.names("salad", min_protein=20.0, max_price=10.0), ["Big Salad"])
+        self.assertEqual(self.names("salad", min_calories=800), [])
+
+    def test_view_returns_pages(self):
+        for number in range(3):
+            Meal.objects.create(name=f"Tagine {number}", price_per_serving=4)
+
+        first = self.search(q="tagine", limit=2).json()
+        second = self.search(q="tagine", limit=2, cursor=first["next"]).json()
+
+        self.assertEqual(first["status"], "ok")
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual(set(first["results"][0]), {
+            "id", "name", "category", "area", "calories", "protein", "price", "image_url",
+        })
+        self.assertEqual(len(second["results"]), 1)
+        self.assertIsNone(second["next"])
+
+    def test_query_syntax_is_treated_as_words(self):
+        Meal.objects.create(name="Fish Pie", category="Seafood")
+
+        for text in ('"fish', "fish OR", "name: fish", "fish AND NOT pie*", "fish)"):
+            with self.subTest(text=text):
+                response = self.search(q=text)
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search(q="--").json()["results"], [])
+
+    def test_invalid_input_is_rejected(self):
+        for params in (
+            {}, {"q": "  "}, {"q": "pie", "limit": "ten"}, {"q": "pie", "max_calories": "lots"},
+            {"q": "pie", "cursor": "abc"}, {"q": "pie", "cursor": f"{'0' * 32}_-1"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.search(**params).status_code, 400)
+
+    def test_login_required(self):
+        self.client.logout()
+
+        self.assertEqual(self.search(q="pie").status_code, 302)
+
+
+class DumpParserTests(SimpleTestCase):
+    RECORDS = [{"idMeal": "1", "strMeal": "Pie", "n": 12345}, {"idMeal": "2", "strMeal": "\"meals\": [x"}, 7.25]
+
+    def test_chunk_boundaries(self):
+        documents = [
+            json.dumps(self.RECORDS),
+            json.dumps({"meals": self.RECORDS}, indent=2),
+            # "meals" after other keys, and inside a nested object
+            json.dumps({"source": {"meals": [0]}, "note": "x" * 50, "meals": self.RECORDS}),
+        ]
+        for document in documents:
+            for chunk_size in (1, 2, 3, 7, 64, 1 << 20):
+                with self.subTest(document=document[:20], chunk_size=chunk_size):
+                    self.assertEqual(list(_iter_json_array(io.StringIO(document), chunk_size)), self.RECORDS)
+
+    def test_numbers_split_across_chunks(self):
+        for chunk_size in (1, 2, 3):
+            with self.subTest(chunk_size=chunk_size):
+                numbers = _iter_json_array(io.StringIO("[12, 345, 7.25, -1.5e3]"), chunk_size)
+                self.assertEqual(list(numbers), [12, 345, 7.25, -1500.0])
+
+    def test_malformed_documents(self):
+        for document in ('{"other": []}', "[1, 2", "[1 2]", "meals", '{"meals": 3}'):
+            with self.subTest(document=document):
+                with self.assertRaises(ValueError):
+                    list(_iter_json_array(io.StringIO(document), 2))
+        self.assertEqual(list(_iter_json_array(io.StringIO('{"meals": null}'))), [])
+
+    def write(self, name, text):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_gzip_and_json_lines(self):
+        records = self.RECORDS[:2]
+        lines = "\n".join(json.dumps(record) for record in records) + "\n\n"
+        for name, text in (
+            ("meals.json.gz", json.dumps({"meals": records})),
+            ("meals.jsonl", lines),
+            ("meals.ndjson.gz", lines),
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(list(iter_dump_records(self.write(name, text))), records)
+
+    def test_json_lines_errors_name_the_line(self):
+        path = self.write("meals.jsonl", '{"idMeal": "1"}\n{oops\n')
+
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            list(iter_dump_records(path))
+
+
+class ImportMealsFileTests(TestCase):
+    def run_import(self, records):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "meals.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"meals": records}, f)
+        call_command("import_meals_file", path, "--workers", "0", "--batch-size", "2", stdout=StringIO())
+
+    def test_upserts_on_external_id(self):
+        self.run_import([record("1", "Beef Pie"), record("2", "Beef Stew")])
+        pie = Meal.objects.get(external_id="1")
+        Meal.objects.filter(pk=pie.pk).update(calories=999)
+
+        self.run_import([record("1", "Steak Pie", category="Pork"), record("3", "Beef Wellington")])
+
+        self.assertEqual(
+            set(Meal.objects.values_list("external_id", "name")),
+            {("1", "Steak Pie"), ("2", "Beef Stew"), ("3", "Beef Wellington")},
+        )
+        pie.refresh_from_db()
+        self.assertEqual(pie.category, "Pork")
+        self.assertEqual(pie.calories, 999)  # Local estimates are kept
+
+    def test_adopts_legacy_meals_by_name(self):
+        legacy = Meal.objects.create(name="Beef Pie", calories=410)
+
+        self.run_import([record("1", "beef pie"), record("2", "Beef Stew"), record("3", "Beef Pie")])
+
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.external_id, "1")
+        self.assertEqual(legacy.calories, 410)
+        # A legacy meal is adopted once; a later record of the same name is a new meal
+        self.assertEqual(Meal.objects.filter(name__iexact="beef pie").count(), 2)
+        self.assertEqual(Meal.objects.count(), 3)
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    """
+    Serves ``server.files`` (path -> bytes), without a Content-Length for
+    paths in ``server.unsized``; anything else is a 404.
+    """
+
+    def do_GET(self):
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        if self.path not in self.server.unsized:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def png_bytes(size=(64, 64)):
+    out = io.BytesIO()
+    Image.new("RGB", size, "tomato").save(out, "PNG")
+    return out.getvalue()
+
+
+class ThumbnailTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubImageHandler)
+        self.server.files = {"/pie.png": png_bytes(), "/junk.png": b"not an image"}
+        self.server.unsized = set()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name, MEAL_IMAGE_SOURCE_DIR=None)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+        for state in (thumbnails._pending, thumbnails._failed, thumbnails._ready):
+            self.addCleanup(state.clear)
+        # Jobs run here, synchronously, instead of on the shared pool
+        executor = mock.patch.object(thumbnails, "_executor", mock.Mock())
+        self.executor = executor.start()
+        self.addCleanup(executor.stop)
+
+    def url(self, path):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def test_thumbnail_is_served_once_generated(self):
+        url = self.url("/pie.png")
+
+        self.assertEqual(thumbnails.thumbnail_url(url), url)
+        (job, queued_url), _ = self.executor.submit.call_args
+        job(queued_url)
+
+        local = thumbnails.thumbnail_url(url)
+        self.assertEqual(local, f"/media/{thumbnails.thumbnail_name(url)}")
+        with Image.open(thumbnails.thumbnail_path(url)) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", thumbnails.THUMBNAIL_SIZE))
+
+    def test_failures_are_remembered(self):
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            # Over twice the limit: DecompressionBombError
+            for path in ("/missing.png", "/junk.png", "/pie.png"):
+                with self.subTest(path=path):
+                    url = self.url(path)
+                    thumbnails._background_generate(url)
+                    self.assertIn(url, thumbnails._failed)
+
+                    self.assertEqual(thumbnails.thumbnail_url(url), url)
+                    self.executor.submit.assert_not_called()
+
+    def test_failed_urls_are_retried_later(self):
+        url = self.url("/missing.png")
+        thumbnails._background_generate(url)
+        thumbnails._failed[url] -= thumbnails.RETRY_FAILED_AFTER
+
+        thumbnails.thumbnail_url(url)
+
+        self.executor.submit.assert_called_once()
+
+    def test_oversized_downloads_are_cut_off(self):
+        self.server.files["/huge.png"] = self.server.files["/streamed.png"] = b"x" * 300_000
+        self.server.unsized.add("/streamed.png")
+
+        with mock.patch.object(thumbnails, "MAX_SOURCE_BYTES", 1000):
+            for path in ("/huge.png", "/streamed.png"):
+                with self.subTest(path=path):
+                    with self.assertRaisesRegex(ValueError, "larger than 1000 bytes"):
+                        thumbnails.read_source(self.url(path))
+            self.assertEqual(thumbnails.read_source(self.url("/pie.png")), png_bytes())
+
+
+class WriteContentionTests(SimpleTestCase):
+    """The connection profiles bench_write_contention compares, on a scratch SQLite file."""
+
+    def open_profile(self, profile):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = {
+            **settings.DATABASES["default"], **PROFILES[profile],
+            "NAME": os.path.join(directory.name, "contention.sqlite3"), "TEST": {},
+        }
+        # Two connections to the same file, as two worker processes would have.
+        # Aliases outside settings.DATABASES are open to SimpleTestCase; the
+        # handler insists on a "default" one, which stays unused.
+        handler = ConnectionHandler({alias: dict(database) for alias in ("default", "writer", "contender")})
+        self.addCleanup(handler.close_all)
+        # transaction.atomic looks aliases up in django.db.connections
+        patcher = mock.patch("django.db.transaction.connections", handler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with handler["writer"].cursor() as cursor:
+            cursor.execute("CREATE TABLE entry (n INTEGER)")
+        return handler
+
+    def write(self, handler, alias):
+        with handler[alias].cursor() as cursor:
+            cursor.execute("INSERT INTO entry (n) VALUES (1)")
+
+    def read_then_write(self, handler, alias):
+        # log_meals' shape: read inside the transaction, then write
+        with transaction.atomic(using=alias):
+            with handler[alias].cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM entry")
+            self.write(handler, alias)
+
+    def count(self, handler):
+        with handler["writer"].cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM entry")
+            return cursor.fetchone()[0]
+
+    def test_tuned_profile_pragmas(self):
+        handler = self.open_profile("tuned")
+        with handler["writer"].cursor() as cursor:
+            pragmas = {}
+            for name in ("journal_mode", "synchronous", "busy_timeout"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+
+        self.assertEqual(pragmas, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 10_000})
+
+    def test_default_profile_fails_read_then_write_behind_a_writer(self):
+        handler = self.open_profile("default")
+
+        with transaction.atomic(using="writer"):
+            self.write(handler, "writer")
+            # A deferred transaction cannot upgrade its read lock: no busy wait
+            with self.assertRaisesMessage(OperationalError, "database is locked"):
+                self.read_then_write(handler, "contender")
+
+        self.assertEqual(self.count(handler), 1)
+
+    def test_tuned_profile_waits_for_the_writer(self):
+        handler = self.open_profile("tuned")
+        outcome = {}
+
+        def contend():
+            started = time.monotonic()
+            try:
+                self.read_then_write(handler, "contender")
+            except OperationalError as exc:
+                outcome["error"] = exc
+            finally:
+                outcome["waited"] = time.monotonic() - started
+                handler.close_all()  # Connections belong to the thread that opened them
+
+        with transaction.atomic(using="writer"):
+            self.write(handler, "writer")
+            thread = threading.Thread(target=contend)
+            thread.start()
+            time.sleep(0.2)
+        thread.join()
+
+        self.assertNotIn("error", outcome)
+        self.assertGreaterEqual(outcome["waited"], 0.15)
+        self.assertEqual(self.count(handler), 2)
+
+    def test_tuned_profile_readers_see_committed_rows_during_a_write(self):
+        handler = self.open_profile("tuned")
+        self.write(handler, "writer")
+
+        with transaction.atomic(using="writer"):
+            self.write(handler, "writer")
+            with handler["contender"].cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM entry")
+                self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_summary_separates_waiting_and_lock_errors(self):
+        results = {
+            "logger": {
+                "latencies": [1.0, 2.0, 10.0],
+                "errors": Counter({"database is locked": 2, "HTTP 500": 1}),
+            }
+        }
+
+        summary = ContentionCommand().summarize(results, {"logger": 2.0}, seconds=1)["logger"]
+
+        self.assertEqual(summary["ops"], 3)
+        self.assertEqual(summary["wait_ms"], 8.0)  # Only the 10 ms call ran over the 2 ms median
+        self.assertEqual(summary["wait_share"], round(8 / 13, 3))
+        self.assertEqual(summary["locked_errors"], 2)
+        self.assertEqual(summary["max_ms"], 10.0)
@@ -0,0 +1,162 @@
+"""
+Local WebP thumbnails for ``Meal.image_url``.
+
+Each source image is fetched once (from TheMealDB, or from
+``MEAL_IMAGE_SOURCE_DIR`` when working offline), cropped to the card shape
+and written to ``MEDIA_ROOT/meal_thumbs/`` under a name derived from the
+URL. The name changes whenever the URL does, so the files can be served
+with far-future cache headers.
+
+Pages never wait on this: ``thumbnail_url`` returns the local file when it
+exists and otherwise queues it on a small background pool and falls back
+to the original URL for that render. ``build_meal_thumbnails`` pre-generates
+the whole catalog.
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = "meal_thumbs"
+# Cards are ~350x200 CSS px; 1.5x covers high-density screens
+THUMBNAIL_SIZE = (540, 300)
+WEBP_QUALITY = 80
+DOWNLOAD_TIMEOUT = 10
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+RETRY_FAILED_AFTER = 3600  # seconds
+
+# Unreachable, oversized or not an image. DecompressionBombError is not an
+# OSError, and Pillow raises SyntaxError for some corrupt files
+THUMBNAIL_ERRORS = (
+    requests.RequestException, OSError, ValueError, SyntaxError, Image.DecompressionBombError,
+)
+
+_executor = None
+_lock = threading.Lock()
+_pending = set()
+_failed = {}
+_ready = set()
+
+
+def thumbnail_name(image_url):
+    digest = hashlib.sha1(image_url.encode("utf-8")).hexdigest()
+    return f"{THUMBNAIL_DIR}/{digest[:2]}/{digest}.webp"
+
+
+def thumbnail_path(image_url):
+    return os.path.join(settings.MEDIA_ROOT, thumbnail_name(image_url))
+
+
+def read_source(image_url, source_dir=None):
+    """
+    Original image bytes, from the offline directory if one is configured.
+    Raises ValueError for sources over MAX_SOURCE_BYTES, without reading
+    more than that.
+    """
+    source_dir = source_dir or getattr(settings, "MEAL_IMAGE_SOURCE_DIR", None)
+    if source_dir:
+        filename = os.path.basename(urlparse(image_url).path)
+        with open(os.path.join(source_dir, filename), "rb") as f:
+            data = f.read(MAX_SOURCE_BYTES + 1)
+    else:
+        with requests.get(image_url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            if int(response.headers.get("Content-Length") or 0) > MAX_SOURCE_BYTES:
+                raise ValueError(f"{image_url} is larger than {MAX_SOURCE_BYTES} bytes")
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_SOURCE_BYTES:
+                    break
+            data = b"".join(chunks)
+
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"{image_url} is larger than {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def make_thumbnail(data):
+    """WebP bytes for one source image, center-cropped to THUMBNAIL_SIZE."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image = ImageOps.fit(image, THUMBNAIL_SIZE, Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+        return out.getvalue()
+
+
+def generate_thumbnail(image_url, source_dir=None, force=False):
+    """
+    Create the thumbnail for ``image_url`` if it does not exist yet.
+    Returns True when a new file was written.
+    """
+    path = thumbnail_path(image_url)
+    if not force and os.path.exists(path):
+        return False
+
+    webp = make_thumbnail(read_source(image_url, source_dir))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so a concurrent request never serves a partial file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(webp)
+    os.replace(tmp, path)
+    return True
+
+
+def _background_generate(image_url):
+    try:
+        generate_thumbnail(image_url)
+    except THUMBNAIL_ERRORS:
+        # Keep serving the original for a while instead of retrying on every render
+        with _lock:
+            _failed[image_url] = time.monotonic()
+    finally:
+        with _lock:
+            _pending.discard(image_url)
+
+
+def _queue(image_url):
+    global _executor
+    with _lock:
+        if image_url in _pending:
+            return
+        failed_at = _failed.get(image_url)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_FAILED_AFTER:
+            return
+        _failed.pop(image_url, None)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "MEAL_THUMBNAIL_WORKERS", 2),
+                thread_name_prefix="meal-thumbs",
+            )
+        _pending.add(image_url)
+    _executor.submit(_background_generate, image_url)
+
+
+def thumbnail_url(image_url):
+    """
+    URL to show for ``image_url``: the local thumbnail when it is ready,
+    otherwise the original (and the thumbnail is queued for next time).
+    """
+    if not image_url:
+        return image_url
+
+    name = thumbnail_name(image_url)
+    if name in _ready:
+        return settings.MEDIA_URL + name
+    if os.path.exists(os.path.join(settings.MEDIA_ROOT, name)):
+        _ready.add(name)
+        return settings.MEDIA_URL + name
+
+    _queue(image_url)
+    return image_url
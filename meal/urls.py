@@ -7,4 +7,5 @@ urlpatterns = [
     path("quiz/", views.meal_quiz, name="quiz"),
     path("generate/", views.generate_meal_plan, name="generate"),
     path("plan/", views.view_meal_plan, name="plan"),
+    path("search/", views.meal_search, name="search"),
 ]
\ No newline at end of file
@@ -2,8 +2,21 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Meal, MealPlan, MealPlanItem, MealQuiz
+from .search import FILTERS, decode_cursor, search_meals
+from .thumbnails import THUMBNAIL_DIR
+import logging
+import os
 import random
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.db.models import Count
+from django.http import JsonResponse
+from django.views.static import serve
+from smart_meal_planner.metrics import MEAL_PLANS_GENERATED, STAGE_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+MAX_SEARCH_PAGE = 100
 
 
 @login_required
@@ -83,7 +96,11 @@ def generate_meal_plan(request):
     elif goal == "maintain_weight":
         meals = meals.filter(calories__range=(400, 800))
 
-    if not meals.exists():
+    # One fetch of the candidates; every day samples from the same pool
+    with timed(STAGE_SECONDS, operation="generate_meal_plan", stage="filter"):
+        candidates = list(meals)
+
+    if not candidates:
         messages.warning(request, "No meals found matching your preferences.")
         return redirect("meal:quiz")
 
@@ -100,52 +117,55 @@ def generate_meal_plan(request):
     )
 
     # Generate plan
-    for day in days:
-        available_meals = list(meals)
-        random.shuffle(available_meals)
-        selected_meals = available_meals[:len(meal_times)]
-
-        for i, meal in enumerate(selected_meals):
-            MealPlanItem.objects.create(
-                meal_plan=plan,
-                meal=meal,
-                day_of_week=day,
-                meal_time=meal_times[i],
-                notes=notes
-            )
-            total_budget_used += float(meal.price_per_serving or 0)
+    plan_items = []
+    with timed(STAGE_SECONDS, operation="generate_meal_plan", stage="sampling"):
+        for day in days:
+            selected_meals = random.sample(candidates, min(len(meal_times), len(candidates)))
+
+            for i, meal in enumerate(selected_meals):
+                plan_items.append(MealPlanItem(
+                    meal_plan=plan,
+                    meal=meal,
+                    day_of_week=day,
+                    meal_time=meal_times[i],
+                    notes=notes
+                ))
+                total_budget_used += float(meal.price_per_serving or 0)
+
+    with timed(STAGE_SECONDS, operation="generate_meal_plan", stage="insert"):
+        MealPlanItem.objects.bulk_create(plan_items)
 
     # Update totals
     plan.total_budget = round(total_budget_used, 2)
-    plan.update_totals()
+    with timed(STAGE_SECONDS, operation="generate_meal_plan", stage="totals"):
+        plan.update_totals()
+    MEAL_PLANS_GENERATED.inc(goal=goal)
 
     messages.success(request, "Your personalized weekly meal plan has been generated successfully!")
     return redirect("meal:plan")
 
 
 @login_required
-def view_meal_plan(request):
-    user = request.user
+async def view_meal_plan(request):
+    user = await request.auser()
 
-    plan = (
+    plan = await (
         MealPlan.objects.filter(user=user)
         .annotate(item_count=Count('mealplanitem'))
         .filter(item_count__gt=0)
         .order_by('-week_start_date')
-        .first()
+        .afirst()
     )
 
     if not plan:
         messages.info(request, "No meal plan found. Please generate one first.")
         return redirect("meal:quiz")
 
-    items = (
-        MealPlanItem.objects.filter(meal_plan=plan)
+    items = [
+        item async for item in MealPlanItem.objects.filter(meal_plan=plan)
         .select_related('meal')
         .order_by('day_of_week', 'meal_time')
-    )
-
-    print(f"Showing Plan ID: {plan.id}, Items Found: {items.count()}")
+    ]
 
     days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday',
             'saturday', 'sunday']
@@ -158,9 +178,9 @@ def view_meal_plan(request):
         if day_key in grouped_meals:
             grouped_meals[day_key].append(item)
         else:
-            print("⚠ INVALID DAY IN DB:", item.day_of_week)
+            logger.warning("Meal plan item %s has invalid day %r", item.pk, item.day_of_week)
 
-    quiz = getattr(user, "meal_quiz", None)
+    quiz = await MealQuiz.objects.filter(user=user).afirst()
     user_info = {
         "goal": quiz.goal if quiz else "-",
         "meal_frequency": quiz.meal_frequency if quiz else "-",
@@ -178,4 +198,65 @@ def view_meal_plan(request):
         "user_info": user_info,
     }
 
-    return render(request, "view_meal_plan.html", context)
+    # Templates and context processors (session, user, messages) are synchronous
+    return await sync_to_async(render)(request, "view_meal_plan.html", context)
+
+
+@login_required
+def meal_search(request):
+    """
+    Ranked full-text meal search (meal/search.py), as JSON.
+
+    ``q`` is required; ``min_calories``, ``max_calories``, ``min_protein``
+    and ``max_price`` narrow the results. Pass the previous page's ``next``
+    value as ``cursor``, with the same ``q`` and filters.
+
+    Only the best ``search.MAX_RESULTS`` (500) matches can be paged through:
+    ``truncated`` is true when the search matched more, in which case
+    ``next`` is null after the last of them and the client should ask for
+    a narrower search.
+        """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"status": "error", "message": "Enter something to search for."}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 20)), MAX_SEARCH_PAGE))
+        filters = {
+            name: parse(request.GET[name])
+            for name, (_, parse) in FILTERS.items()
+            if request.GET.get(name)
+        }
+        cursor = request.GET.get("cursor")
+        cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid filter, cursor or limit."}, status=400)
+
+    meals, next_cursor, truncated = search_meals(query, filters, cursor, limit)
+    return JsonResponse({
+        "status": "ok",
+        "results": [
+            {
+                "id": meal["id"],
+                "name": meal["name"],
+                "category": meal["category"],
+                "area": meal["area"],
+                "calories": meal["calories"],
+                "protein": meal["protein"],
+                "price": meal["price_per_serving"],
+                "image_url": meal["image_url"],
+            }
+            for meal in meals
+        ],
+        "next": next_cursor,
+        "truncated": truncated,
+    })
+
+
+def meal_thumbnail(request, path):
+    """
+    Serve a generated meal thumbnail. File names are derived from the source
+    URL and never change content, so browsers may cache them for a year.
+    """
+    response = serve(request, path, document_root=os.path.join(settings.MEDIA_ROOT, THUMBNAIL_DIR))
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -1,3 +1,67 @@
+import datetime
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .cohort import UNIVERSITY_COLUMNS, USER_COLUMNS, cohort_adherence, write_csv
+from .models import NutritionDailySummary
+
+
+@admin.register(NutritionDailySummary)
+class NutritionDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ("user", "date", "calories", "protein", "carbs", "fats", "meal_count")
+    list_filter = ("date",)
+    search_fields = ("user__username", "user__university_name")
+    date_hierarchy = "date"
+
+    def get_urls(self):
+        return [
+            path(
+                "adherence-report/",
+                self.admin_site.admin_view(self.adherence_report_view),
+                name="nutrition_adherence_report",
+            ),
+        ] + super().get_urls()
+
+    def adherence_report_view(self, request):
+        """Per-university adherence table, with per-user/university CSV export."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        end = timezone.now().date()
+        start = end - datetime.timedelta(days=89)
+        try:
+            end = datetime.date.fromisoformat(request.GET.get("end") or end.isoformat())
+            start = datetime.date.fromisoformat(request.GET.get("start") or start.isoformat())
+        except ValueError:
+            self.message_user(request, "Dates must be YYYY-MM-DD.", level="error")
+
+        user_rows, university_rows = cohort_adherence(start, end) if start <= end else ([], [])
+
+        export = request.GET.get("export")
+        if export in ("user", "university"):
+            response = HttpResponse(content_type="text/csv")
+            response["Content-Disposition"] = (
+                f'attachment; filename="adherence_{export}_{start}_{end}.csv"'
+            )
+            if export == "user":
+                write_csv(response, USER_COLUMNS, user_rows)
+            else:
+                write_csv(response, UNIVERSITY_COLUMNS, university_rows)
+            return response
 
-# Register your models here.
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Nutrition goal adherence",
+            "start": start,
+            "end": end,
+            "columns": UNIVERSITY_COLUMNS,
+            "rows": university_rows,
+            "student_count": len(user_rows),
+        }
+        return TemplateResponse(request, "admin/nutrition/adherence_report.html", context)
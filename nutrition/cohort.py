@@ -0,0 +1,125 @@
+"""
+Cohort goal adherence across all students, per user and per university.
+
+One grouped query over the daily rollup returns a single row per student
+(totals, logged days, days on calorie target and their goals); everything
+else is vectorized NumPy over those columns. Fetching the raw
+users × days cells into Python instead is dominated by per-row driver cost
+(~2 µs/row on SQLite, i.e. ~20 s for 100k students × 90 days), so the
+day dimension is reduced in SQL where it costs a single table scan.
+"""
+
+import csv
+
+from django.db.models import Case, Count, F, FloatField, IntegerField, Max, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from nutrition.models import NutritionDailySummary, NutritionGoal
+from nutrition.trends import GOAL_FIELDS, MACROS, ON_TARGET_TOLERANCE
+from smart_meal_planner.routers import read_replica
+
+USER_COLUMNS = (
+    ["user_id", "username", "university", "days_logged", "days_on_target"]
+    + [f"mean_delta_{macro}" for macro in MACROS]
+)
+UNIVERSITY_COLUMNS = (
+    ["university", "students", "days_logged", "days_on_target", "on_target_rate"]
+    + [f"mean_delta_{macro}" for macro in MACROS]
+)
+
+
+def _grouped_rollup(start, end):
+    goals = {
+        macro: Coalesce(
+            F(f"user__nutritiongoal__{field}"),
+            Value(float(NutritionGoal._meta.get_field(field).default)),
+            output_field=FloatField(),
+        )
+        for macro, field in GOAL_FIELDS.items()
+    }
+    tolerance = ON_TARGET_TOLERANCE
+    # Group by user_id alone (the per-user columns are wrapped in Max) so the
+    # (user, date) unique index delivers rows already grouped: no temp B-tree.
+    return (
+        NutritionDailySummary.objects.using(read_replica())
+        .filter(date__range=(start, end), meal_count__gt=0)
+        .values("user_id")
+        .annotate(
+            username=Max("user__username"),
+            university=Max("user__university_name"),
+            **{f"goal_{macro}": Max(goal) for macro, goal in goals.items()},
+            days_logged=Count("id"),
+            days_on_target=Sum(Case(
+                When(
+                    calories__gte=goals["calories"] * (1 - tolerance),
+                    calories__lte=goals["calories"] * (1 + tolerance),
+                    then=Value(1),
+                ),
+                default=Value(0),
+                output_field=IntegerField(),
+            )),
+            **{f"total_{macro}": Sum(macro, output_field=FloatField()) for macro in MACROS},
+        )
+        .order_by("user_id")
+        .values_list(
+            "user_id", "username", "university", "days_logged", "days_on_target",
+            *(f"goal_{macro}" for macro in MACROS),
+            *(f"total_{macro}" for macro in MACROS),
+        )
+    )
+
+
+def cohort_adherence(start, end):
+    """
+    Returns ``(user_rows, university_rows)``.
+
+    ``mean_delta_*`` is the mean of (intake - goal) over logged days:
+    negative is a deficit, positive a surplus.
+    """
+    import numpy as np  # Not at module level: the admin imports this module at startup
+
+    rows = list(_grouped_rollup(start, end).iterator(chunk_size=10_000))
+    if not rows:
+        return [], []
+
+    columns = list(zip(*rows))
+    user_ids, usernames = columns[0], columns[1]
+    universities = [university or "" for university in columns[2]]
+    days_logged = np.array(columns[3], dtype=np.int64)
+    days_on_target = np.array(columns[4], dtype=np.int64)
+    goals = {macro: np.array(columns[5 + i], dtype=float) for i, macro in enumerate(MACROS)}
+    totals = {macro: np.array(columns[9 + i], dtype=float) for i, macro in enumerate(MACROS)}
+
+    # Sum of (intake - goal) over each student's logged days
+    delta_sums = {macro: totals[macro] - goals[macro] * days_logged for macro in MACROS}
+
+    means = {macro: np.round(delta_sums[macro] / days_logged, 1).tolist() for macro in MACROS}
+    user_rows = [
+        [user_ids[i], usernames[i], universities[i], int(days_logged[i]), int(days_on_target[i])]
+        + [means[macro][i] for macro in MACROS]
+        for i in range(len(rows))
+    ]
+
+    uni_names, uni_index = np.unique(np.array(universities, dtype=object), return_inverse=True)
+    uni_students = np.bincount(uni_index)
+    uni_logged = np.bincount(uni_index, weights=days_logged)
+    uni_on_target = np.bincount(uni_index, weights=days_on_target)
+    uni_means = {
+        macro: np.round(np.bincount(uni_index, weights=delta_sums[macro]) / uni_logged, 1).tolist()
+        for macro in MACROS
+    }
+
+    university_rows = [
+        [university or "(none)", int(uni_students[j]), int(uni_logged[j]), int(uni_on_target[j]),
+         round(float(uni_on_target[j] / uni_logged[j]), 3)]
+        + [uni_means[macro][j] for macro in MACROS]
+        for j, university in enumerate(uni_names.tolist())
+    ]
+
+    return user_rows, university_rows
+
+
+def write_csv(fileobj, header, rows):
+    writer = csv.writer(fileobj)
+    writer.writerow(header)
+    writer.writerows(rows)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from nutrition.utils import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the NutritionDailySummary rollup table from NutritionLog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids",
+                            help="Only rebuild these user ids (repeatable)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_daily_summaries(options["user_ids"], options["batch_size"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 Rebuilt {written} daily summaries in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_daily_summaries(apps, schema_editor):
+    NutritionLog = apps.get_model('nutrition', 'NutritionLog')
+    NutritionDailySummary = apps.get_model('nutrition', 'NutritionDailySummary')
+
+    grouped = (
+        NutritionLog.objects.values('user_id', 'date')
+        .annotate(
+            total_calories=Sum('calories'),
+            total_protein=Sum('protein'),
+            total_carbs=Sum('carbs'),
+            total_fats=Sum('fats'),
+            total_meals=Count('id'),
+        )
+        .order_by()
+    )
+    NutritionDailySummary.objects.bulk_create(
+        [
+            NutritionDailySummary(
+                user_id=row['user_id'],
+                date=row['date'],
+                calories=row['total_calories'] or 0,
+                protein=row['total_protein'] or 0,
+                carbs=row['total_carbs'] or 0,
+                fats=row['total_fats'] or 0,
+                meal_count=row['total_meals'],
+            )
+            for row in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nutrition', '0004_alter_nutritionlog_date_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NutritionDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('calories', models.PositiveIntegerField(default=0)),
+                ('protein', models.FloatField(default=0)),
+                ('carbs', models.FloatField(default=0)),
+                ('fats', models.FloatField(default=0)),
+                ('meal_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal', '0007_mealquiz_food_preference'),
+        ('nutrition', '0005_nutritiondailysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=models.Index(fields=['user', '-date', '-id'], name='nutritionlog_user_history'),
+        ),
+    ]
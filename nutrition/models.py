@@ -25,10 +25,10 @@ class NutritionLog(models.Model):
 
     def save(self, *args, **kwargs):
         if self.meal:
-            self.calories = self.meal.calories
-            self.protein = self.meal.protein
-            self.carbs = self.meal.carbs
-            self.fats = self.meal.fats
+            self.calories = self.meal.calories or 0
+            self.protein = self.meal.protein or 0
+            self.carbs = self.meal.carbs or 0
+            self.fats = self.meal.fats or 0
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -36,3 +36,26 @@ class NutritionLog(models.Model):
 
     class Meta:
         unique_together = ('user', 'meal', 'date')
+        indexes = [
+            # keyset pagination of a user's history: (date, id) descending
+            models.Index(fields=['user', '-date', '-id'], name='nutritionlog_user_history'),
+        ]
+
+
+class NutritionDailySummary(models.Model):
+    """Per-user daily totals of NutritionLog, kept up to date as logs change."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    date = models.DateField()
+
+    calories = models.PositiveIntegerField(default=0)
+    protein = models.FloatField(default=0)
+    carbs = models.FloatField(default=0)
+    fats = models.FloatField(default=0)
+    meal_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}: {self.calories} kcal"
+
+    class Meta:
+        unique_together = ('user', 'date')
+        ordering = ['-date']
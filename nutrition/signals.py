@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from nutrition.models import NutritionLog
+from nutrition.utils import MACRO_FIELDS, apply_log_to_daily_summary
+
+
+@receiver(pre_save, sender=NutritionLog)
+def remember_previous_log(sender, instance, **kwargs):
+    # Edits (rare) need the old values to move the right amounts between days
+    instance._previous = None
+    if instance.pk:
+        instance._previous = (
+            NutritionLog.objects.filter(pk=instance.pk)
+            .only("user_id", "date", *MACRO_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=NutritionLog)
+def log_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous", None)
+    if previous is not None:
+        apply_log_to_daily_summary(previous, sign=-1)
+    apply_log_to_daily_summary(instance)
+
+
+@receiver(post_delete, sender=NutritionLog)
+def log_deleted(sender, instance, **kwargs):
+    apply_log_to_daily_summary(instance, sign=-1)
@@ -1,3 +1,254 @@
+import importlib
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.db.models import Count, Sum
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from meal.models import Meal, MealPlan, MealPlanItem
+from .models import NutritionDailySummary, NutritionGoal, NutritionLog
+from .utils import log_meals, rebuild_daily_summaries
+
+
+class BulkNutritionLogTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="pass12345", student_id="alice-id", email="alice@uni.example",
+        )
+        self.client.force_login(self.user)
+        self.oats = Meal.objects.create(name="Oats", calories=350, protein=12, carbs=60, fats=6)
+        self.curry = Meal.objects.create(name="Curry", calories=650, protein=35, carbs=70, fats=20)
+
+    def log_bulk(self, data):
+        response = self.client.post(reverse("nutrition:add_bulk_to_nutrition_log"), data)
+        self.assertRedirects(response, reverse("nutrition:nutrition_dashboard"), fetch_redirect_response=False)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_logs_meal_ids_and_updates_summary(self):
+        messages = self.log_bulk({"meal_ids": f"{self.oats.id},{self.curry.id}"})
+
+        self.assertEqual(messages, ["2 meal(s) added to your daily nutrition log."])
+        summary = NutritionDailySummary.objects.get(user=self.user, date=timezone.now().date())
+        self.assertEqual(summary.calories, 1000)
+
+    def test_reports_duplicates_and_unknown_meals_separately(self):
+        log_meals(self.user, [self.oats.id], timezone.now().date())
+
+        messages = self.log_bulk({"meal_ids": [self.oats.id, self.curry.id, self.curry.id + 100]})
+
+        self.assertEqual(messages, [
+            "1 meal(s) added to your daily nutrition log.",
+            "1 meal(s) were already in your log today.",
+            "1 meal(s) could not be found.",
+        ])
+        self.assertEqual(NutritionLog.objects.filter(user=self.user).count(), 2)
+
+    def test_logs_a_plan_day(self):
+        plan = MealPlan.objects.create(user=self.user)
+        MealPlanItem.objects.create(meal_plan=plan, meal=self.oats, day_of_week="monday", meal_time="breakfast")
+        MealPlanItem.objects.create(meal_plan=plan, meal=self.curry, day_of_week="tuesday", meal_time="dinner")
+
+        messages = self.log_bulk({"plan_id": plan.id, "day": "monday"})
+
+        self.assertEqual(messages, ["1 meal(s) added to your daily nutrition log."])
+        self.assertEqual(list(NutritionLog.objects.values_list("meal_id", flat=True)), [self.oats.id])
+
+    def test_ignores_other_students_plans(self):
+        bob = get_user_model().objects.create_user(
+            username="bob", password="pass12345", student_id="bob-id", email="bob@uni.example",
+        )
+        plan = MealPlan.objects.create(user=bob)
+        MealPlanItem.objects.create(meal_plan=plan, meal=self.oats, day_of_week="monday", meal_time="lunch")
+
+        messages = self.log_bulk({"plan_id": plan.id, "day": "monday"})
+
+        self.assertEqual(messages, ["No meals selected to log."])
+        self.assertFalse(NutritionLog.objects.exists())
+
+    def test_non_numeric_plan_id_is_rejected(self):
+        messages = self.log_bulk({"plan_id": "abc", "day": "monday"})
+
+        self.assertEqual(messages, ["No meals selected to log."])
+
+
+def make_student(username):
+    return get_user_model().objects.create_user(
+        username=username, password="pass12345", student_id=f"{username}-id", email=f"{username}@uni.example",
+    )
+
+
+class DailySummaryTests(TestCase):
+    MONDAY = date(2026, 10, 12)
+    TUESDAY = MONDAY + timedelta(days=1)
+
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.oats = Meal.objects.create(name="Oats", calories=350, protein=12, carbs=60, fats=6)
+        self.curry = Meal.objects.create(name="Curry", calories=650, protein=35, carbs=70, fats=20)
+
+    def summary(self, day, user=None):
+        row = NutritionDailySummary.objects.filter(user=user or self.alice, date=day).first()
+        return row and (row.calories, row.protein, row.carbs, row.fats, row.meal_count)
+
+    def summed_from_logs(self):
+        """What the summaries should hold: a Sum over NutritionLog per user and day."""
+        rows = (
+            NutritionLog.objects.values("user_id", "date")
+            .annotate(Sum("calories"), Sum("protein"), Sum("carbs"), Sum("fats"), Count("id"))
+            .order_by()
+        )
+        return {
+            (row["user_id"], row["date"]): (
+                row["calories__sum"], row["protein__sum"], row["carbs__sum"], row["fats__sum"], row["id__count"],
+            )
+            for row in rows
+        }
+
+    def summaries(self):
+        return {
+            (row.user_id, row.date): (row.calories, row.protein, row.carbs, row.fats, row.meal_count)
+            for row in NutritionDailySummary.objects.filter(meal_count__gt=0)
+        }
+
+    def test_add_edit_and_delete(self):
+        log = NutritionLog.objects.create(user=self.alice, meal=self.oats, date=self.MONDAY)
+        NutritionLog.objects.create(user=self.alice, meal=self.curry, date=self.MONDAY)
+        self.assertEqual(self.summary(self.MONDAY), (1000, 47, 130, 26, 2))
+
+        log.meal = self.curry
+        log.date = self.TUESDAY
+        log.save()
+        self.assertEqual(self.summary(self.MONDAY), (650, 35, 70, 20, 1))
+        self.assertEqual(self.summary(self.TUESDAY), (650, 35, 70, 20, 1))
+
+        log.delete()
+        self.assertEqual(self.summary(self.TUESDAY), (0, 0, 0, 0, 0))
+        self.assertEqual(self.summaries(), self.summed_from_logs())
+
+    def test_deleting_a_meal_updates_summaries_of_cascaded_logs(self):
+        bob = make_student("bob")
+        for user in (self.alice, bob):
+            NutritionLog.objects.create(user=user, meal=self.oats, date=self.MONDAY)
+            NutritionLog.objects.create(user=user, meal=self.curry, date=self.MONDAY)
+
+        self.curry.delete()
+
+        self.assertEqual(self.summary(self.MONDAY), (350, 12, 60, 6, 1))
+        self.assertEqual(self.summary(self.MONDAY, bob), (350, 12, 60, 6, 1))
+        self.assertEqual(self.summaries(), self.summed_from_logs())
+
+    def make_history(self):
+        bob = make_student("bob")
+        for offset in range(3):
+            day = self.MONDAY + timedelta(days=offset)
+            NutritionLog.objects.create(user=self.alice, meal=self.oats, date=day)
+            NutritionLog.objects.create(user=bob, meal=self.curry, date=day)
+        NutritionLog.objects.create(user=bob, meal=self.oats, date=self.MONDAY)
+
+    def test_rebuild_matches_a_sum_over_logs(self):
+        self.make_history()
+        expected = self.summed_from_logs()
+        NutritionDailySummary.objects.filter(user=self.alice).update(calories=1, meal_count=9)
+        NutritionDailySummary.objects.filter(date=self.TUESDAY).delete()
+
+        written = rebuild_daily_summaries()
+
+        self.assertEqual(written, len(expected))
+        self.assertEqual(self.summaries(), expected)
+
+    def test_rebuild_can_be_limited_to_some_users(self):
+        self.make_history()
+        expected = self.summed_from_logs()
+        NutritionDailySummary.objects.update(calories=1)
+
+        rebuild_daily_summaries(user_ids=[self.alice.id])
+
+        self.assertEqual(self.summary(self.MONDAY), expected[(self.alice.id, self.MONDAY)])
+        self.assertEqual(NutritionDailySummary.objects.exclude(user=self.alice).filter(calories=1).count(), 3)
+
+    def test_migration_backfill_matches_a_sum_over_logs(self):
+        self.make_history()
+        expected = self.summed_from_logs()
+        NutritionDailySummary.objects.all().delete()
+
+        migration = importlib.import_module("nutrition.migrations.0005_nutritiondailysummary")
+        migration.backfill_daily_summaries(apps, None)
+
+        self.assertEqual(self.summaries(), expected)
+
+
+class TrendsAndHistoryTests(TestCase):
+    MONDAY = date(2026, 10, 12)
+
+    def setUp(self):
+        self.alice = make_student("alice")
+        self.client.force_login(self.alice)
+        self.meals = [
+            Meal.objects.create(name=f"Meal {n}", calories=500, protein=20, carbs=50, fats=10) for n in range(4)
+        ]
+
+    def log(self, day, *meals):
+        for meal in meals:
+            NutritionLog.objects.create(user=self.alice, meal=meal, date=day)
+
+    def test_trends_bucket_days_weeks_and_months_with_gaps(self):
+        NutritionGoal.objects.create(user=self.alice, daily_calorie_goal=1000)
+        self.log(self.MONDAY, *self.meals[:2])                     # 1000 kcal: on target
+        self.log(self.MONDAY + timedelta(days=2), self.meals[0])   # 500 kcal
+        self.log(self.MONDAY + timedelta(days=7), *self.meals[:2])  # next Monday
+
+        response = self.client.get(reverse("nutrition:trends"), {
+            "start": self.MONDAY.isoformat(), "end": (self.MONDAY + timedelta(days=8)).isoformat(),
+        })
+
+        data = response.json()
+        days = data["day"]
+        self.assertEqual(len(days), 9)
+        self.assertEqual([d["totals"]["calories"] for d in days], [1000, 0, 500, 0, 0, 0, 0, 1000, 0])
+        self.assertEqual([d["start"] for d in data["week"]], ["2026-10-12", "2026-10-19"])
+        first_week = data["week"][0]
+        self.assertEqual(
+            (first_week["days"], first_week["days_logged"], first_week["days_on_target"], first_week["meals"]),
+            (7, 2, 1, 3),
+        )
+        # Averages are per logged day, not per calendar day
+        self.assertEqual(first_week["daily_average"]["calories"], 750)
+        self.assertEqual(first_week["adherence"]["calories"], 0.75)
+        self.assertEqual(data["week"][1]["days"], 2)
+        self.assertEqual([(m["start"], m["meals"]) for m in data["month"]], [("2026-10-01", 5)])
+
+    def test_trends_reject_bad_ranges(self):
+        for params in (
+            {"start": "2026-13-01"}, {"start": "2026-10-12", "end": "2026-10-11"},
+            {"start": "2000-01-01", "end": "2026-10-12"}, {"bucket": "day,year"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse("nutrition:trends"), params).status_code, 400)
+
+    def test_history_pages_across_equal_dates(self):
+        # Three logs share a date, so pages must break ties on id
+        self.log(self.MONDAY, *self.meals[:3])
+        self.log(self.MONDAY + timedelta(days=1), self.meals[0])
+        self.log(self.MONDAY - timedelta(days=1), self.meals[3])
+        expected = list(NutritionLog.objects.order_by("-date", "-id").values_list("id", flat=True))
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get(reverse("nutrition:log_history"), params).json()
+            seen += [log["id"] for log in data["logs"]]
+            cursor = data["next"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, expected)
 
-# Create your tests here.
+    def test_history_rejects_malformed_cursors(self):
+        for cursor in ("abc", "2026-10-12", "2026-13-01_5", "2026-10-12_x", "2026-10-12_1_2"):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("nutrition:log_history"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 400)
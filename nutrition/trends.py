@@ -0,0 +1,113 @@
+"""
+Long-range nutrition trends computed from the daily rollup.
+
+One query loads the user's NutritionDailySummary rows for the range into
+NumPy arrays laid out one slot per calendar day; weekly and monthly
+buckets are then vectorized reductions (``np.bincount``) over those
+arrays, so a multi-year range costs the same single query as a week.
+
+NumPy is imported inside the functions so that loading the URLconf (every
+worker, every management command) does not pay for it.
+"""
+
+from nutrition.models import NutritionDailySummary
+
+MACROS = ("calories", "protein", "carbs", "fats")
+GOAL_FIELDS = {
+    "calories": "daily_calorie_goal",
+    "protein": "daily_protein_goal",
+    "carbs": "daily_carbs_goal",
+    "fats": "daily_fats_goal",
+}
+BUCKETS = ("day", "week", "month")
+
+# A logged day is "on target" when calories land within ±10% of the goal
+ON_TARGET_TOLERANCE = 0.10
+
+
+def load_daily_arrays(user, start, end):
+    """Dense per-day arrays (zeros where nothing was logged) for [start, end]."""
+    import numpy as np
+
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    arrays = {field: np.zeros(len(days)) for field in MACROS + ("meal_count",)}
+
+    rows = list(
+        NutritionDailySummary.objects.filter(user=user, date__range=(start, end))
+        .values_list("date", *MACROS, "meal_count")
+    )
+    if rows:
+        columns = list(zip(*rows))
+        index = (np.array(columns[0], dtype="datetime64[D]") - days[0]).astype(np.int64)
+        for field, values in zip(MACROS + ("meal_count",), columns[1:]):
+            arrays[field][index] = np.array(values, dtype=float)
+
+    return days, arrays
+
+
+def bucket_keys(days, bucket):
+    """Start date of the day/ISO-week/month each day falls in."""
+    import numpy as np
+
+    if bucket == "week":
+        # datetime64 weeks start on Thursday (1970-01-01); shift so they start on Monday
+        shift = np.timedelta64(3, "D")
+        return (days + shift).astype("datetime64[W]").astype("datetime64[D]") - shift
+    if bucket == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+
+def summarize(days, arrays, goal, bucket="day"):
+    """Per-bucket totals, per-logged-day averages and goal adherence."""
+    import numpy as np
+
+    starts, inverse = np.unique(bucket_keys(days, bucket), return_inverse=True)
+    n = len(starts)
+
+    logged = arrays["meal_count"] > 0
+    calorie_goal = getattr(goal, GOAL_FIELDS["calories"]) or 0
+    on_target = logged & (
+        np.abs(arrays["calories"] - calorie_goal) <= ON_TARGET_TOLERANCE * calorie_goal
+    )
+
+    day_count = np.bincount(inverse, minlength=n)
+    logged_count = np.bincount(inverse, weights=logged, minlength=n)
+    on_target_count = np.bincount(inverse, weights=on_target, minlength=n)
+    meals = np.bincount(inverse, weights=arrays["meal_count"], minlength=n)
+
+    totals, averages, adherence = {}, {}, {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for macro in MACROS:
+            totals[macro] = np.bincount(inverse, weights=arrays[macro], minlength=n)
+            averages[macro] = np.where(logged_count > 0, totals[macro] / logged_count, 0.0)
+            target = getattr(goal, GOAL_FIELDS[macro]) or 0
+            adherence[macro] = averages[macro] / target if target else np.zeros(n)
+
+    # Convert once to plain Python lists; per-element NumPy access is slow
+    starts = starts.astype(str).tolist()
+    day_count, logged_count, on_target_count, meals = (
+        a.astype(int).tolist() for a in (day_count, logged_count, on_target_count, meals)
+    )
+    totals = {m: np.round(totals[m], 1).tolist() for m in MACROS}
+    averages = {m: np.round(averages[m], 1).tolist() for m in MACROS}
+    adherence = {m: np.round(adherence[m], 3).tolist() for m in MACROS}
+
+    return [
+        {
+            "start": starts[i],
+            "days": day_count[i],
+            "days_logged": logged_count[i],
+            "days_on_target": on_target_count[i],
+            "meals": meals[i],
+            "totals": {m: totals[m][i] for m in MACROS},
+            "daily_average": {m: averages[m][i] for m in MACROS},
+            "adherence": {m: adherence[m][i] for m in MACROS},
+        }
+        for i in range(n)
+    ]
+
+
+def nutrition_trends(user, goal, start, end, buckets=BUCKETS):
+    days, arrays = load_daily_arrays(user, start, end)
+    return {bucket: summarize(days, arrays, goal, bucket) for bucket in buckets}
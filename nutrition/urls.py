@@ -6,5 +6,8 @@ app_name = "nutrition"
 urlpatterns = [
     path("dashboard/", views.nutrition_dashboard, name="nutrition_dashboard"),
     path("add/<int:meal_id>/", views.add_to_nutrition_log, name="add_to_nutrition_log"),
+    path("add-bulk/", views.add_bulk_to_nutrition_log, name="add_bulk_to_nutrition_log"),
     path("delete/<int:log_id>/", views.delete_log, name="delete_log"),
+    path("trends/", views.nutrition_trends_api, name="trends"),
+    path("logs/", views.nutrition_log_history, name="log_history"),
 ]
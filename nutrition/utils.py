@@ -0,0 +1,156 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from meal.models import Meal
+from nutrition.models import NutritionDailySummary, NutritionLog
+
+MACRO_FIELDS = ("calories", "protein", "carbs", "fats")
+
+
+def apply_to_daily_summary(user_id, date, calories=0, protein=0, carbs=0, fats=0, meal_count=1):
+    """
+    Add (or, with negative values, subtract) one or more logs' macros to the
+    user's summary row for ``date`` using F() deltas, creating it if needed.
+    """
+    deltas = {
+        "calories": F("calories") + (calories or 0),
+        "protein": F("protein") + (protein or 0),
+        "carbs": F("carbs") + (carbs or 0),
+        "fats": F("fats") + (fats or 0),
+        "meal_count": F("meal_count") + meal_count,
+    }
+    rows = NutritionDailySummary.objects.filter(user_id=user_id, date=date)
+    if rows.update(**deltas) or meal_count <= 0:
+        return
+
+    try:
+        with transaction.atomic():
+            NutritionDailySummary.objects.create(
+                user_id=user_id, date=date,
+                calories=calories or 0, protein=protein or 0,
+                carbs=carbs or 0, fats=fats or 0,
+                meal_count=meal_count,
+            )
+    except IntegrityError:
+        # Another request created the row first
+        rows.update(**deltas)
+
+
+def apply_log_to_daily_summary(log, sign=1):
+    apply_to_daily_summary(
+        log.user_id, log.date,
+        **{field: sign * (getattr(log, field) or 0) for field in MACRO_FIELDS},
+        meal_count=sign,
+    )
+
+
+def refresh_daily_summary(user_id, date):
+    """
+    Recompute one day's summary from its logs (a handful of rows).
+
+    Used after bulk inserts, which bypass the NutritionLog signals.
+    Returns the day's meal count before and after.
+    """
+    before = (
+        NutritionDailySummary.objects.filter(user_id=user_id, date=date)
+        .values_list("meal_count", flat=True).first()
+    ) or 0
+    totals = NutritionLog.objects.filter(user_id=user_id, date=date).aggregate(
+        calories=Sum("calories"), protein=Sum("protein"),
+        carbs=Sum("carbs"), fats=Sum("fats"), meal_count=Count("id"),
+    )
+    NutritionDailySummary.objects.update_or_create(
+        user_id=user_id, date=date,
+        defaults={field: value or 0 for field, value in totals.items()},
+    )
+    return before, totals["meal_count"]
+
+
+def log_meals(user, meal_ids, date):
+    """
+    Log several meals for one day in a single insert.
+
+    Macros are copied from the meals in Python (what NutritionLog.save
+    would do per row) and meals already logged that day are skipped by the
+    (user, meal, date) unique constraint. Returns the number of new logs
+    and the number of ``meal_ids`` that exist.
+    """
+    meals = Meal.objects.only(*MACRO_FIELDS).in_bulk(set(meal_ids))
+    if not meals:
+        return 0, 0
+
+    NutritionLog.objects.bulk_create(
+        [
+            NutritionLog(
+                user=user, meal=meal, date=date,
+                **{field: getattr(meal, field) or 0 for field in MACRO_FIELDS},
+            )
+            for meal in meals.values()
+        ],
+        ignore_conflicts=True,
+    )
+    before, after = refresh_daily_summary(user.id, date)
+    return after - before, len(meals)
+
+
+def get_daily_totals(user, date):
+    """Totals for one day, read from the precomputed summary."""
+    return _daily_totals(NutritionDailySummary.objects.filter(user=user, date=date).first())
+
+
+async def aget_daily_totals(user, date):
+    return _daily_totals(await NutritionDailySummary.objects.filter(user=user, date=date).afirst())
+
+
+def _daily_totals(summary):
+    return {
+        "total_calories": summary.calories if summary else 0,
+        "total_protein": summary.protein if summary else 0,
+        "total_carbs": summary.carbs if summary else 0,
+        "total_fats": summary.fats if summary else 0,
+        "meal_count": summary.meal_count if summary else 0,
+    }
+
+
+def rebuild_daily_summaries(user_ids=None, batch_size=1000):
+    """Recompute summary rows from NutritionLog in bulk. Returns rows written."""
+    logs = NutritionLog.objects.all()
+    summaries = NutritionDailySummary.objects.all()
+    if user_ids:
+        logs = logs.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+
+    grouped = (
+        logs.values("user_id", "date")
+        .annotate(
+            total_calories=Sum("calories"),
+            total_protein=Sum("protein"),
+            total_carbs=Sum("carbs"),
+            total_fats=Sum("fats"),
+            total_meals=Count("id"),
+        )
+        .order_by()
+    )
+
+    written = 0
+    with transaction.atomic():
+        summaries.delete()
+        batch = []
+        for row in grouped.iterator(chunk_size=batch_size):
+            batch.append(NutritionDailySummary(
+                user_id=row["user_id"],
+                date=row["date"],
+                calories=row["total_calories"] or 0,
+                protein=row["total_protein"] or 0,
+                carbs=row["total_carbs"] or 0,
+                fats=row["total_fats"] or 0,
+                meal_count=row["total_meals"],
+            ))
+            if len(batch) >= batch_size:
+                NutritionDailySummary.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        NutritionDailySummary.objects.bulk_create(batch)
+        written += len(batch)
+
+    return written
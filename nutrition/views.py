@@ -2,29 +2,34 @@ from django.shortcuts import render, redirect
 
 # Create your views here.
 from .models import NutritionGoal, NutritionLog
-from meal.models import Meal
+from meal.models import Meal, MealPlanItem
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.utils import timezone
-from django.db.models import Sum
+from .utils import aget_daily_totals, log_meals
 from django.contrib import messages
 from django.db import IntegrityError
+from django.db.models import Q
+from django.http import JsonResponse
+from .trends import BUCKETS, GOAL_FIELDS, nutrition_trends
+from asgiref.sync import sync_to_async
+import datetime
 
 @login_required
-def nutrition_dashboard(request):
-    user = request.user
+async def nutrition_dashboard(request):
+    user = await request.auser()
     today = timezone.now().date()
 
-    goal, _ = NutritionGoal.objects.get_or_create(user=user)
+    goal, _ = await NutritionGoal.objects.aget_or_create(user=user)
 
     # today's logs
-    logs = NutritionLog.objects.filter(user=user, date=today)
+    logs = [
+        log async for log in
+        NutritionLog.objects.filter(user=user, date=today).select_related('meal')
+    ]
 
-    totals = logs.aggregate(
-        total_calories=Sum('calories') or 0,
-        total_protein=Sum('protein') or 0,
-        total_carbs=Sum('carbs') or 0,
-        total_fats=Sum('fats') or 0
-    )
+    # precomputed from the daily rollup, kept current as logs change
+    totals = await aget_daily_totals(user, today)
 
     context = {
         "goal": goal,
@@ -32,7 +37,7 @@ def nutrition_dashboard(request):
         "totals": totals,
     }
 
-    return render(request, "nutrition_dashboard.html", context)
+    return await sync_to_async(render)(request, "nutrition_dashboard.html", context)
 
 
 @login_required
@@ -65,6 +70,48 @@ def add_to_nutrition_log(request, meal_id):
     return redirect("nutrition:nutrition_dashboard")
 
 
+@login_required
+@require_POST
+def add_bulk_to_nutrition_log(request):
+    """
+    Log a whole plan day (``plan_id`` + ``day``) or a list of ``meal_ids``
+    in one request.
+    """
+    today = timezone.now().date()
+    plan_id = request.POST.get("plan_id", "").strip()
+    day = request.POST.get("day")
+
+    if plan_id and day:
+        if not plan_id.isdigit():
+            messages.error(request, "No meals selected to log.")
+            return redirect("nutrition:nutrition_dashboard")
+        meal_ids = list(
+            MealPlanItem.objects.filter(
+                meal_plan_id=plan_id, meal_plan__user=request.user, day_of_week=day
+            ).values_list("meal_id", flat=True)
+        )
+    else:
+        raw_ids = ",".join(request.POST.getlist("meal_ids"))
+        meal_ids = [int(i) for i in raw_ids.split(",") if i.strip().isdigit()]
+
+    if not meal_ids:
+        messages.error(request, "No meals selected to log.")
+        return redirect("nutrition:nutrition_dashboard")
+
+    added, found = log_meals(request.user, meal_ids, today)
+    skipped = found - added
+    missing = len(set(meal_ids)) - found
+
+    if added:
+        messages.success(request, f"{added} meal(s) added to your daily nutrition log.")
+    if skipped:
+        messages.warning(request, f"{skipped} meal(s) were already in your log today.")
+    if missing:
+        messages.error(request, f"{missing} meal(s) could not be found.")
+
+    return redirect("nutrition:nutrition_dashboard")
+
+
 @login_required
 def delete_log(request, log_id):
     log = NutritionLog.objects.filter(id=log_id, user=request.user).first()
@@ -77,3 +124,88 @@ def delete_log(request, log_id):
     messages.success(request, "Meal removed from your nutrition log.")
     return redirect("nutrition:nutrition_dashboard")
 
+
+MAX_TREND_DAYS = 366 * 10
+MAX_LOG_PAGE = 200
+
+
+def _parse_date(value, default):
+    return datetime.date.fromisoformat(value) if value else default
+
+
+@login_required
+def nutrition_trends_api(request):
+    """
+    Daily/weekly/monthly macro totals and goal adherence as JSON.
+
+    Query params: ``start``/``end`` (ISO dates, default the last year) and
+    ``bucket`` (comma-separated subset of day,week,month; default all).
+    """
+    today = timezone.now().date()
+    try:
+        end = _parse_date(request.GET.get("end"), today)
+        start = _parse_date(request.GET.get("start"), end - datetime.timedelta(days=364))
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Dates must be YYYY-MM-DD."}, status=400)
+
+    buckets = [b for b in request.GET.get("bucket", ",".join(BUCKETS)).split(",") if b]
+    if start > end or (end - start).days >= MAX_TREND_DAYS or not set(buckets) <= set(BUCKETS):
+        return JsonResponse({"status": "error", "message": "Invalid range or bucket."}, status=400)
+
+    goal, _ = NutritionGoal.objects.get_or_create(user=request.user)
+
+    return JsonResponse({
+        "status": "ok",
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "goal": {macro: getattr(goal, field) for macro, field in GOAL_FIELDS.items()},
+        **nutrition_trends(request.user, goal, start, end, buckets),
+    })
+
+
+@login_required
+def nutrition_log_history(request):
+    """
+    Raw logs, newest first, with keyset pagination.
+
+    Pass the previous page's ``next`` value as ``cursor`` ("<date>_<id>");
+    each page is a single index range scan regardless of how deep it is.
+    """
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), MAX_LOG_PAGE))
+        cursor = request.GET.get("cursor")
+        logs = NutritionLog.objects.filter(user=request.user)
+        if cursor:
+            cursor_date, cursor_id = cursor.split("_")
+            cursor_date = datetime.date.fromisoformat(cursor_date)
+            logs = logs.filter(
+                Q(date__lt=cursor_date) | Q(date=cursor_date, id__lt=int(cursor_id))
+            )
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid cursor or limit."}, status=400)
+
+    page = list(
+        logs.order_by("-date", "-id")
+        .values("id", "date", "meal_id", "meal__name", "calories", "protein", "carbs", "fats")
+        [:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return JsonResponse({
+        "status": "ok",
+        "logs": [
+            {
+                "id": log["id"],
+                "date": log["date"].isoformat(),
+                "meal_id": log["meal_id"],
+                "meal": log["meal__name"],
+                "calories": log["calories"],
+                "protein": log["protein"],
+                "carbs": log["carbs"],
+                "fats": log["fats"],
+            }
+            for log in page
+        ],
+        "next": f"{page[-1]['date'].isoformat()}_{page[-1]['id']}" if has_more else None,
+    })
@@ -3,6 +3,18 @@ ASGI config for smart_meal_planner project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The meal plan, shopping list, nutrition dashboard and leftover recommendation
+views are async, so under ASGI a worker keeps serving other requests while
+they wait on the database. To deploy with ASGI instead of WSGI, install uvicorn and run:
+
+    gunicorn smart_meal_planner.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+Persistent database connections are turned off here (DB_CONN_MAX_AGE=0).
+Each ASGI request runs its synchronous work (ORM calls, template rendering)
+in a thread of its own, so a persistent connection would never be reused.
+wsgi.py still works: Django runs the async views in a per-request event loop.
+``manage.py bench_async_views`` compares the two.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +24,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_meal_planner.settings')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
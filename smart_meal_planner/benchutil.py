@@ -0,0 +1,13 @@
+"""
+Helpers shared by the benchmark and load-test management commands
+(``loadtest_journey``, ``bench_async_views``, ``bench_write_contention``).
+"""
+
+import statistics
+
+
+def percentile(sorted_values, q):
+    """The ``q``-th percentile (1-99) of an already sorted, non-empty list."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[q - 1]
@@ -0,0 +1,336 @@
+"""
+Minimal Prometheus-style metrics: counters and histograms with labels, a
+``timed`` context manager/decorator for stage timings, and ``/metrics`` in
+the text exposition format.
+
+Each process keeps its values in memory. When ``METRICS_DIR`` is set, a
+background thread in every process also snapshots them to
+``<METRICS_DIR>/<pid>-<start>.json`` (every ``METRICS_FLUSH_SECONDS`` while
+they change; request threads and the event loop never write), and
+``/metrics`` sums the snapshots of all live workers, so any worker can
+answer a scrape for the whole deployment. Snapshots of exited workers, or of an earlier process that had
+the same pid, are deleted at scrape time.
+
+``/metrics`` is for staff sessions or scrapers sending
+``Authorization: Bearer <METRICS_TOKEN>``.
+"""
+
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics = {}
+_dirty = False  # Values changed since the last snapshot; guarded by _lock
+_flusher_pid = None  # Threads do not survive a fork: each worker starts its own
+_snapshot_file = None  # (pid, file name); renamed in forked children
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        global _dirty
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            _dirty = True
+        _ensure_flusher()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        global _dirty
+        key = self._key(labels)
+        with _lock:
+            # [per-bucket counts (non-cumulative, last is +Inf), sum]
+            state = self.values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            state[0][index] += 1
+            state[1] += value
+            _dirty = True
+        _ensure_flusher()
+
+
+def _register(metric):
+    with _lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} already registered differently")
+            return existing
+        _metrics[metric.name] = metric
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+class timed:
+    """
+    Observe elapsed seconds on a histogram::
+
+        with timed(STAGE_SECONDS, operation="generate_meal_plan", stage="insert"):
+            ...
+
+        @timed(STAGE_SECONDS, operation="compare_outlet_prices", stage="total")
+        def compare_outlet_prices(...): ...
+    """
+
+    def __init__(self, metric, **labels):
+        self.metric = metric
+        self.labels = labels
+        metric._key(labels)  # Fail at definition time on wrong labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metric.observe(time.perf_counter() - self._started, **self.labels)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.metric, **self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+# --- Multi-process snapshots ---
+
+def _snapshot():
+    with _lock:
+        return {
+            name: {
+                "kind": metric.kind,
+                "documentation": metric.documentation,
+                "labelnames": metric.labelnames,
+                "buckets": getattr(metric, "buckets", None),
+                "values": [[list(key), value] for key, value in metric.values.items()],
+            }
+            for name, metric in _metrics.items()
+        }
+
+
+def _snapshot_filename():
+    global _snapshot_file
+    pid = os.getpid()
+    if _snapshot_file is None or _snapshot_file[0] != pid:
+        # The start stamp tells this process apart from an exited one with the same pid
+        _snapshot_file = (pid, f"{pid}-{time.time_ns()}.json")
+    return _snapshot_file[1]
+
+
+def flush():
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(_snapshot(), f)
+    os.replace(tmp, os.path.join(directory, _snapshot_filename()))
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    if _flusher_pid == os.getpid() or not getattr(settings, "METRICS_DIR", None):
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def _flush_loop():
+    global _dirty
+    while True:
+        time.sleep(getattr(settings, "METRICS_FLUSH_SECONDS", 1.0))
+        with _lock:
+            dirty, _dirty = _dirty, False
+        if not dirty:
+            continue
+        try:
+            flush()
+        except OSError:
+            logger.exception("Could not write the metrics snapshot")
+            with _lock:
+                _dirty = True
+
+
+def _merge(target, snapshot):
+    for name, metric in snapshot.items():
+        merged = target.setdefault(name, {**metric, "values": {}})
+        for key, value in metric["values"]:
+            key = tuple(key)
+            if metric["kind"] == "counter":
+                merged["values"][key] = merged["values"].get(key, 0) + value
+            else:
+                counts, total = merged["values"].get(key, [[0] * len(value[0]), 0.0])
+                merged["values"][key] = [[a + b for a, b in zip(counts, value[0])], total + value[1]]
+
+
+def collect():
+    """All metrics, summed over every worker's snapshot when METRICS_DIR is set."""
+    directory = getattr(settings, "METRICS_DIR", None)
+    if not directory:
+        merged = {}
+        _merge(merged, _snapshot())
+        return merged
+
+    flush()
+    merged = {}
+    for filename in _live_snapshots(directory):
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                _merge(merged, json.load(f))
+        except (OSError, ValueError):
+            continue  # A worker being replaced; it will be back next scrape
+    return merged
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, but another user's
+    return True
+
+
+def _live_snapshots(directory):
+    """Newest snapshot of each running pid; the others are deleted."""
+    newest, stale = {}, []
+    for filename in os.listdir(directory):
+        pid, _, started = filename.removesuffix(".json").partition("-")
+        if not filename.endswith(".json") or not pid.isdigit():
+            continue
+        pid, started = int(pid), int(started) if started.isdigit() else 0
+        if not _pid_alive(pid):
+            stale.append(filename)
+        elif pid in newest and newest[pid][0] >= started:
+            stale.append(filename)
+        else:
+            if pid in newest:
+                stale.append(newest[pid][1])
+            newest[pid] = (started, filename)
+
+    for filename in stale:
+        try:
+            os.unlink(os.path.join(directory, filename))
+        except FileNotFoundError:
+            pass  # Pruned by another worker's scrape
+    return [filename for _, filename in newest.values()]
+
+
+# --- Exposition ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_text(merged):
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        names = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['documentation']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric["values"].items()):
+            if metric["kind"] == "counter":
+                lines.append(f"{name}{_labels(names, key)} {_number(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], "+Inf"], counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(f"{name}_bucket{_labels(names, key, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, key)} {_number(float(total))}")
+            lines.append(f"{name}_count{_labels(names, key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(supplied.encode(), token.encode()):
+            return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    if not _authorized(request):
+        return HttpResponseForbidden("Forbidden\n", content_type="text/plain")
+    return HttpResponse(render_text(collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# --- Application metrics ---
+
+STAGE_SECONDS = histogram(
+    "smartmeal_stage_duration_seconds",
+    "Time spent in each stage of an instrumented operation.",
+    ["operation", "stage"],
+)
+MEAL_PLANS_GENERATED = counter(
+    "smartmeal_meal_plans_generated_total", "Meal plans generated.", ["goal"]
+)
+RECOMMENDATIONS_SERVED = counter(
+    "smartmeal_leftover_recommendations_total", "Leftover recommendation pages served."
+)
+SHOPPING_LISTS_CREATED = counter(
+    "smartmeal_shopping_lists_created_total", "Shopping lists built from a meal plan."
+)
@@ -0,0 +1,220 @@
+"""
+Per-request performance instrumentation.
+
+``PerfMiddleware`` records, for a sampled share of requests (``PERF_SAMPLE_RATE``),
+the view's wall time, its SQL query count and time, and how often each query
+*shape* ran. Django hands queries to the backend with ``%s`` placeholders, so
+the SQL text itself is the fingerprint (``IN`` lists are collapsed); a shape
+repeated ``PERF_N_PLUS_ONE_THRESHOLD`` times or more in one request is
+flagged as a likely N+1.
+
+Records go to the ``smart_meal_planner.perf`` logger as one JSON object per
+line (WARNING when slow or N+1, INFO otherwise; see ``LOGGING`` in settings
+for where each level goes) and to an in-process ring buffer that staff can
+read at ``/perf/requests/``. Unsampled requests cost one ``random()`` call.
+
+Queries are attributed through a context variable rather than per-connection
+wrappers, because async views run their ORM calls in other threads (each with
+its own connections); asgiref carries the context into those threads.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+logger = logging.getLogger("smart_meal_planner.perf")
+
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+_buffer = deque(maxlen=getattr(settings, "PERF_RING_SIZE", 500))
+_buffer_lock = threading.Lock()
+_recorder = contextvars.ContextVar("perf_recorder", default=None)
+
+
+def fingerprint(sql):
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` callable that times and counts queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+
+def record_queries(execute, sql, params, many, context):
+    """Execute wrapper on every connection; a no-op outside sampled requests."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install(connection, **kwargs):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+class PerfMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = getattr(settings, "PERF_SAMPLE_RATE", 1.0)
+        self.slow_ms = getattr(settings, "PERF_SLOW_REQUEST_MS", 500)
+        self.n_plus_one = getattr(settings, "PERF_N_PLUS_ONE_THRESHOLD", 5)
+        # Static and media files are not worth a sample
+        self.skipped = tuple(
+            "/" + prefix.lstrip("/") for prefix in (settings.STATIC_URL, settings.MEDIA_URL) if prefix
+        )
+        connection_created.connect(install, dispatch_uid="smart_meal_planner.perf.install")
+
+    def sampled(self, request):
+        return random.random() < self.sample_rate and not request.path.startswith(self.skipped)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        # Connections opened before this middleware was loaded
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        user = getattr(request, "user", None)
+        self.record(request, response, recorder, duration_ms, getattr(user, "pk", None))
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        # request.user would query synchronously; auser() is cached by the view's login check
+        user = await request.auser() if hasattr(request, "auser") else None
+        self.record(request, response, recorder, duration_ms, getattr(user, "pk", None))
+        return response
+
+    def record(self, request, response, recorder, duration_ms, user_id):
+        match = request.resolver_match
+        repeated = [
+            {"sql": sql[:300], "count": count}
+            for sql, count in recorder.shapes.most_common()
+            if count >= self.n_plus_one
+        ]
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "user_id": user_id,
+            "duration_ms": round(duration_ms, 2),
+            "queries": recorder.count,
+            "query_ms": round(recorder.seconds * 1000, 2),
+            "n_plus_one": repeated,
+        }
+        with _buffer_lock:
+            _buffer.append(entry)
+
+        level = logging.WARNING if repeated or duration_ms >= self.slow_ms else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(entry))
+
+
+def recent_requests():
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(entries):
+    """Per-view count, p50/p95 wall time, mean queries and N+1 hits."""
+    by_view = {}
+    for entry in entries:
+        by_view.setdefault(entry["view"] or entry["path"], []).append(entry)
+
+    summary = {}
+    for view, rows in by_view.items():
+        durations = sorted(row["duration_ms"] for row in rows)
+        summary[view] = {
+            "requests": len(rows),
+            "p50_ms": _percentile(durations, 0.50),
+            "p95_ms": _percentile(durations, 0.95),
+            "mean_queries": round(sum(row["queries"] for row in rows) / len(rows), 1),
+            "n_plus_one_requests": sum(1 for row in rows if row["n_plus_one"]),
+        }
+    return summary
+
+
+@staff_member_required
+def perf_requests(request):
+    """
+    Staff-only JSON view of the ring buffer.
+    Filters: ?view=<view_name>, ?n_plus_one=1, ?limit=<n> (newest first).
+    """
+    entries = recent_requests()
+    view = request.GET.get("view")
+    if view:
+        entries = [entry for entry in entries if entry["view"] == view]
+    if request.GET.get("n_plus_one"):
+        entries = [entry for entry in entries if entry["n_plus_one"]]
+
+    try:
+        limit = max(int(request.GET.get("limit", 100)), 0)
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "limit must be an integer"}, status=400)
+
+    return JsonResponse({
+        "status": "ok",
+        "sample_rate": getattr(settings, "PERF_SAMPLE_RATE", 1.0),
+        "summary": summarize(entries),
+        "requests": entries[::-1][:limit],
+    })
@@ -0,0 +1,104 @@
+"""
+Read-replica routing.
+
+Catalog models (``REPLICA_MODELS``: meals, grocery items, outlets) are read
+from a random alias in ``DATABASE_REPLICAS``. Reporting code opts in
+explicitly with ``.using(read_replica())``. Every write, and every other
+model, goes to the primary.
+
+Read-your-writes: routing only happens inside a ``use_replicas()`` scope.
+``ReplicaMiddleware`` opens one per request. The first write in a scope pins
+the rest of it to the primary. The middleware then sets a short-lived cookie
+(``REPLICA_PIN_SECONDS``, to cover replication lag) so the user's next
+requests are pinned too, e.g. the page a POST redirects to. Outside a scope
+(management commands, the shell) everything uses the primary, because scripts
+tend to read, modify and write back.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = "primary_pin"
+
+_scope = contextvars.ContextVar("replica_scope", default=None)
+
+
+class Scope:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def use_replicas(pinned=False):
+    scope = Scope(pinned)
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def read_replica():
+    """A replica alias for reporting reads, or the primary if this scope has written."""
+    scope = _scope.get()
+    if not settings.DATABASE_REPLICAS or (scope is not None and scope.pinned):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Explicit, so related lookups from a replica-loaded meal still read
+        # plans, lists and logs from the primary
+        scope = _scope.get()
+        if scope is None or model._meta.label not in settings.REPLICA_MODELS:
+            return DEFAULT_DB_ALIAS
+        return read_replica()
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope.pinned = scope.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas are copies of the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS  # Replicas get the schema by replication
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with use_replicas(pinned=PIN_COOKIE in request.COOKIES) as scope:
+            response = self.get_response(request)
+        return self.pin(scope, response)
+
+    async def __acall__(self, request):
+        with use_replicas(pinned=PIN_COOKIE in request.COOKIES) as scope:
+            response = await self.get_response(request)
+        return self.pin(scope, response)
+
+    def pin(self, scope, response):
+        if scope.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                httponly=True, samesite="Lax",
+            )
+        return response
@@ -54,8 +54,55 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'smart_meal_planner.routers.ReplicaMiddleware',
+    'smart_meal_planner.perf.PerfMiddleware',
 ]
 
+# Request instrumentation (smart_meal_planner/perf.py). A sampled request pays
+# a few microseconds per SQL query; set PERF_SAMPLE_RATE=1 to see every
+# request while profiling locally.
+PERF_SAMPLE_RATE = float(os.environ.get('PERF_SAMPLE_RATE', 0.05))
+PERF_SLOW_REQUEST_MS = 500
+PERF_N_PLUS_ONE_THRESHOLD = 5
+PERF_RING_SIZE = 500
+
+# Metrics (smart_meal_planner/metrics.py). With several worker processes set
+# METRICS_DIR to a directory they share (emptied on deploy) so /metrics
+# reports all of them.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+# Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>"; without
+# it /metrics is staff-only
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_FLUSH_SECONDS = 1.0
+
+# Perf records are one JSON object per line: every sampled request at INFO
+# (the baseline), slow and N+1 requests at WARNING. The console only shows
+# PERF_LOG_LEVEL and up (WARNING unless set), so runserver and test output
+# stay readable; PERF_LOG_FILE, if set, collects the full baseline.
+PERF_LOG_LEVEL = os.environ.get('PERF_LOG_LEVEL', 'WARNING')
+PERF_LOG_FILE = os.environ.get('PERF_LOG_FILE')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'level': PERF_LOG_LEVEL},
+    },
+    'loggers': {
+        'smart_meal_planner.perf': {
+            'handlers': ['console'],
+            'level': 'INFO' if PERF_LOG_FILE else PERF_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+if PERF_LOG_FILE:
+    LOGGING['handlers']['perf_file'] = {
+        'class': 'logging.handlers.WatchedFileHandler',
+        'filename': PERF_LOG_FILE,
+    }
+    LOGGING['loggers']['smart_meal_planner.perf']['handlers'].append('perf_file')
+
 ROOT_URLCONF = 'smart_meal_planner.urls'
 
 TEMPLATES = [
@@ -80,13 +127,81 @@ AUTH_USER_MODEL  = 'accounts.StudentUser'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuning, applied by Django to every new connection (init_command):
+# - WAL lets readers continue while a writer commits.
+# - synchronous=NORMAL is safe under WAL: a power cut can drop the last
+#   commits but never corrupts the file.
+# - IMMEDIATE transactions take the write lock at BEGIN. A transaction that
+#   reads and then writes therefore waits out busy_timeout instead of
+#   failing with "database is locked".
+# There is still only one writer at a time; `manage.py bench_write_contention`
+# shows where that starts to hurt.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10_000,  # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -32 * 1024,  # KiB, per connection
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Reuse connections across requests; asgi.py sets 0 (ASGI runs each
+        # request's ORM calls in a fresh thread, so nothing would be reused)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Read replicas (smart_meal_planner/routers.py). DB_REPLICAS is a comma-separated
+# list of database files; locally, `manage.py replicate_sqlite` keeps SQLite
+# copies in sync. REPLICA_PIN_SECONDS should exceed the replication lag.
+# Replica connections only read: no IMMEDIATE transactions (they would take
+# the write lock and contend with replicate_sqlite's backup) and no journal
+# mode change (the copy keeps the primary's).
+REPLICA_PRAGMAS = {
+    **{name: SQLITE_PRAGMAS[name] for name in ('busy_timeout', 'mmap_size', 'cache_size')},
+    'query_only': 1,
+}
+REPLICA_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in REPLICA_PRAGMAS.items()),
+}
+DATABASE_REPLICAS = []
+for _path in filter(None, (p.strip() for p in os.environ.get('DB_REPLICAS', '').split(','))):
+    _alias = f'replica{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[_alias] = {
+        **DATABASES['default'], 'NAME': _path, 'OPTIONS': REPLICA_OPTIONS,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['smart_meal_planner.routers.ReplicaRouter']
+REPLICA_MODELS = ('meal.Meal', 'grocery.GroceryItem', 'grocery.GroceryOutlet')
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is per process: with several workers use a shared backend
+# (Redis, Memcached, file-based) so signal-driven invalidation reaches all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'smart-meal-planner',
     }
 }
 
+# Ranked ids behind a search's "next" cursor (meal/search.py) are kept this
+# long; later pages keep the first page's order and never repeat or skip rows
+MEAL_SEARCH_SNAPSHOT_SECONDS = 600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -106,9 +221,36 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PBKDF2 dominates signup/login CPU time. Load-test environments can set
+# PASSWORD_HASHER=md5 to make it negligible; never do this in production
+# (passwords are re-hashed with the first hasher on login).
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.environ.get('PASSWORD_HASHER') == 'md5':
+    PASSWORD_HASHERS.insert(0, 'django.contrib.auth.hashers.MD5PasswordHasher')
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Meal thumbnails (meal/thumbnails.py). Point MEAL_IMAGE_SOURCE_DIR at a
+# directory of downloaded TheMealDB images to build thumbnails offline.
+MEAL_IMAGE_SOURCE_DIR = os.environ.get('MEAL_IMAGE_SOURCE_DIR')
+MEAL_THUMBNAIL_WORKERS = 2
+
+# Leftover recommender (leftovers/service.py). Point RECOMMENDER_SOCKET at the
+# socket of `manage.py run_recommender` to keep scikit-learn out of the web
+# workers; unset, each worker imports it on its first recommendation.
+RECOMMENDER_SOCKET = os.environ.get('RECOMMENDER_SOCKET')
+RECOMMENDER_TIMEOUT = 10.0
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
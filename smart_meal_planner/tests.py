@@ -0,0 +1,185 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from meal.models import Meal, MealPlan
+from smart_meal_planner import metrics
+from smart_meal_planner.benchutil import percentile
+from smart_meal_planner.routers import PIN_COOKIE, ReplicaMiddleware, read_replica, use_replicas
+
+TEST_COUNTER = metrics.counter("smartmeal_test_events_total", "Events counted by the test suite.")
+
+
+def make_student(username, **extra):
+    return get_user_model().objects.create_user(
+        username=username, password="pass12345",
+        student_id=f"{username}-id", email=f"{username}@uni.example", **extra,
+    )
+
+
+class MetricsAccessTests(TestCase):
+    def test_anonymous_and_students_are_forbidden(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        self.client.force_login(make_student("alice"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_staff_can_read(self):
+        self.client.force_login(make_student("admin", is_staff=True))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE smartmeal_test_events_total counter", response.content.decode())
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_scraper_token(self):
+        ok = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+        wrong = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer guess")
+
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(wrong.status_code, 403)
+
+
+class MetricsSnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write_snapshot(self, filename, count):
+        snapshot = {
+            TEST_COUNTER.name: {
+                "kind": "counter", "documentation": TEST_COUNTER.documentation,
+                "labelnames": [], "buckets": None, "values": [[[], count]],
+            }
+        }
+        with open(os.path.join(self.directory, filename), "w") as f:
+            json.dump(snapshot, f)
+
+    def test_collect_drops_dead_and_superseded_workers(self):
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                                capture_output=True, text=True, check=True)
+        dead_pid = int(exited.stdout)
+        live_pid = os.getppid()  # The test runner's parent: alive, not this process
+        self.write_snapshot(f"{dead_pid}-1.json", 100)
+        self.write_snapshot(f"{live_pid}-1.json", 10)  # Earlier process with a reused pid
+        self.write_snapshot(f"{live_pid}-2.json", 5)
+
+        with override_settings(METRICS_DIR=self.directory):
+            merged = metrics.collect()
+
+        own = dict(TEST_COUNTER.values).get((), 0)
+        self.assertEqual(merged[TEST_COUNTER.name]["values"][()], 5 + own)
+        remaining = sorted(os.listdir(self.directory))
+        self.assertIn(f"{live_pid}-2.json", remaining)
+        self.assertNotIn(f"{live_pid}-1.json", remaining)
+        self.assertNotIn(f"{dead_pid}-1.json", remaining)
+        self.assertEqual(len(remaining), 2)  # Plus this process's own snapshot
+
+    def test_updates_are_flushed_off_the_calling_thread(self):
+        writers = []
+        flush = metrics.flush
+
+        def recording_flush():
+            writers.append(threading.current_thread().name)
+            flush()
+
+        with override_settings(METRICS_DIR=self.directory, METRICS_FLUSH_SECONDS=0.01), \
+                mock.patch.object(metrics, "flush", recording_flush):
+            TEST_COUNTER.inc()
+            deadline = time.monotonic() + 5
+            while not any(name.endswith(".json") for name in os.listdir(self.directory)):
+                self.assertLess(time.monotonic(), deadline, "No snapshot was written")
+                time.sleep(0.01)
+
+        self.assertTrue(writers)
+        self.assertEqual(set(writers), {"metrics-flush"})
+
+
+# Routing only names the alias; these tests never query through it (a
+# queryset's .db is where it would run), so it needs no connection
+REPLICA = "replica1"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TestCase):
+    def test_catalog_reads_use_a_replica_only_inside_a_scope(self):
+        self.assertEqual(router.db_for_read(Meal), "default")
+        with use_replicas():
+            self.assertEqual(router.db_for_read(Meal), REPLICA)
+            self.assertEqual(router.db_for_read(MealPlan), "default")
+            self.assertEqual(Meal.objects.filter(name="Dal").db, REPLICA)
+            self.assertEqual(MealPlan.objects.all().db, "default")
+
+    def test_a_write_pins_the_rest_of_the_scope(self):
+        with use_replicas() as scope:
+            Meal.objects.create(name="Dal")
+            self.assertTrue(scope.wrote)
+            self.assertEqual(router.db_for_read(Meal), "default")
+            self.assertEqual(Meal.objects.get(name="Dal")._state.db, "default")
+
+    def test_pinned_scope_reads_from_the_primary(self):
+        with use_replicas(pinned=True):
+            self.assertEqual(Meal.objects.all().db, "default")
+            self.assertEqual(read_replica(), "default")
+
+    def test_replicas_are_never_migrated(self):
+        self.assertTrue(router.allow_migrate("default", "meal"))
+        self.assertFalse(router.allow_migrate(REPLICA, "meal"))
+
+    def run_middleware(self, write=False, cookies=None):
+        seen = {}
+
+        def view(request):
+            if write:
+                Meal.objects.create(name="Dal")
+            seen["db"] = router.db_for_read(Meal)
+            return HttpResponse()
+
+        request = RequestFactory().post("/") if write else RequestFactory().get("/")
+        request.COOKIES.update(cookies or {})
+        return ReplicaMiddleware(view)(request), seen["db"]
+
+    def test_middleware_reads_from_replica_without_a_pin(self):
+        response, db = self.run_middleware()
+
+        self.assertEqual(db, REPLICA)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_middleware_sets_pin_cookie_after_a_write(self):
+        response, db = self.run_middleware(write=True)
+
+        self.assertEqual(db, "default")
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+    def test_pin_cookie_keeps_reads_on_the_primary(self):
+        response, db = self.run_middleware(cookies={PIN_COOKIE: "1"})
+
+        self.assertEqual(db, "default")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_without_replicas_everything_uses_the_primary(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            response, db = self.run_middleware(write=True)
+
+        self.assertEqual(db, "default")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class PercentileTests(SimpleTestCase):
+    def test_percentiles_of_sorted_latencies(self):
+        latencies = [float(ms) for ms in range(1, 101)]
+
+        self.assertEqual(percentile(latencies, 50), 50.5)
+        self.assertAlmostEqual(percentile(latencies, 99), 99.01)
+        self.assertEqual(percentile([7.0], 95), 7.0)
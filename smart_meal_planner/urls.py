@@ -19,6 +19,10 @@ from django.shortcuts import redirect
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from meal.thumbnails import THUMBNAIL_DIR
+from meal.views import meal_thumbnail
+from smart_meal_planner.metrics import metrics_view
+from smart_meal_planner.perf import perf_requests
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,6 +33,12 @@ urlpatterns = [
     path('grocery/', include('grocery.urls')),
     path("nutrition/", include("nutrition.urls")),
     path("leftovers/", include("leftovers.urls")),
+    # Served by Django with far-future cache headers; a front-end server can
+    # take over this prefix (same headers) in production
+    path(f"{settings.MEDIA_URL.lstrip('/')}{THUMBNAIL_DIR}/<path:path>", meal_thumbnail,
+         name="meal_thumbnail"),
+    path("perf/requests/", perf_requests, name="perf_requests"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG: